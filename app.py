@@ -1,25 +1,209 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g, Response, stream_with_context, make_response
 from flask_cors import CORS
-from utils.model_loader import load_model
-from utils.question_selector import get_question_by_level
-from utils.evaluation_logic import evaluate_answer
+from utils.model_loader import load_model, COMMUNICATION_ARTIFACT_DIR, COMMUNICATION_PICKLE_PATH
+from utils.question_selector import get_question_by_level, get_question_store, level_map
+from utils.evaluation_logic import evaluate_answer, evaluate_answers_batch, UnscorableAnswer
 from utils.enums import ExperienceLevel
-from utils.technical_evaluator import technical_evaluator
-from utils.json_encoder import convert_numpy_types, CustomJSONEncoder
+from utils.technical_evaluator import technical_evaluator, QUESTION_BANK_PATH, COMPLEXITY_MODEL_PATH
+from utils.question_index import EmptyQuestionBank
+from utils.encoder_tiers import UnknownTier
+from utils.json_encoder import FastJSONProvider
+from utils.records import EvaluationResponse
+from utils.model_registry import LazyModel, registry
+from utils.result_cache import cache_stats, get_cache
+from utils.model_artifacts import MANIFEST_NAME
+from utils.hot_reload import HotReloader, HOT_RELOAD_WATCH
+from utils.assessment_sessions import SessionEngine, SessionConflict, performance_score
+from utils.bulk_grading import BulkGrader, SpooledUpload, read_records, BULK_CHUNK_SIZE
+from utils.metrics import metrics, record_error, METRICS_ENABLED
+from utils.input_budget import check_answer, check_batch, InputTooLarge
+from utils.admission import AdmissionController, Rejected
+from utils.draft_scoring import DraftSessions
+from utils.profiling import profiler
+import functools
+import hmac
+import os
+import time
 import traceback
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend integration
 
-# Set custom JSON encoder
-app.json = CustomJSONEncoder(app)
+# Single-pass JSON for records and NumPy values (orjson when installed)
+app.json = FastJSONProvider(app)
 
-# Load communication skills model
-model_bundle = load_model()
-models = model_bundle["models"]
-vectorizer = model_bundle["tfidf_vectorizer"]
-scalers = model_bundle["scalers"]
-experience_indicators = model_bundle["experience_indicators"]
+def warm_up_communication_model(bundle):
+    """Run one dummy evaluation so the first real request is not cold"""
+    evaluate_answer(
+        bundle["models"], bundle["tfidf_vectorizer"], bundle["scalers"], bundle["experience_indicators"],
+        "I would break the problem down, communicate clearly with my team and test the solution.", "basic",
+        digest=bundle.get("digest")
+    )
+
+# Communication skills model, loaded lazily like the technical models
+communication_model = registry.register(
+    LazyModel("communication_model", load_model, warmup=warm_up_communication_model)
+)
+
+def get_communication_bundle():
+    """Return (models, vectorizer, scalers, experience_indicators, digest)"""
+    bundle = communication_model.get()
+    return (
+        bundle["models"], bundle["tfidf_vectorizer"], bundle["scalers"], bundle["experience_indicators"],
+        bundle.get("digest")
+    )
+
+# Warm every model on a background thread so startup does not block;
+# set MODEL_PRELOAD=lazy to load each model on first use instead
+if os.environ.get("MODEL_PRELOAD", "background") == "background":
+    registry.start_background()
+
+# Load communication question bank once, bucketed by level
+question_store = get_question_store()
+
+# Adaptive assessments live server-side (ASSESSMENT_STORE=memory|sqlite)
+session_engine = SessionEngine(technical_evaluator, question_store)
+
+def reload_communication_model():
+    communication_model.reload()
+    get_cache("communication_evaluation").clear()
+
+# Banks and models reload in place via POST /admin/reload (with RELOAD_TOKEN), or on file change
+# with HOT_RELOAD_WATCH=1
+reloader = HotReloader()
+reloader.add("technical_questions", [QUESTION_BANK_PATH], technical_evaluator.reload_question_bank)
+reloader.add("complexity_model", [COMPLEXITY_MODEL_PATH], technical_evaluator.reload_complexity_model)
+reloader.add(
+    "communication_model",
+    [os.path.join(COMMUNICATION_ARTIFACT_DIR, MANIFEST_NAME), COMMUNICATION_PICKLE_PATH],
+    reload_communication_model
+)
+reloader.add("communication_questions", [question_store.path], question_store.reload)
+if technical_evaluator.calibration_files():
+    reloader.add("encoder_calibration", technical_evaluator.calibration_files(), technical_evaluator.reload_calibrations)
+
+# Under gunicorn the watcher starts in each worker after fork (see gunicorn.conf.py)
+if HOT_RELOAD_WATCH and os.environ.get("MODEL_PRELOAD", "background") == "background":
+    reloader.start_watching()
+
+# CPU-heavy evaluation runs in INFERENCE_SLOTS slots, interactive requests ahead of bulk;
+# beyond the bounded queues requests are turned away quickly with Retry-After
+admission = AdmissionController()
+
+def inference_slot(lane="interactive"):
+    """Admission slot for this request; X-Request-Deadline-Ms can shorten the wait"""
+    deadline = request.headers.get("X-Request-Deadline-Ms")
+    try:
+        deadline = float(deadline) / 1000.0 if deadline else None
+    except ValueError:
+        deadline = None
+    return admission.slot(lane, deadline)
+
+@app.errorhandler(Rejected)
+def admission_rejected(e):
+    response = jsonify({"error": e.reason, "retry_after": e.retry_after})
+    response.status_code = e.status
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+@app.errorhandler(UnscorableAnswer)
+def unscorable_answer(e):
+    return jsonify({"error": str(e)}), 422
+
+def profiled(view):
+    """Sample the view's stacks when asked to (see utils/profiling.py).
+
+    Profiling is on with PROFILE_TOKEN (sent back as X-Profile-Token) or
+    PROFILE_SAMPLE_RATE; otherwise the view is returned as it is. A
+    profiled response carries X-Profile-Id, the name of its files.
+    """
+    if not profiler.enabled:
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        trigger = profiler.trigger(request.headers.get("X-Profile-Token"))
+        capture = profiler.start(request.endpoint, trigger) if trigger else None
+        if capture is None:
+            return view(*args, **kwargs)
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            profiler.finish(capture)
+        response.headers["X-Profile-Id"] = capture.id
+        return response
+    return wrapper
+
+# === METRICS ===
+# Exposed on /metrics; METRICS_ENABLED=0 turns every recording call into a no-op. Samples are per
+# process (pid label); with METRICS_DIR, /metrics also reports the other workers (see utils/metrics.py)
+
+http_requests = metrics.counter(
+    "http_requests_total", "Requests handled, by route, method and status", ("route", "method", "status")
+)
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Request latency by route", ("route",)
+)
+http_in_flight = metrics.gauge(
+    "http_requests_in_flight", "Requests currently being handled", ("route",)
+)
+metrics.callback(
+    "model_load_seconds", "Time taken to load each model", ("model",),
+    lambda: {(name, ): status["load_seconds"] for name, status in registry.status().items()}
+)
+metrics.callback(
+    "model_warmup_seconds", "Time taken by each model's warm-up inference", ("model",),
+    lambda: {(name, ): status["warmup_seconds"] for name, status in registry.status().items()}
+)
+metrics.callback(
+    "model_ready", "1 when the model is loaded and warmed up", ("model",),
+    lambda: {(name, ): int(status["state"] == "ready") for name, status in registry.status().items()}
+)
+metrics.callback(
+    "encoder_queue_depth", "Sentences waiting for the batching encoder", (),
+    lambda: {(): (technical_evaluator.encoder_stats() or {}).get("queue_depth")}
+)
+metrics.callback(
+    "admission_queue_depth", "Requests waiting for an inference slot", ("lane",),
+    lambda: {(lane, ): depth for lane, depth in admission.stats()["waiting"].items()}
+)
+metrics.callback(
+    "admission_slots_in_use", "Inference slots held", ("lane",),
+    lambda: {(lane, ): in_use for lane, in_use in admission.stats()["in_use"].items()}
+)
+metrics.callback(
+    "result_cache_hits_total", "Result cache hits", ("cache",),
+    lambda: {(name, ): stats["hits"] for name, stats in cache_stats().items()}, kind="counter"
+)
+metrics.callback(
+    "result_cache_misses_total", "Result cache misses", ("cache",),
+    lambda: {(name, ): stats["misses"] for name, stats in cache_stats().items()}, kind="counter"
+)
+
+def _route_label():
+    # The URL rule, not the raw path, so label cardinality stays bounded
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+if METRICS_ENABLED:
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_route = _route_label()
+        g.metrics_start = time.perf_counter()
+        http_in_flight.inc(route=g.metrics_route)
+
+    @app.after_request
+    def record_request_metrics(response):
+        route = g.get("metrics_route", "unmatched")
+        http_requests.inc(route=route, method=request.method, status=response.status_code)
+        if "metrics_start" in g:
+            http_request_seconds.observe(time.perf_counter() - g.metrics_start, route=route)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        # Runs even when a view raised, so the gauge never leaks
+        if "metrics_route" in g:
+            http_in_flight.dec(route=g.pop("metrics_route"))
 
 @app.route("/")
 def index():
@@ -32,10 +216,12 @@ def get_communication_question():
     """Get a communication skills question"""
     data = request.get_json()
     level = data.get("level", "").lower()
-    question = get_question_by_level(level)
+    session_id = data.get("session_id", None)
+    question = get_question_by_level(level, session_id=session_id)
     return jsonify({"question": question, "type": "communication"})
 
 @app.route("/communication/evaluation", methods=["POST"])
+@profiled
 def evaluate_communication():
     """Evaluate communication skills answer"""
     data = request.get_json()
@@ -43,26 +229,116 @@ def evaluate_communication():
         return jsonify({"error": "Missing JSON body"}), 400
 
     # Map UI levels to model levels
-    level_map = {
-        "intern": "basic",
-        "associate": "medium",
-        "software engineer": "hard"
-    }
-    
     experience_level_str = data.get("level", "").lower()
     mapped_level = level_map.get(experience_level_str, "basic")
     question = data.get("question", "")
     answer = data.get("answer", "")
+    try:
+        check_answer(answer)  # ANSWER_MAX_CHARS bounds the work one answer can cause
+    except InputTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+
+    models, vectorizer, scalers, experience_indicators, digest = get_communication_bundle()
+    with inference_slot():
+        result = evaluate_answer(models, vectorizer, scalers, experience_indicators, answer, mapped_level, digest)
+
+    return jsonify(EvaluationResponse(result, question, mapped_level, "communication"))
 
-    result = evaluate_answer(models, vectorizer, scalers, experience_indicators, answer, mapped_level)
+@app.route("/communication/evaluation/batch", methods=["POST"])
+@profiled
+def evaluate_communication_batch():
+    """Evaluate many communication answers in one vectorized pass"""
+    data = request.get_json()
+    if not data or not isinstance(data.get("items"), list):
+        return jsonify({"error": "Expected JSON body with an 'items' list"}), 400
+
+    items = data["items"]
+    try:
+        check_batch(items)  # BATCH_MAX_ITEMS bounds the work one batch can cause
+    except InputTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({"error": f"items[{i}]: expected an object with 'answer' and 'level'"}), 400
+    mapped_levels = [level_map.get(str(item.get("level", "")).lower(), "basic") for item in items]
+    answers = [item.get("answer", "") or "" for item in items]
+    for i, answer in enumerate(answers):
+        try:
+            check_answer(answer)
+        except InputTooLarge as e:
+            return jsonify({"error": f"items[{i}]: {e}"}), 413
+
+    models, vectorizer, scalers, experience_indicators, digest = get_communication_bundle()
+    with inference_slot():
+        results = evaluate_answers_batch(
+            models, vectorizer, scalers, experience_indicators, answers, mapped_levels, digest
+        )
 
     return jsonify({
-        "evaluation": result,
-        "question": question,
-        "level": mapped_level,
-        "type": "communication"
+        "evaluations": [
+            EvaluationResponse(result, item.get("question", ""), mapped_level, "communication")
+            for item, mapped_level, result in zip(items, mapped_levels, results)
+        ]
     })
 
+# Drafts being typed, re-scored from only the sentences each update changes
+draft_sessions = DraftSessions()
+
+@app.route("/communication/draft", methods=["POST"])
+@profiled
+def score_communication_draft():
+    """Score a communication answer while it is being written.
+
+    Send {"session_id", "level", "text"} with the whole draft, or "append"
+    with only the new characters; the first call may omit session_id and
+    gets one back. Scores equal /communication/evaluation on the same text.
+    "append" to a draft this process no longer holds (expired, evicted,
+    on another worker, or from before a model reload) gets 409: send the
+    whole "text" again.
+    """
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "Missing JSON body"}), 400
+
+    level, session_id = data.get("level", ""), data.get("session_id")
+    if not isinstance(level, str):
+        return jsonify({"error": "level must be a string"}), 400
+    if session_id is not None and not isinstance(session_id, str):
+        return jsonify({"error": "session_id must be a string"}), 400
+    text, appended = data.get("text"), data.get("append")
+    if (text is None) == (appended is None):
+        return jsonify({"error": "Send either 'text' or 'append'"}), 400
+    if not isinstance(text if text is not None else appended, str):
+        return jsonify({"error": "'text' and 'append' must be strings"}), 400
+
+    mapped_level = level_map.get(level.lower(), "basic")
+    known_session = bool(session_id)
+    session_id = session_id or draft_sessions.new_id()
+    state = draft_sessions.get(session_id, communication_model.get())
+    with state.lock:
+        if appended is not None and known_session and state.fresh:
+            return jsonify({"error": "Draft session not held here; send the whole 'text'",
+                            "session_id": session_id}), 409
+        draft = text if text is not None else state.text + appended
+        try:
+            check_answer(draft)
+        except InputTooLarge as e:
+            return jsonify({"error": str(e)}), 413
+        with inference_slot():
+            rescored = state.update(draft)
+            result = state.score(mapped_level)
+        stats = {"characters": len(state.text), "sentences": len(state.blocks), "rescored": rescored}
+
+    response = EvaluationResponse(result, data.get("question", ""), mapped_level, "communication").to_dict()
+    return jsonify({**response, "session_id": session_id, "draft": stats})
+
+@app.route("/communication/draft/<session_id>", methods=["DELETE"])
+def end_communication_draft(session_id):
+    """Forget a draft session"""
+    if not draft_sessions.forget(session_id):
+        return jsonify({"error": "Unknown or expired draft session"}), 404
+    return jsonify({"ended": session_id})
+
 # === TECHNICAL SKILLS ROUTES ===
 
 @app.route("/technical/question", methods=["POST"])
@@ -73,34 +349,36 @@ def get_technical_question():
         level = data.get("level", "intern").lower()
         skills = data.get("skills", ["java", "react"])  # Default skills
         current_complexity = data.get("current_complexity", None)
-        
-        question_data = technical_evaluator.get_technical_question(
+        exclude_ids = data.get("exclude_ids", None)  # Question ids already asked
+        try:
+            rotation = int(data.get("rotation", 0))
+            # Row ids are ints; JSON clients may send them as strings
+            exclude_ids = [int(question_id) for question_id in exclude_ids] if exclude_ids else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "rotation must be an integer and exclude_ids a list of integers"}), 400
+
+        question = technical_evaluator.get_technical_question(
             experience_level=level,
             skills=skills,
-            current_complexity=current_complexity
+            current_complexity=current_complexity,
+            exclude_ids=exclude_ids,
+            rotation=rotation
         )
         
-        # Convert numpy types to native Python types
-        response_data = convert_numpy_types({
-            "question": question_data["question"],
-             "expected_answer": question_data["expected_answer"],
-            "complexity_score": question_data["complexity_score"],
-            "technology": question_data["technology"],
-            "bloom_label": question_data["bloom_label"],
-            "question_id": question_data["question_id"],
-            "type": "technical"
-        })
-        
-        return jsonify(response_data)
+        return jsonify(question)
         
+    except EmptyQuestionBank as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         print(f"Error in get_technical_question: {e}")
+        record_error("get_technical_question")
         print(traceback.format_exc())
         return jsonify({"error": str(e)}), 500
 
 @app.route("/technical/evaluation", methods=["POST"])
+@profiled
 def evaluate_technical():
-    """Evaluate technical skills answer"""
+    """Evaluate technical skills answer; "tier" (or the session's tier) picks the encoder"""
     try:
         data = request.get_json()
         if not data:
@@ -113,6 +391,17 @@ def evaluate_technical():
         complexity_score = data.get("complexity_score", 2.0)
         technology = data.get("technology", "general")
         bloom_label = data.get("bloom_label", "")
+        question_id = data.get("question_id", None)
+        check_answer(answer)
+        # Client-supplied question text is encoded and compared too, so it gets the same budget
+        check_answer(question, field="question")
+        check_answer(expected_answer, field="expected_answer")
+
+        # Encoder tier: named in the request, else the assessment session's, else the default
+        tier = data.get("tier")
+        if not tier and data.get("session_id"):
+            session = session_engine.get(data["session_id"])
+            tier = session.tier if session is not None else None
 
         # Create question data structure
         question_data = {
@@ -120,90 +409,150 @@ def evaluate_technical():
             "expected_answer": expected_answer,
             "complexity_score": complexity_score,
             "technology": technology,
-            "bloom_label": bloom_label
+            "bloom_label": bloom_label,
+            "question_id": question_id
         }
 
         # Get comprehensive evaluation
-        result = technical_evaluator.get_comprehensive_evaluation(
-            question_data=question_data,
-            candidate_answer=answer,
-            experience_level=level
-        )
-
-        # Convert numpy types to native Python types
-        response_data = convert_numpy_types({
-            "evaluation": result,
-            "question": question,
-            "level": level,
-            "type": "technical"
-        })
+        with inference_slot():
+            result = technical_evaluator.get_comprehensive_evaluation(
+                question_data=question_data,
+                candidate_answer=answer,
+                experience_level=level,
+                tier=tier
+            )
 
-        return jsonify(response_data)
+        return jsonify(EvaluationResponse(result, question, level, "technical"))
         
+    except InputTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except UnknownTier as e:
+        return jsonify({"error": str(e)}), 400
+    except Rejected:
+        raise  # Answered with 429/503 and Retry-After by admission_rejected
     except Exception as e:
         print(f"Error in evaluate_technical: {e}")
+        record_error("evaluate_technical")
         print(traceback.format_exc())
         return jsonify({"error": str(e)}), 500
 
+# === BULK GRADING ===
+
+@app.route("/bulk/evaluation", methods=["POST"])
+def bulk_evaluation():
+    """Grade an NDJSON or CSV upload, streaming NDJSON results chunk by chunk.
+
+    Each record has a type ("communication" or "technical"), a level, a
+    question or question_id and an answer; results keep the input order and
+    carry the record's index (and id, if given). ``?tier=`` picks the
+    encoder tier for technical records.
+
+    Clients need not read and write at once: results start streaming while
+    the upload is still arriving, and the rest of the upload is spooled
+    (past BULK_SPOOL_MEMORY_BYTES, to a temporary file) until the client
+    reads them.
+    """
+    fmt = request.args.get("format") or ("csv" if "csv" in (request.mimetype or "") else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    try:
+        chunk_size = int(request.args.get("chunk_size", BULK_CHUNK_SIZE))
+    except ValueError:
+        return jsonify({"error": "chunk_size must be an integer"}), 400
+
+    tier = request.args.get("tier")
+    try:
+        technical_evaluator.tier(tier)
+    except UnknownTier as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Turn the upload away up front when the bulk lane is saturated
+    admission.admit("bulk")
+
+    # Records are graded as they arrive. The upload is received into a spool on its own thread, so a
+    # client that sends everything before reading results does not deadlock against the response
+    upload = SpooledUpload(request.stream)
+    grader = BulkGrader(technical_evaluator, get_communication_bundle, chunk_size, admission=admission, tier=tier)
+    records = read_records(upload, fmt)
+    response = Response(stream_with_context(grader.stream(records)), mimetype="application/x-ndjson")
+    response.call_on_close(upload.close)
+    return response
+
 # === COMBINED ASSESSMENT ROUTES ===
 
 @app.route("/assessment/start", methods=["POST"])
 def start_assessment():
-    """Start a new assessment session"""
-    data = request.get_json()
-    level = data.get("level", "intern").lower()
+    """Start a new assessment session, kept server-side"""
+    data = request.get_json() or {}
+    level = data.get("level", "intern")
+    if not isinstance(level, str):
+        return jsonify({"error": "level must be a string"}), 400
+    level = level.lower()
     skills = data.get("skills", ["java", "react"])
     assessment_type = data.get("type", "both")  # "communication", "technical", or "both"
     
-    session_data = {
-        "level": level,
-        "skills": skills,
-        "type": assessment_type,
-        "current_complexity": technical_evaluator.experience_starting_score.get(level, 2.0),
-        "questions_answered": 0,
-        "total_score": 0
-    }
+    try:
+        # "tier" picks the encoder for the whole session, e.g. fast for practice, accurate for finals
+        session = session_engine.start(level, skills, assessment_type, tier=data.get("tier"))
+    except UnknownTier as e:
+        return jsonify({"error": str(e)}), 400
     
     return jsonify({
-        "session": session_data,
+        "session": session.summary(),
         "message": f"Assessment started for {level} level"
     })
 
 @app.route("/assessment/next-question", methods=["POST"])
 def get_next_question():
-    """Get the next question in an adaptive assessment"""
-    data = request.get_json()
-    session = data.get("session", {})
+    """Get the next question in an adaptive assessment.
+
+    ``last_performance`` (a 0-10 score or an evaluation dict) scores the
+    previous question; technical scores move the session's complexity.
+    """
+    data = request.get_json() or {}
+    session = data.get("session") if isinstance(data.get("session"), dict) else {}
+    session_id = data.get("session_id") or session.get("session_id")
+    if not session_id or not isinstance(session_id, str):
+        return jsonify({"error": "Missing session_id"}), 400
     last_performance = data.get("last_performance", None)
-    
-    level = session.get("level", "intern")
-    skills = session.get("skills", ["java", "react"])
-    assessment_type = session.get("type", "both")
-    current_complexity = session.get("current_complexity", 2.0)
-    questions_answered = session.get("questions_answered", 0)
-    
-    # Determine question type (alternate between communication and technical if "both")
-    if assessment_type == "both":
-        question_type = "technical" if questions_answered % 2 == 0 else "communication"
-    else:
-        question_type = assessment_type
-    
-    if question_type == "technical":
-        question_data = technical_evaluator.get_technical_question(
-            experience_level=level,
-            skills=skills,
-            current_complexity=current_complexity
-        )
-        question_data["type"] = "technical"
-    else:
-        question = get_question_by_level(level)
-        question_data = {
-            "question": question,
-            "type": "communication"
-        }
-    
+    try:
+        performance_score(last_performance)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        outcome = session_engine.next_question(session_id, last_performance)
+    except EmptyQuestionBank as e:
+        return jsonify({"error": str(e)}), 503
+    except SessionConflict as e:
+        return jsonify({"error": str(e)}), 409
+    if outcome is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+
+    session, question_data = outcome
+    question_data["session"] = session.summary()
     return jsonify(question_data)
 
+@app.route("/assessment/<session_id>", methods=["GET"])
+def get_assessment(session_id):
+    """Full state of an assessment session"""
+    session = session_engine.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+    return jsonify({
+        **session.summary(),
+        "skills": session.skills,
+        "asked_question_ids": session_engine.asked_question_ids(session),
+        "complexity_trajectory": session.complexity_trajectory,
+        "scores": session.scores
+    })
+
+@app.route("/assessment/<session_id>", methods=["DELETE"])
+def end_assessment(session_id):
+    """Forget an assessment session"""
+    session_engine.end(session_id)
+    return jsonify({"ended": session_id})
+
 # === UTILITY ROUTES ===
 
 @app.route("/skills/list", methods=["GET"])
@@ -214,13 +563,64 @@ def get_available_skills():
 
 @app.route("/health", methods=["GET"])
 def health_check():
-    """Health check endpoint"""
+    """Health check endpoint with per-model readiness"""
+    model_status = registry.status()
+    if any(status["state"] == "failed" for status in model_status.values()):
+        overall = "degraded"
+    elif registry.all_ready():
+        overall = "healthy"
+    else:
+        overall = "starting"
+
     return jsonify({
-        "status": "healthy",
-        "communication_model": "loaded",
-        "technical_model": "loaded",
-        "question_bank_size": len(technical_evaluator.question_bank)
+        "status": overall,
+        "ready": overall == "healthy",
+        "models": model_status,
+        "question_bank_size": len(technical_evaluator.question_bank),
+        "encoder": technical_evaluator.encoder_stats(),
+        "encoder_tiers": technical_evaluator.tiers_status(),
+        "caches": cache_stats(),
+        "sessions": session_engine.store.stats(),
+        "admission": admission.stats(),
+        "drafts": draft_sessions.stats(),
+        "profiling": profiler.stats()
     })
 
+@app.route("/admin/reload", methods=["GET", "POST"])
+def hot_reload():
+    """Reload question banks and models without a restart.
+
+    POST {"sources": [...]} reloads the named sources (all by default); GET
+    reports each source. The route exists only with RELOAD_TOKEN set, and
+    the X-Reload-Token header must match it. Each process reloads itself:
+    with several workers use HOT_RELOAD_WATCH=1 so every worker follows the files.
+    """
+    token = os.environ.get("RELOAD_TOKEN")
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Reload-Token", "").encode("utf-8"), token.encode("utf-8")):
+        return jsonify({"error": "Invalid reload token"}), 403
+    if request.method == "GET":
+        return jsonify(reloader.status())
+
+    data = request.get_json(silent=True) or {}
+    sources = data.get("sources")
+    if sources is not None and (not isinstance(sources, list) or not sources):
+        return jsonify({"error": "sources must be a non-empty list"}), 400
+    try:
+        results = reloader.reload(sources)
+    except KeyError as e:
+        return jsonify({"error": e.args[0], "sources": list(reloader.sources)}), 400
+
+    failed = any(result["status"] == "failed" for result in results.values())
+    return jsonify({"results": results}), 500 if failed else 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    """Prometheus text-format metrics"""
+    if not METRICS_ENABLED:
+        return Response("# metrics disabled (METRICS_ENABLED=0)\n", mimetype="text/plain")
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""
+Async serving: the routes and JSON contracts of app.py, with connections on an event loop.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app
+
+The event loop accepts connections, reads request bodies and writes
+responses, so slow clients and idle keep-alive connections cost a socket,
+not a thread. A complete request runs the Flask view on one of three fixed
+thread pools (utils/asgi_bridge.py):
+
+  * ``inference``: POST /communication/evaluation[/batch], /communication/draft
+    and /technical/evaluation, where evaluate_answer and
+    get_comprehensive_evaluation run. It has one thread per admission slot
+    and interactive queue place, so admission control still decides who
+    waits and who gets 429/503 instead of requests piling up in the pool;
+  * ``uploads``: POST /bulk/evaluation, whose upload is graded while it
+    streams in. The loop reads up to ASGI_UPLOAD_READ_AHEAD_BYTES ahead of
+    the grader, so a thread only waits on a client slower than that. Uploads
+    beyond ASGI_UPLOAD_WORKERS at once get 503 with Retry-After, and a slow
+    uploader never holds a thread interactive scoring needs. The route
+    spools the upload (SpooledUpload in utils/bulk_grading.py), so a
+    client may send it all before reading any results;
+  * ``requests``: everything else, including question selection
+    (get_technical_question) and sessions, so it never queues behind scoring.
+
+Threads rather than processes: the models, embedding indexes, caches and
+draft/assessment sessions live in the process and would be duplicated or
+split by a process pool. Run more server workers to use more cores; with
+gunicorn.conf.py they share the preloaded models as the WSGI workers do (the
+pools start their threads on first use, after fork). gunicorn.conf.py
+selects ASSESSMENT_STORE=sqlite for more than one worker; set it yourself
+with ``uvicorn --workers``.
+
+Environment:
+    ASGI_INFERENCE_WORKERS  inference pool threads (default: INFERENCE_SLOTS plus
+                            the interactive admission queue limit)
+    ASGI_UPLOAD_WORKERS     concurrent bulk uploads, one thread each (default: bulk
+                            slots plus the bulk admission queue limit)
+    ASGI_UPLOAD_READ_AHEAD_BYTES  upload bytes buffered ahead of the grader (default: 1 MiB)
+    ASGI_WORKERS            threads for the other routes (default: 4)
+    ASGI_MAX_BODY_BYTES     largest request body buffered on the loop (default: 16 MiB);
+                            larger ones get 413. /bulk/evaluation uploads are
+                            streamed to the grader instead and not limited here
+"""
+
+import os
+from app import app as flask_app, admission
+from utils.asgi_bridge import WSGIExecutorBridge, ExecutorPool
+from utils.metrics import metrics
+
+INFERENCE_ROUTES = ("/communication/evaluation", "/communication/draft", "/technical/evaluation")
+STREAMING_UPLOADS = ("/bulk/evaluation",)
+
+ASGI_INFERENCE_WORKERS = int(os.environ.get("ASGI_INFERENCE_WORKERS", 0)) or (
+    admission.slots + admission.queue_limits["interactive"] if admission.enabled else admission.slots
+)
+ASGI_UPLOAD_WORKERS = int(os.environ.get("ASGI_UPLOAD_WORKERS", 0)) or (
+    admission.bulk_slots + admission.queue_limits["bulk"] if admission.enabled else admission.bulk_slots
+)
+ASGI_UPLOAD_READ_AHEAD_BYTES = int(os.environ.get("ASGI_UPLOAD_READ_AHEAD_BYTES", 1024 * 1024))
+ASGI_WORKERS = int(os.environ.get("ASGI_WORKERS", 4))
+ASGI_MAX_BODY_BYTES = int(os.environ.get("ASGI_MAX_BODY_BYTES", 16 * 1024 * 1024))
+
+def choose_pool(method, path):
+    if method != "POST":
+        return "requests"
+    if path.startswith(STREAMING_UPLOADS):
+        return "uploads"
+    return "inference" if path.startswith(INFERENCE_ROUTES) else "requests"
+
+pools = (
+    ExecutorPool("inference", ASGI_INFERENCE_WORKERS),
+    ExecutorPool("uploads", ASGI_UPLOAD_WORKERS, max_requests=ASGI_UPLOAD_WORKERS),
+    ExecutorPool("requests", ASGI_WORKERS)
+)
+
+app = WSGIExecutorBridge(
+    flask_app, pools, choose_pool, ASGI_MAX_BODY_BYTES, streaming_uploads=STREAMING_UPLOADS,
+    upload_read_ahead=ASGI_UPLOAD_READ_AHEAD_BYTES
+)
+
+metrics.callback(
+    "asgi_open_requests", "Requests accepted on the event loop and not yet answered", (),
+    lambda: {(): app.open_requests}
+)
+metrics.callback(
+    "asgi_executor_pending", "Calls queued or running on each executor pool", ("pool",),
+    lambda: {(pool.name, ): pool.pending for pool in pools}
+)
+metrics.callback(
+    "asgi_rejected_total", "Requests turned away because their pool was full", ("pool",),
+    lambda: {(pool.name, ): pool.rejected for pool in pools}, kind="counter"
+)
@@ -0,0 +1,81 @@
+"""
+Shared helpers for the benchmark scripts: datasets, latency summaries and
+JSON results that can be compared across versions.
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+def use_repo_root():
+    """Make model/ paths resolve and utils importable, whatever the cwd"""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+def load_datasets():
+    """(softskill answers frame, technical question bank frame)"""
+    import pandas as pd
+    softskill = pd.read_csv("model/softskill_dataset.csv").dropna(subset=["Answer"])
+    bank = pd.read_csv("model/model_b_full_labels.csv")
+    return softskill, bank
+
+def summarize(latencies):
+    """Latency percentiles in milliseconds"""
+    if not latencies:
+        return {"count": 0}
+    values = np.asarray(latencies, dtype=float) * 1000.0
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3)
+    }
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+def save_results(name, results, output=None):
+    """Write results (plus environment) as JSON and return the path"""
+    if output is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"benchmark": name, "environment": environment(), **results}, f, indent=2)
+    return output
+
+def compare(results, baseline_path, section, metric="p95_ms"):
+    """Print ``metric`` per entry of ``section`` against a saved baseline run"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    base_commit = baseline.get("environment", {}).get("git_commit")
+    print(f"\nCompared with {baseline_path} (commit {base_commit}), {metric}:")
+    for name, current in results[section].items():
+        previous = baseline.get(section, {}).get(name)
+        if not previous or metric not in previous or metric not in current:
+            print(f"  {name:<28} {current.get(metric, '-'):>10}  (no baseline)")
+            continue
+        change = (current[metric] - previous[metric]) / previous[metric] * 100 if previous[metric] else 0.0
+        print(f"  {name:<28} {previous[metric]:>10} -> {current[metric]:>10}  ({change:+.1f}%)")
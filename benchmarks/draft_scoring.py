@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Per-update cost of incremental draft scoring as the draft grows.
+
+Types answers of increasing length a few characters at a time through a
+DraftState (what POST /communication/draft does per update), and also
+edits a word in the middle of each draft. Reports the update latency at
+each draft length next to a full ``evaluate_answer`` of the same text:
+incremental updates should stay flat while full re-scoring grows with
+length. Every measured update is checked against the full evaluation.
+
+Then runs --random-edits random edits (inserts, deletes and replacements
+of characters, words, sentence breaks and paragraphs at random places)
+through one draft, each checked against a full evaluation, and compares
+the Flesch reading ease of every dataset answer with textstat's (whose
+internals utils/features.py reproduces); any mismatch makes the script
+exit non-zero.
+
+    python benchmarks/draft_scoring.py [--iterations 50] [--random-edits 2400] [--seed 7]
+        [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import use_repo_root, load_datasets, summarize, save_results, compare
+
+WORD_COUNTS = (50, 200, 500, 1000, 2000)
+KEYSTROKE = 4  # characters per update, about one debounced burst of typing
+# Pieces random edits insert; sentence ends and newlines move block boundaries
+EDIT_PIECES = (" ", ".", ". ", "! ", "? ", "\n", "\n\n", " and ", "team", "Clearly, ", "e.g. ", "3.5 ")
+
+def outcome(score):
+    """Scores from ``score()``, or the UnscorableAnswer message (punctuation-only text) both paths raise"""
+    from utils.evaluation_logic import UnscorableAnswer
+    try:
+        return score()
+    except UnscorableAnswer as e:
+        return str(e)
+
+def readability_parity(texts):
+    """Texts whose incremental Flesch reading ease differs from textstat's own"""
+    import textstat
+    from utils.features import TextStats
+    mismatches = 0
+    for text in texts:
+        if TextStats.from_text(text).flesch_reading_ease() != textstat.flesch_reading_ease(text):
+            mismatches += 1
+            print(f"Reading ease differs from textstat: {text[:80]!r}...")
+    return mismatches
+
+def random_edit(rng, text, corpus):
+    """``text`` with one random insert, delete or replacement"""
+    position = rng.randint(0, len(text))
+    kind = rng.random()
+    if kind < 0.4 or not text:
+        if rng.random() < 0.5:
+            piece = rng.choice(EDIT_PIECES)
+        else:
+            piece = " ".join(rng.choice(corpus).split()[:rng.randint(1, 12)])
+        return text[:position] + piece + text[position:]
+    end = min(len(text), position + rng.choice((1, 2, 5, 20, 80)))
+    if kind < 0.7:
+        return text[:position] + text[end:]
+    return text[:position] + rng.choice(EDIT_PIECES) + text[end:]
+
+def random_edit_parity(sessions, bundle, full, corpus, edits, seed, level):
+    """Mismatches between incremental and full scoring over ``edits`` random edits"""
+    rng = random.Random(seed)
+    state = sessions.get("draft-random", bundle)
+    text, mismatches = "", 0
+    for i in range(edits):
+        # Now and then start over from a fresh answer, or jump to an unrelated one
+        if i % 400 == 0 or rng.random() < 0.01:
+            text = rng.choice(corpus)
+        else:
+            text = random_edit(rng, text, corpus)
+        state.update(text)
+        if outcome(lambda: state.score(level)) != outcome(lambda: full(text)):
+            mismatches += 1
+            print(f"Mismatch after random edit {i} (seed {seed}): {text[:80]!r}...")
+    sessions.forget("draft-random")
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental draft scoring latency against draft length")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--random-edits", type=int, default=2400, help="random edits checked for parity (0: skip)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    use_repo_root()
+    os.environ["SEMANTIC_MODEL_NAME"] = "hashing"
+    os.environ["MODEL_PRELOAD"] = "lazy"
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+
+    from benchmarks.long_answers import build_answer
+    from utils.draft_scoring import DraftSessions
+    from utils.evaluation_logic import evaluate_answer
+    from utils.model_loader import load_model
+
+    bundle = load_model()
+    softskill, bank = load_datasets()
+    corpus = softskill["Answer"].astype(str).sample(frac=1.0, random_state=11).tolist()
+    sessions = DraftSessions()
+    level = "intermediate"
+
+    def full(text):
+        return evaluate_answer(
+            bundle["models"], bundle["tfidf_vectorizer"], bundle["scalers"], bundle["experience_indicators"],
+            text, level
+        )
+
+    results, mismatches = {}, 0
+    for words in WORD_COUNTS:
+        answer = build_answer(corpus, words)
+        prefix = answer[:-KEYSTROKE * args.iterations]
+        state = sessions.get(f"draft-{words}", bundle)
+        state.update(prefix)
+
+        typing, edits, full_scoring = [], [], []
+        for i in range(args.iterations):
+            text = answer[:len(prefix) + KEYSTROKE * (i + 1)]
+            start = time.perf_counter()
+            state.update(text)
+            result = state.score(level)
+            typing.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            expected = full(text)
+            full_scoring.append(time.perf_counter() - start)
+            mismatches += result != expected
+
+        # Replace a word in the middle, then put it back
+        middle = answer.index(" ", len(answer) // 2)
+        edited = answer[:middle] + " clearly" + answer[middle:]
+        for i in range(args.iterations):
+            text = edited if i % 2 == 0 else answer
+            start = time.perf_counter()
+            state.update(text)
+            result = state.score(level)
+            edits.append(time.perf_counter() - start)
+        mismatches += result != full(text)
+
+        results[f"typing_{words}w"] = summarize(typing)
+        results[f"middle_edit_{words}w"] = summarize(edits)
+        results[f"full_{words}w"] = summarize(full_scoring)
+        sessions.forget(f"draft-{words}")
+
+    for name, summary in results.items():
+        print(f"{name:<22} p50 {summary['p50_ms']:>8} ms  p95 {summary['p95_ms']:>8} ms")
+    print(f"Updates differing from a full evaluation: {mismatches}")
+
+    random_mismatches = random_edit_parity(sessions, bundle, full, corpus, args.random_edits, args.seed, level)
+    print(f"Random edits differing from a full evaluation: {random_mismatches} of {args.random_edits}")
+
+    # The features copy textstat's Flesch reading ease; check it against the library on every dataset text
+    texts = softskill["Answer"].astype(str).tolist() + bank["expected_answer"].dropna().astype(str).tolist()
+    readability_mismatches = readability_parity(texts)
+    print(f"Reading ease differing from textstat: {readability_mismatches} of {len(texts)}")
+
+    output = save_results("draft_scoring", {
+        "config": {"iterations": args.iterations, "keystroke_chars": KEYSTROKE, "level": level,
+                   "random_edits": args.random_edits, "seed": args.seed},
+        "updates": results,
+        "mismatches": mismatches,
+        "random_edit_mismatches": random_mismatches,
+        "readability_mismatches": readability_mismatches
+    }, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare({"updates": results}, args.compare, "updates")
+    if mismatches or random_mismatches or readability_mismatches:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
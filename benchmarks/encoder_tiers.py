@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Fit and check the calibration between semantic encoder tiers.
+
+Scores the question bank's expected answers against generated variants
+(reordered, words dropped, partial, another question's answer, the
+question text) with every tier in SEMANTIC_TIERS. With --fit, each
+non-reference tier gets an isotonic map from its similarity onto the
+reference tier's, written to CALIBRATION_DIR where the evaluator loads it
+(and the hot reloader picks it up). Reports per tier:
+
+  * latency: single-answer encode p50/p95, batch ms per item and a full
+    uncached ``get_comprehensive_evaluation`` p50/p95;
+  * agreement with the reference tier, raw and calibrated, on bank rows
+    held out of the fit (odd rows; the saved fit uses every row).
+
+Runs offline with stand-in tiers: --tiers defaults to SEMANTIC_TIERS, else
+to two ``hashing`` encoders of different sizes.
+
+    python benchmarks/encoder_tiers.py [--tiers fast=...,accurate=...] [--fit]
+        [--limit 640] [--iterations 50] [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import use_repo_root, load_datasets, summarize, save_results, compare
+
+STAND_IN_TIERS = "fast=hashing:64,accurate=hashing:1024"
+
+def time_calls(fn, inputs, iterations):
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(inputs[i % len(inputs)])
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder tier calibration, latency and agreement")
+    parser.add_argument("--tiers", default=os.environ.get("SEMANTIC_TIERS") or STAND_IN_TIERS)
+    parser.add_argument("--fit", action="store_true", help="write calibration files for the non-reference tiers")
+    parser.add_argument("--limit", type=int, default=640, help="question bank rows to use")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    use_repo_root()
+    os.environ["SEMANTIC_TIERS"] = args.tiers
+    os.environ["MODEL_PRELOAD"] = "lazy"
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+
+    import numpy as np
+    from benchmarks.quantization_report import agreement
+    from utils.encoder_tiers import Calibration, calibration_candidates, calibration_path
+    from utils.technical_evaluator import technical_evaluator
+
+    _, bank = load_datasets()
+    candidates = calibration_candidates(bank, args.limit)
+    expected_texts = bank["expected_answer"].astype(str).tolist()[:args.limit]
+    held_out = np.array([row % 2 == 1 for row, _, _ in candidates])
+    kinds = np.array([kind for _, kind, _ in candidates])
+    reference = technical_evaluator.tier(technical_evaluator.reference_tier)
+    print(f"Tiers {list(technical_evaluator.tiers)}, reference {reference.name}; "
+          f"{len(candidates)} pairs over {len(expected_texts)} bank rows")
+
+    similarities, latency = {}, {}
+    answers = [text for _, _, text in candidates]
+    questions = [technical_evaluator.get_question_by_id(row).to_dict() for row in range(len(expected_texts))]
+    for name, tier in technical_evaluator.tiers.items():
+        tier.embedding_index  # Index building is a one-off, not part of the latency
+        start = time.perf_counter()
+        similarities[name] = tier.pair_similarities(expected_texts, candidates)
+        batch_seconds = time.perf_counter() - start
+        latency[name] = {
+            "batch_ms_per_pair": round(batch_seconds / len(candidates) * 1000, 3),
+            "single_encode": time_calls(tier.encode_answers, answers, args.iterations),
+            "evaluation": time_calls(
+                lambda i: technical_evaluator.get_comprehensive_evaluation(
+                    questions[candidates[i][0]], candidates[i][2], "associate", tier=name
+                ),
+                list(range(len(candidates))), args.iterations
+            )
+        }
+
+    report, fitted = {}, {}
+    reference_similarities = similarities[reference.name]
+    for name, tier in technical_evaluator.tiers.items():
+        if tier is reference:
+            continue
+        raw = similarities[name]
+        train = Calibration.fit(tier.model_key, reference.model_key, raw[~held_out], reference_similarities[~held_out])
+        calibrated = np.array([train.apply(value) for value in raw])
+        report[name] = {
+            "raw": agreement(reference_similarities[held_out], raw[held_out]),
+            "calibrated": agreement(reference_similarities[held_out], calibrated[held_out]),
+            "calibrated_by_kind": {
+                kind: agreement(reference_similarities[held_out & (kinds == kind)],
+                                calibrated[held_out & (kinds == kind)])
+                for kind in sorted(set(kinds))
+            }
+        }
+        if args.fit:
+            path = calibration_path(tier.model_key, reference.model_key)
+            Calibration.fit(tier.model_key, reference.model_key, raw, reference_similarities).save(path)
+            fitted[name] = path
+
+    print(f"\n{'tier':<10} {'batch ms/pair':>13} {'encode p50':>10} {'encode p95':>10} {'eval p50':>9} {'eval p95':>9}")
+    for name, stats in latency.items():
+        print(f"{name:<10} {stats['batch_ms_per_pair']:>13} {stats['single_encode']['p50_ms']:>10} "
+              f"{stats['single_encode']['p95_ms']:>10} {stats['evaluation']['p50_ms']:>9} "
+              f"{stats['evaluation']['p95_ms']:>9}")
+    print(f"\nAgreement with {reference.name} on held-out rows (correctness is similarity x 10):")
+    print(f"{'tier':<10} {'scale':<11} {'corr mean Δ':>11} {'corr p95 Δ':>10} {'corr max Δ':>10} {'pearson':>8}")
+    for name, scales in report.items():
+        for scale in ("raw", "calibrated"):
+            stats = scales[scale]
+            print(f"{name:<10} {scale:<11} {stats['correctness_mean_abs_delta']:>11} "
+                  f"{stats['correctness_p95_abs_delta']:>10} {stats['correctness_max_abs_delta']:>10} "
+                  f"{stats['pearson_r']:>8}")
+    for name, path in fitted.items():
+        print(f"Calibration for {name} written to {path}")
+
+    output = save_results("encoder_tiers", {
+        "config": {"tiers": args.tiers, "reference": reference.name, "limit": args.limit,
+                   "iterations": args.iterations, "pairs": len(candidates)},
+        "latency": {
+            f"{name}_{kind}": stats[kind] for name, stats in latency.items() for kind in ("single_encode", "evaluation")
+        },
+        "batch_ms_per_pair": {name: stats["batch_ms_per_pair"] for name, stats in latency.items()},
+        "agreement": report,
+        "calibration_files": fitted
+    }, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare({"latency": {
+            f"{name}_{kind}": stats[kind] for name, stats in latency.items() for kind in ("single_encode", "evaluation")
+        }}, args.compare, "latency")
+
+if __name__ == "__main__":
+    main()
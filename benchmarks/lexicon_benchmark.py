@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for statistical feature extraction on long answers.
+
+Compares the shared single-sweep lexicon matcher against the previous
+per-term ``text.lower()`` scans and checks both give identical features.
+
+    python benchmarks/lexicon_benchmark.py [--answers 40] [--repeat 50]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from textstat import flesch_reading_ease
+from utils.features import extract_statistical_features
+from utils.lexicon import FEATURE_LEXICONS
+
+def reference_statistical_features(text):
+    """Previous implementation: one lowercase and substring scan per term"""
+    if not text or len(text.strip()) == 0:
+        return {f'stat_{i}': 0.0 for i in range(15)}
+    words = text.split()
+    sentences = re.split(r'[.!?]+', text)
+    sentences = [s.strip() for s in sentences if s.strip()]
+    features = {}
+    features['stat_0'] = len(words)
+    features['stat_1'] = len(sentences)
+    features['stat_2'] = np.mean([len(word) for word in words])
+    features['stat_3'] = np.mean([len(s.split()) for s in sentences])
+    try:
+        features['stat_4'] = flesch_reading_ease(text)
+    except:
+        features['stat_4'] = 50.0
+    unique_words = len(set(word.lower() for word in words))
+    features['stat_5'] = unique_words / len(words)
+    for name in ('stat_6', 'stat_7', 'stat_8', 'stat_12', 'stat_14'):
+        features[name] = sum(1 for term in FEATURE_LEXICONS[name] if term in text.lower()) / len(words)
+    for name in ('stat_9', 'stat_13'):
+        features[name] = sum(1 for term in FEATURE_LEXICONS[name] if term in text.lower())
+    features['stat_10'] = sum(1 for word in words if len(word) > 8) / len(words)
+    features['stat_11'] = text.count('?') / len(words)
+    return {f'stat_{i}': features[f'stat_{i}'] for i in range(15)}
+
+def lexicon_only_reference(text):
+    return [sum(1 for term in terms if term in text.lower()) for terms in FEATURE_LEXICONS.values()]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--answers", type=int, default=40, help="dataset answers joined into one long answer")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    answers = pd.read_csv("model/softskill_dataset.csv")["Answer"].astype(str).tolist()
+    long_answer = " ".join(answers[:args.answers])
+
+    mismatches = sum(
+        reference_statistical_features(answer) != extract_statistical_features(answer)
+        for answer in answers + [long_answer]
+    )
+    print(f"Feature mismatches over {len(answers) + 1} answers: {mismatches}")
+
+    print(f"\nLong answer: {len(long_answer)} characters, {len(long_answer.split())} words")
+    for label, fn in (
+        ("reference features", lambda: reference_statistical_features(long_answer)),
+        ("matcher features", lambda: extract_statistical_features(long_answer)),
+        ("reference lexicons only", lambda: lexicon_only_reference(long_answer)),
+    ):
+        seconds = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        print(f"  {label:<24} {seconds * 1000:8.3f} ms")
+
+    from utils.lexicon import default_matcher, FEATURE_LEXICON_NAMES
+    seconds = min(timeit.repeat(
+        lambda: default_matcher.counts(long_answer, names=FEATURE_LEXICON_NAMES),
+        number=args.repeat, repeat=3
+    )) / args.repeat
+    print(f"  {'matcher lexicons only':<24} {seconds * 1000:8.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the Flask endpoints.
+
+Drives /communication/question, /communication/evaluation,
+/technical/question, /technical/evaluation and /assessment/next-question
+with answers taken from softskill_dataset.csv and model_b_full_labels.csv,
+at a configurable concurrency, and reports throughput and p50/p95/p99
+latency per endpoint.
+
+By default the app runs in-process with the deterministic ``hashing``
+stand-in encoder and the result caches disabled, so runs are reproducible
+offline. Pass --url to load-test a running server instead.
+
+    python benchmarks/load_test.py [--requests 200] [--concurrency 8]
+        [--encoder hashing | --url http://localhost:5000]
+        [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import use_repo_root, load_datasets, summarize, save_results, compare
+
+LEVELS = ["intern", "associate", "software engineer"]
+ENDPOINTS = [
+    "communication_question",
+    "communication_evaluation",
+    "technical_question",
+    "technical_evaluation",
+    "assessment_next_question",
+]
+
+class PayloadFactory:
+    """Deterministic, realistic request bodies for every endpoint"""
+
+    def __init__(self, softskill, bank, seed):
+        self.rng = random.Random(seed)
+        self.softskill = softskill[["Question", "Answer"]].astype(str).values.tolist()
+        self.bank = bank.to_dict("records")
+        self.skills = sorted(bank["technology"].astype(str).str.lower().unique())
+        self.session_ids = []
+
+    def start_sessions(self, client, count):
+        """Open server-side assessment sessions for assessment_next_question"""
+        for _ in range(count):
+            status, body = client.post("/assessment/start", {
+                "level": self.rng.choice(LEVELS),
+                "skills": self.rng.sample(self.skills, k=min(2, len(self.skills))),
+                "type": "both"
+            })
+            if status == 200:
+                self.session_ids.append(body["session"]["session_id"])
+
+    def communication_question(self):
+        return "/communication/question", {"level": self.rng.choice(LEVELS)}
+
+    def communication_evaluation(self):
+        question, answer = self.rng.choice(self.softskill)
+        return "/communication/evaluation", {"level": self.rng.choice(LEVELS), "question": question, "answer": answer}
+
+    def technical_question(self):
+        return "/technical/question", {
+            "level": self.rng.choice(LEVELS),
+            "skills": self.rng.sample(self.skills, k=min(2, len(self.skills))),
+            "current_complexity": round(self.rng.uniform(1.0, 8.0), 1)
+        }
+
+    def technical_evaluation(self):
+        row_id = self.rng.randrange(len(self.bank))
+        row = self.bank[row_id]
+        words = str(row["expected_answer"]).split()
+        # A partial answer, a reworded answer or another question's answer
+        kind = self.rng.random()
+        if kind < 0.4:
+            answer = " ".join(words[: max(1, len(words) // 2)])
+        elif kind < 0.8:
+            answer = " ".join(word for i, word in enumerate(words) if i % 4 != 3)
+        else:
+            answer = str(self.rng.choice(self.bank)["expected_answer"])
+        return "/technical/evaluation", {
+            "level": self.rng.choice(LEVELS),
+            "question": row["question_text"],
+            "expected_answer": row["expected_answer"],
+            "complexity_score": row["complexity_score"],
+            "technology": row["technology"],
+            "bloom_label": row["bloom_label"],
+            "question_id": row_id,
+            "answer": answer
+        }
+
+    def assessment_next_question(self):
+        return "/assessment/next-question", {
+            "session_id": self.rng.choice(self.session_ids),
+            "last_performance": round(self.rng.uniform(0.0, 10.0), 1)
+        }
+
+class InProcessClient:
+    """Calls the Flask app directly, one test client per thread"""
+
+    def __init__(self):
+        import app
+        from utils.model_registry import registry
+        registry.load_all()
+        self.app = app.app
+        self._local = threading.local()
+
+    def post(self, path, payload):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(path, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+class HttpClient:
+    """Calls a running server over HTTP"""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def post(self, path, payload):
+        request = urllib.request.Request(
+            self.url + path, data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+def run_endpoint(client, payloads, concurrency):
+    def call(request):
+        path, payload = request
+        start = time.perf_counter()
+        try:
+            status, _ = client.post(path, payload)
+        except Exception:
+            status = None
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(call, payloads))
+    wall = time.perf_counter() - start
+
+    latencies = [latency for latency, status in outcomes if status == 200]
+    return {
+        "requests": len(payloads),
+        "errors": sum(1 for _, status in outcomes if status != 200),
+        "concurrency": concurrency,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(payloads) / wall, 2) if wall else 0.0,
+        **summarize(latencies)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency of every Flask endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per endpoint")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--url", default=None, help="benchmark a running server instead of in-process")
+    parser.add_argument("--encoder", default="hashing",
+                        help="semantic model for in-process runs (default: deterministic hashing stand-in)")
+    parser.add_argument("--cache", action="store_true", help="keep the result caches enabled")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    use_repo_root()
+    if args.url is None:
+        # Must be set before the app (and its evaluators) are imported
+        os.environ["SEMANTIC_MODEL_NAME"] = args.encoder
+        os.environ["MODEL_PRELOAD"] = "lazy"
+        if not args.cache:
+            os.environ["RESULT_CACHE_ENABLED"] = "0"
+        client = InProcessClient()
+    else:
+        client = HttpClient(args.url)
+
+    softskill, bank = load_datasets()
+    factory = PayloadFactory(softskill, bank, args.seed)
+    if "assessment_next_question" in args.endpoints:
+        factory.start_sessions(client, args.concurrency * 4)
+
+    results = {}
+    for name in args.endpoints:
+        make_payload = getattr(factory, name)
+        run_endpoint(client, [make_payload() for _ in range(args.warmup)], args.concurrency)
+        results[name] = run_endpoint(client, [make_payload() for _ in range(args.requests)], args.concurrency)
+        r = results[name]
+        print(f"{name:<26} {r['throughput_rps']:>8} req/s  p50 {r.get('p50_ms', '-'):>9} ms  "
+              f"p95 {r.get('p95_ms', '-'):>9} ms  p99 {r.get('p99_ms', '-'):>9} ms  errors {r['errors']}")
+
+    output = save_results("load_test", {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "target": args.url or "in-process",
+            "encoder": None if args.url else args.encoder,
+            "result_cache": None if args.url else args.cache
+        },
+        "endpoints": results
+    }, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare({"endpoints": results}, args.compare, "endpoints")
+
+if __name__ == "__main__":
+    main()
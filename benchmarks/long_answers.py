@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Latency of the evaluation endpoints as answers grow up to and past the budget.
+
+Builds answers of increasing length from real softskill answers and sends
+them to /technical/evaluation and /communication/evaluation in process.
+Latency should grow linearly with length and stop growing at the budget:
+the technical encode is at most ENCODE_MAX_CHUNKS chunk sequences in one
+batched encoder call, and answers over ANSWER_MAX_CHARS are rejected with
+413 before any model runs. Also reports how much of a long answer counts:
+the similarity to an expected answer placed at the end of the answer,
+pooled versus the first chunk alone (what truncation used to see).
+Uses the deterministic ``hashing`` stand-in encoder unless --encoder names
+a real model.
+
+    python benchmarks/long_answers.py [--iterations 20] [--encoder hashing]
+        [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import use_repo_root, load_datasets, summarize, save_results, compare
+
+WORD_COUNTS = (50, 200, 500, 1000, 2000)
+
+def build_answer(corpus, words):
+    """An answer of ``words`` words made of real answers, each slice distinct"""
+    selected, total = [], 0
+    for answer in corpus:
+        selected.append(answer)
+        total += len(answer.split())
+        if total >= words:
+            break
+    return " ".join(" ".join(selected).split()[:words])
+
+def time_requests(client, path, body, iterations):
+    latencies, status = [], None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.post(path, json=body)
+        latencies.append(time.perf_counter() - start)
+        status = response.status_code
+    summary = summarize(latencies)
+    summary["status"] = status
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluation latency against answer length")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--encoder", default="hashing")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    use_repo_root()
+    os.environ["SEMANTIC_MODEL_NAME"] = args.encoder
+    os.environ["MODEL_PRELOAD"] = "lazy"
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+
+    import numpy as np
+    import app
+    from utils.embedding_index import cosine_similarity
+    from utils.input_budget import ANSWER_MAX_CHARS, ENCODE_MAX_CHUNKS, split_chunks
+    from utils.model_registry import registry
+    from utils.technical_evaluator import technical_evaluator
+
+    registry.load_all()
+    client = app.app.test_client()
+    softskill, _ = load_datasets()
+    corpus = softskill["Answer"].astype(str).sample(frac=1.0, random_state=7).tolist()
+    question = technical_evaluator.get_question_by_id(0)
+    chunk_words = technical_evaluator.chunk_words
+
+    # Longest answer that still fits the character budget, then one just over it
+    lengths = list(WORD_COUNTS)
+    full = build_answer(corpus, ANSWER_MAX_CHARS)
+    at_budget = full[:ANSWER_MAX_CHARS].rsplit(" ", 1)[0]
+    lengths.append(len(at_budget.split()))
+
+    results = {}
+    for words in lengths:
+        answer = build_answer(corpus, words) if words != lengths[-1] else at_budget
+        chunks = len(split_chunks(answer, chunk_words)[0])
+        results[f"technical_{words}w"] = time_requests(client, "/technical/evaluation", {
+            **question.to_dict(), "level": "associate", "answer": answer
+        }, args.iterations)
+        results[f"technical_{words}w"]["chunks"] = chunks
+        results[f"communication_{words}w"] = time_requests(client, "/communication/evaluation", {
+            "question": "Tell me about a conflict", "level": "associate", "answer": answer
+        }, args.iterations)
+
+    over = full + " " + full
+    results["technical_over_budget"] = time_requests(client, "/technical/evaluation", {
+        **question.to_dict(), "level": "associate", "answer": over
+    }, args.iterations)
+    results["communication_over_budget"] = time_requests(client, "/communication/evaluation", {
+        "question": "Tell me about a conflict", "level": "associate", "answer": over
+    }, args.iterations)
+
+    # Coverage: the relevant part of the answer sits after several chunks of filler
+    filler = build_answer(corpus, chunk_words * 3)
+    answer = filler + " " + question.expected_answer
+    expected = technical_evaluator.embedding_index.get(question.expected_answer, technical_evaluator.encode_answers)
+    first_chunk = split_chunks(answer, chunk_words)[0][0]
+    coverage = {
+        "pooled_similarity": round(cosine_similarity(expected, technical_evaluator.encode_answers(answer)), 4),
+        "first_chunk_similarity": round(cosine_similarity(
+            expected, np.asarray(technical_evaluator.encoder.encode(first_chunk))
+        ), 4)
+    }
+
+    print(f"Budget: {ANSWER_MAX_CHARS} chars, {chunk_words} words per chunk, at most {ENCODE_MAX_CHUNKS} chunks")
+    for name, summary in results.items():
+        chunks = f"  chunks {summary['chunks']}" if "chunks" in summary else ""
+        print(f"{name:<30} status {summary['status']}  p50 {summary['p50_ms']:>9} ms  "
+              f"max {summary['max_ms']:>9} ms{chunks}")
+    print(f"Answer ending with the expected answer: pooled similarity {coverage['pooled_similarity']}, "
+          f"first chunk only {coverage['first_chunk_similarity']}")
+
+    output = save_results("long_answers", {
+        "config": {
+            "iterations": args.iterations, "encoder": args.encoder, "answer_max_chars": ANSWER_MAX_CHARS,
+            "chunk_words": chunk_words, "max_chunks": ENCODE_MAX_CHUNKS
+        },
+        "endpoints": results,
+        "coverage": coverage
+    }, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare({"endpoints": results}, args.compare, "endpoints")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Calibration report for the semantic encoder's reduced-precision mode.
+
+Scores the question bank's expected answers against generated candidate
+answers with the fp32 model and with the int8 dynamically quantized model,
+then reports how far ``semantic_similarity`` and ``correctness`` move, the
+encode latency of each mode and the size of the weights.
+
+    python benchmarks/quantization_report.py [--model all-mpnet-base-v2]
+        [--threads 4] [--max-seq-length 256] [--limit 640]
+        [--output benchmarks/results/quantization_report.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from utils.embedding_index import cosine_similarity
+from utils.semantic_inference import InferenceConfig, apply_inference_config
+
+def build_candidates(bank, limit, seed=13):
+    """(row, kind, candidate answer) triples covering good, partial and wrong answers"""
+    rng = random.Random(seed)
+    by_technology = bank.groupby(bank["technology"].str.lower()).indices
+    candidates = []
+    for row in range(min(limit, len(bank))):
+        expected = str(bank.at[row, "expected_answer"])
+        words = expected.split()
+        candidates.append((row, "dropped_words", " ".join(word for i, word in enumerate(words) if i % 5 != 4)))
+        candidates.append((row, "partial", " ".join(words[: max(1, len(words) // 3)])))
+        peers = [peer for peer in by_technology[str(bank.at[row, "technology"]).lower()] if peer != row]
+        if peers:
+            candidates.append((row, "other_question", str(bank.at[rng.choice(peers), "expected_answer"])))
+        candidates.append((row, "question_text", str(bank.at[row, "question_text"])))
+    return candidates
+
+def weight_bytes(model):
+    """Bytes held by the model's weights, including packed int8 parameters"""
+    import torch
+
+    def tensor_bytes(value):
+        if isinstance(value, torch.Tensor):
+            if value.is_quantized:
+                return value.numel() * value.element_size()
+            return value.nelement() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+
+    return sum(tensor_bytes(value) for value in model.state_dict().values())
+
+def score_mode(model_name, config, expected_texts, candidates):
+    from sentence_transformers import SentenceTransformer
+    model = apply_inference_config(SentenceTransformer(model_name, device="cpu"), config)
+
+    start = time.perf_counter()
+    expected = model.encode(expected_texts, batch_size=32, convert_to_numpy=True)
+    batch_seconds = time.perf_counter() - start
+
+    candidate_embeddings = model.encode([text for _, _, text in candidates], batch_size=32, convert_to_numpy=True)
+    similarities = np.array([
+        cosine_similarity(expected[row], embedding)
+        for (row, _, _), embedding in zip(candidates, candidate_embeddings)
+    ])
+
+    single = []
+    for text in expected_texts[:50]:
+        start = time.perf_counter()
+        model.encode(text, convert_to_numpy=True)
+        single.append(time.perf_counter() - start)
+
+    return similarities, {
+        "config": config.as_dict(),
+        "batch_encode_ms_per_item": round(batch_seconds / len(expected_texts) * 1000, 3),
+        "single_encode_ms_p50": round(float(np.percentile(single, 50)) * 1000, 3),
+        "single_encode_ms_p95": round(float(np.percentile(single, 95)) * 1000, 3),
+        "weight_bytes": weight_bytes(model)
+    }
+
+def agreement(reference, other):
+    # Same scaling as TechnicalEvaluator.evaluate_technical_answer
+    reference_correctness = np.round(reference * 10, 2)
+    other_correctness = np.round(other * 10, 2)
+    similarity_delta = np.abs(other - reference)
+    correctness_delta = np.abs(other_correctness - reference_correctness)
+    return {
+        "count": int(len(reference)),
+        "semantic_similarity_mean_abs_delta": round(float(similarity_delta.mean()), 5),
+        "semantic_similarity_max_abs_delta": round(float(similarity_delta.max()), 5),
+        "correctness_mean_abs_delta": round(float(correctness_delta.mean()), 4),
+        "correctness_p95_abs_delta": round(float(np.percentile(correctness_delta, 95)), 4),
+        "correctness_max_abs_delta": round(float(correctness_delta.max()), 4),
+        "pearson_r": round(float(np.corrcoef(reference, other)[0, 1]), 5)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="fp32 vs int8 semantic encoder calibration report")
+    parser.add_argument("--model", default=os.environ.get("SEMANTIC_MODEL_NAME", "all-mpnet-base-v2"))
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--max-seq-length", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=640, help="question bank rows to use")
+    parser.add_argument("--output", default="benchmarks/results/quantization_report.json")
+    args = parser.parse_args()
+
+    bank = pd.read_csv("model/model_b_full_labels.csv")
+    candidates = build_candidates(bank, args.limit)
+    expected_texts = bank["expected_answer"].astype(str).tolist()
+
+    print(f"Scoring {len(candidates)} candidate answers against {len(expected_texts)} expected answers...")
+    reference, fp32_stats = score_mode(
+        args.model, InferenceConfig("fp32", args.threads, args.max_seq_length), expected_texts, candidates
+    )
+    quantized, int8_stats = score_mode(
+        args.model, InferenceConfig("int8", args.threads, args.max_seq_length), expected_texts, candidates
+    )
+
+    kinds = np.array([kind for _, kind, _ in candidates])
+    report = {
+        "model": args.model,
+        "modes": {"fp32": fp32_stats, "int8": int8_stats},
+        "agreement": agreement(reference, quantized),
+        "agreement_by_kind": {
+            kind: agreement(reference[kinds == kind], quantized[kinds == kind]) for kind in sorted(set(kinds))
+        }
+    }
+
+    print(f"\n{'mode':<6} {'batch ms/item':>14} {'single p50 ms':>14} {'single p95 ms':>14} {'weights MB':>11}")
+    for mode, stats in report["modes"].items():
+        print(f"{mode:<6} {stats['batch_encode_ms_per_item']:>14} {stats['single_encode_ms_p50']:>14} "
+              f"{stats['single_encode_ms_p95']:>14} {stats['weight_bytes'] / 1e6:>11.1f}")
+    print(f"\n{'candidates':<16} {'sim mean Δ':>10} {'corr mean Δ':>11} {'corr p95 Δ':>10} {'corr max Δ':>10} {'pearson':>8}")
+    for kind, stats in [("all", report["agreement"])] + list(report["agreement_by_kind"].items()):
+        print(f"{kind:<16} {stats['semantic_similarity_mean_abs_delta']:>10} {stats['correctness_mean_abs_delta']:>11} "
+              f"{stats['correctness_p95_abs_delta']:>10} {stats['correctness_max_abs_delta']:>10} {stats['pearson_r']:>8}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
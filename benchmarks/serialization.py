@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Response serialization cost, before and after typed records.
+
+"Before" is the previous path kept here as a reference: a recursive
+``convert_numpy_types`` pass over a dict payload followed by stdlib
+``json.dumps`` with an isinstance-heavy ``default`` hook. "After" is the
+record payload serialized in one pass by ``utils.json_encoder.dumps``
+(orjson when installed). Both are compared with the end-to-end latency of
+the same requests to show the serialization share.
+
+    python benchmarks/serialization.py [--requests 300] [--encoder hashing]
+        [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import use_repo_root, load_datasets, summarize, save_results, compare
+
+def reference_convert_numpy_types(obj):
+    """The recursive pre-conversion pass the routes used to run"""
+    import numpy as np
+    if isinstance(obj, dict):
+        return {key: reference_convert_numpy_types(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [reference_convert_numpy_types(item) for item in obj]
+    elif isinstance(obj, (np.integer, np.int64, np.int32)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64, np.float32)):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif hasattr(obj, 'item'):
+        return obj.item()
+    else:
+        return obj
+
+def reference_json_serializer(obj):
+    """The ``default`` hook of the previous JSON provider"""
+    import numpy as np
+    import pandas as pd
+    if isinstance(obj, (np.integer, np.int64, np.int32)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64, np.float32)):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, (pd.Timestamp, pd.DatetimeIndex)):
+        return obj.isoformat()
+    elif hasattr(obj, 'item'):
+        return obj.item()
+    elif hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def reference_dumps(payload):
+    return json.dumps(reference_convert_numpy_types(payload), default=reference_json_serializer,
+                      separators=(",", ":"))
+
+def nested_dict(record):
+    """The dict payload the routes used to build for the same record"""
+    from utils.records import Record
+    if isinstance(record, Record):
+        return {name: nested_dict(getattr(record, name)) for name in record.__slots__}
+    return record
+
+def time_calls(fn, payloads, repeat):
+    latencies = []
+    for _ in range(repeat):
+        for payload in payloads:
+            start = time.perf_counter()
+            fn(payload)
+            latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization share of request latency")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5, help="serialization passes per payload")
+    parser.add_argument("--encoder", default="hashing")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    use_repo_root()
+    os.environ["SEMANTIC_MODEL_NAME"] = args.encoder
+    os.environ["MODEL_PRELOAD"] = "lazy"
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+
+    import app
+    from utils.json_encoder import dumps, orjson
+    from utils.model_registry import registry
+    from utils.records import EvaluationResponse
+    from utils.technical_evaluator import technical_evaluator
+
+    registry.load_all()
+    client = app.app.test_client()
+    _, bank = load_datasets()
+    rows = bank.to_dict("records")
+
+    # Real payloads, and the end-to-end latency of the requests producing them
+    questions, evaluations, request_latencies = [], [], []
+    for i in range(args.requests):
+        question = technical_evaluator.get_question_by_id(i % len(rows))
+        answer = " ".join(question.expected_answer.split()[: 5 + i % 30])
+        body = {**question.to_dict(), "level": "associate", "answer": answer}
+        start = time.perf_counter()
+        client.post("/technical/evaluation", json=body)
+        request_latencies.append(time.perf_counter() - start)
+        questions.append(question)
+        evaluations.append(EvaluationResponse(
+            technical_evaluator.get_comprehensive_evaluation(question.to_dict(), answer, "associate"),
+            question.question, "associate", "technical"
+        ))
+
+    request = summarize(request_latencies)
+    results = {
+        "technical_evaluation_request": request,
+        "question_before": time_calls(reference_dumps, [nested_dict(q) for q in questions], args.repeat),
+        "question_after": time_calls(dumps, questions, args.repeat),
+        "evaluation_before": time_calls(reference_dumps, [nested_dict(e) for e in evaluations], args.repeat),
+        "evaluation_after": time_calls(dumps, evaluations, args.repeat),
+    }
+
+    print(f"JSON backend: {'orjson' if orjson else 'stdlib json'}")
+    for name, summary in results.items():
+        share = ""
+        if name.startswith("evaluation_"):
+            share = f"  ({summary['p50_ms'] / request['p50_ms'] * 100:.2f}% of request p50)"
+        print(f"{name:<30} p50 {summary['p50_ms']:>9} ms  p95 {summary['p95_ms']:>9} ms{share}")
+
+    output = save_results("serialization", {
+        "config": {"requests": args.requests, "encoder": args.encoder, "orjson": orjson is not None},
+        "stages": results
+    }, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare({"stages": results}, args.compare, "stages")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Per-stage micro-benchmarks of the scoring pipeline.
+
+Times each stage on its own over realistic inputs: statistical features,
+TF-IDF transform, per-model scaler transform and predict, semantic encode
+(single text and batch), next-complexity predict (fast path and the
+original pipeline) and question selection.
+Uses the deterministic ``hashing`` stand-in encoder unless --encoder names
+a real model.
+
+    python benchmarks/stages.py [--iterations 200] [--encoder hashing]
+        [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import use_repo_root, load_datasets, summarize, save_results, compare
+
+def time_calls(fn, inputs, iterations):
+    latencies = []
+    for i in range(iterations):
+        item = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of each scoring stage")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--encoder", default="hashing")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    use_repo_root()
+    os.environ["SEMANTIC_MODEL_NAME"] = args.encoder
+    os.environ["RESULT_CACHE_ENABLED"] = "0"
+
+    import numpy as np
+    import pandas as pd
+    from utils.model_loader import load_model
+    from utils.features import extract_statistical_features
+    from utils.technical_evaluator import technical_evaluator
+
+    softskill, bank = load_datasets()
+    rng = random.Random(args.seed)
+    answers = softskill["Answer"].astype(str).tolist()
+    rng.shuffle(answers)
+    bank_rows = bank.to_dict("records")
+
+    bundle = load_model()
+    vectorizer = bundle["tfidf_vectorizer"]
+    input_vectors = [
+        np.hstack((
+            np.array(list(extract_statistical_features(answer).values())).reshape(1, -1),
+            vectorizer.transform([answer]).toarray()
+        ))
+        for answer in answers[:50]
+    ]
+    semantic_model = technical_evaluator.semantic_model
+    complexity_model = technical_evaluator.complexity_model
+
+    stages = {
+        "features": time_calls(extract_statistical_features, answers, args.iterations),
+        "tfidf_transform": time_calls(lambda answer: vectorizer.transform([answer]).toarray(), answers, args.iterations),
+    }
+    for key in bundle["models"]:
+        scaler, model = bundle["scalers"][key], bundle["models"][key]
+        stages[f"scaler_{key}"] = time_calls(scaler.transform, input_vectors, args.iterations)
+        scaled = [scaler.transform(vector) for vector in input_vectors]
+        stages[f"predict_{key}"] = time_calls(model.predict, scaled, args.iterations)
+
+    stages["encode_single"] = time_calls(
+        lambda answer: semantic_model.encode(answer, convert_to_numpy=True), answers, args.iterations
+    )
+    batches = [answers[i:i + 32] for i in range(0, len(answers) - 32, 32)]
+    stages["encode_batch32"] = time_calls(
+        lambda batch: semantic_model.encode(batch, convert_to_numpy=True), batches, max(1, args.iterations // 10)
+    )
+    stages["complexity_predict"] = time_calls(
+        lambda row: technical_evaluator.predict_next_complexity(
+            row["question_text"], row["expected_answer"], rng.uniform(0, 10), row["complexity_score"], "associate"
+        ),
+        bank_rows, args.iterations
+    )
+    # The original DataFrame path through the sklearn pipeline, for comparison
+    stages["complexity_pipeline"] = time_calls(
+        lambda row: complexity_model.predict(pd.DataFrame([{
+            "qa_text": row["question_text"] + " " + row["expected_answer"],
+            "complexity_score": row["complexity_score"],
+            "answer_quality_score": rng.uniform(0, 1),
+            "experience_encoded": 1
+        }])),
+        bank_rows, args.iterations
+    )
+    skills = sorted(bank["technology"].astype(str).str.lower().unique())
+    stages["question_selection"] = time_calls(
+        lambda _: technical_evaluator.get_technical_question("associate", rng.sample(skills, 2), rng.uniform(1, 8)),
+        [None], args.iterations
+    )
+
+    for name, summary in stages.items():
+        print(f"{name:<44} p50 {summary['p50_ms']:>9} ms  p95 {summary['p95_ms']:>9} ms")
+
+    output = save_results("stages", {
+        "config": {"iterations": args.iterations, "encoder": args.encoder, "seed": args.seed},
+        "stages": stages
+    }, args.output)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare({"stages": stages}, args.compare, "stages")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Resident memory of a prefork server's master and workers.
+
+Reads /proc/<pid>/smaps_rollup (Linux) for the master and each child:
+RSS counts shared pages in full, PSS splits them between the processes
+sharing them, and USS (private pages) is what each extra worker costs.
+
+    gunicorn -c gunicorn.conf.py app:app &
+    python benchmarks/worker_memory.py --pid <master pid> [--output mem.json]
+"""
+
+import argparse
+import json
+import os
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+def read_rollup(pid):
+    """Memory counters of one process, in MiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+        for line in f:
+            parts = line.split()
+            key = parts[0].rstrip(":")
+            if key in FIELDS:
+                values[key] = int(parts[1]) / 1024.0
+    values["Uss"] = values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0)
+    return values
+
+def children_of(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Field 4 (after the parenthesised command) is the parent pid
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        if parent == pid:
+            children.append(int(entry))
+    return sorted(children)
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker resident memory of a prefork server")
+    parser.add_argument("--pid", type=int, required=True, help="master process id")
+    parser.add_argument("--output", default=None, help="optional JSON output path")
+    args = parser.parse_args()
+
+    processes = [("master", args.pid)] + [("worker", pid) for pid in children_of(args.pid)]
+    rows = [(role, pid, read_rollup(pid)) for role, pid in processes]
+
+    print(f"{'role':<7} {'pid':>7} {'RSS MiB':>9} {'PSS MiB':>9} {'USS MiB':>9} {'shared MiB':>11}")
+    for role, pid, mem in rows:
+        shared = mem.get("Shared_Clean", 0.0) + mem.get("Shared_Dirty", 0.0)
+        print(f"{role:<7} {pid:>7} {mem['Rss']:>9.1f} {mem['Pss']:>9.1f} {mem['Uss']:>9.1f} {shared:>11.1f}")
+
+    workers = [mem for role, _, mem in rows if role == "worker"]
+    summary = {
+        "workers": len(workers),
+        "total_pss_mib": round(sum(mem["Pss"] for _, _, mem in rows), 1),
+        "mean_worker_rss_mib": round(sum(m["Rss"] for m in workers) / len(workers), 1) if workers else 0.0,
+        "mean_worker_uss_mib": round(sum(m["Uss"] for m in workers) / len(workers), 1) if workers else 0.0,
+    }
+    print(f"\nTotal PSS: {summary['total_pss_mib']} MiB across {len(rows)} processes; "
+          f"each worker adds ~{summary['mean_worker_uss_mib']} MiB private memory")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"processes": [{"role": r, "pid": p, **m} for r, p, m in rows], "summary": summary}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
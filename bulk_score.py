@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Offline bulk scoring of historical answers, without the Flask app.
+
+Reads a CSV or Parquet file in chunks of records (the same fields as
+POST /bulk/evaluation: type, level, question or question_id, answer, and
+optionally id, expected_answer, complexity_score, technology,
+bloom_label), scores the chunks on a pool of worker processes that each
+load the models once, and appends one NDJSON result per row to the output
+file in input order.
+
+Every few chunks the output is flushed and a checkpoint is written next to
+it; running the same command again resumes after the last checkpoint
+without rescoring finished rows.
+
+    python bulk_score.py answers.csv results.ndjson [--workers N]
+        [--chunk-size 256] [--checkpoint-every 4] [--type technical]
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+import multiprocessing
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+CHECKPOINT_VERSION = 1
+
+def iter_chunks(path, chunk_size, default_type=None):
+    """Lists of record dicts from a CSV or Parquet file, ``chunk_size`` rows at a time"""
+    import pandas as pd
+
+    if path.endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet needs pyarrow: pip install pyarrow")
+        frames = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    else:
+        frames = pd.read_csv(path, chunksize=chunk_size)
+
+    for frame in frames:
+        records = []
+        for row in frame.to_dict("records"):
+            record = {key: value for key, value in row.items() if not pd.isna(value)}
+            if default_type and "type" not in record:
+                record["type"] = default_type
+            records.append(record)
+        yield records
+
+_grader = None
+
+def init_worker(workers, chunk_size):
+    """Load every model once per worker process"""
+    global _grader
+    from utils.serving import configure_worker
+    from utils.model_loader import load_model
+    from utils.model_registry import registry
+    from utils.technical_evaluator import technical_evaluator
+    from utils.bulk_grading import BulkGrader
+
+    configure_worker(workers)
+    registry.load_all()
+    bundle = load_model()
+    communication = (
+        bundle["models"], bundle["tfidf_vectorizer"], bundle["scalers"], bundle["experience_indicators"],
+        bundle["digest"]
+    )
+    # The grader clamps its batch size to 1..BULK_MAX_CHUNK_SIZE; larger chunks are graded in batches
+    _grader = BulkGrader(technical_evaluator, lambda: communication, chunk_size)
+
+def score_chunk(records, start):
+    """NDJSON lines for one chunk, indexed by input row"""
+    from utils.json_encoder import dumps
+    return [dumps(result) for result in _grader.grade(records, start=start)]
+
+def input_fingerprint(path, chunk_size):
+    stat = os.stat(path)
+    return {
+        "input": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "chunk_size": chunk_size
+    }
+
+def load_checkpoint(checkpoint_path, fingerprint):
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("fingerprint") != fingerprint:
+        raise SystemExit(
+            f"{checkpoint_path} belongs to a different input or chunk size; delete it to start over"
+        )
+    return checkpoint
+
+def save_checkpoint(checkpoint_path, fingerprint, chunks, rows, output_bytes):
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": CHECKPOINT_VERSION,
+            "fingerprint": fingerprint,
+            "chunks": chunks,
+            "rows": rows,
+            "output_bytes": output_bytes
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of answers offline")
+    parser.add_argument("input")
+    parser.add_argument("output", help="NDJSON results file (appended to when resuming)")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=positive_int, default=256, help="rows per task")
+    parser.add_argument("--checkpoint-every", type=positive_int, default=4, help="chunks between checkpoints")
+    parser.add_argument("--type", choices=["communication", "technical"], default=None,
+                        help="record type for rows without a 'type' column")
+    parser.add_argument("--restart", action="store_true", help="ignore any checkpoint and start over")
+    args = parser.parse_args()
+    args.input = os.path.abspath(args.input)
+    args.output = os.path.abspath(args.output)
+    # Model paths are relative to the repository root
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # Each historical answer is scored once; caching them would only cost memory
+    os.environ.setdefault("RESULT_CACHE_ENABLED", "0")
+    os.environ.setdefault("MODEL_PRELOAD", "lazy")
+
+    checkpoint_path = args.output + ".checkpoint"
+    fingerprint = input_fingerprint(args.input, args.chunk_size)
+    if args.restart and os.path.exists(checkpoint_path):
+        # Otherwise a crash before the first new checkpoint would resume from the old one
+        os.remove(checkpoint_path)
+    checkpoint = None if args.restart else load_checkpoint(checkpoint_path, fingerprint)
+    if checkpoint:
+        output_size = os.path.getsize(args.output) if os.path.exists(args.output) else None
+        if output_size is None or output_size < checkpoint["output_bytes"]:
+            # Resuming would append after a gap or missing rows; only a full rerun gives a complete file
+            found = "is missing" if output_size is None else f"has {output_size} bytes"
+            print(f"{args.output} {found} but the checkpoint expects {checkpoint['output_bytes']}; "
+                  f"discarding the checkpoint and starting over")
+            os.remove(checkpoint_path)
+            checkpoint = None
+    done_chunks = checkpoint["chunks"] if checkpoint else 0
+    done_rows = checkpoint["rows"] if checkpoint else 0
+
+    # Drop anything written after the last checkpoint; those chunks are rescored
+    output = open(args.output, "r+b" if checkpoint else "wb")
+    output.truncate(checkpoint["output_bytes"] if checkpoint else 0)
+    output.seek(0, os.SEEK_END)
+    if checkpoint:
+        print(f"Resuming after {done_rows} rows ({done_chunks} chunks)")
+
+    workers = max(1, args.workers)
+    start = time.perf_counter()
+    scored_rows = 0
+
+    def write(size, result):
+        nonlocal done_chunks, done_rows, scored_rows
+        output.write(("\n".join(result.get()) + "\n").encode("utf-8"))
+        done_chunks += 1
+        done_rows += size
+        scored_rows += size
+        if done_chunks % args.checkpoint_every == 0:
+            output.flush()
+            os.fsync(output.fileno())
+            save_checkpoint(checkpoint_path, fingerprint, done_chunks, done_rows, output.tell())
+            elapsed = time.perf_counter() - start
+            print(f"{done_rows} rows, {scored_rows / elapsed:.1f} rows/sec")
+
+    chunks = iter_chunks(args.input, args.chunk_size, args.type)
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(workers, args.chunk_size)) as pool:
+        # A bounded window of chunks in flight keeps memory flat and output in order
+        pending = collections.deque()
+        row = 0
+        for index, records in enumerate(chunks):
+            if index < done_chunks:
+                row += len(records)
+                continue
+            pending.append((len(records), pool.apply_async(score_chunk, (records, row))))
+            row += len(records)
+
+            while len(pending) >= workers * 2 or (pending and pending[0][1].ready()):
+                write(*pending.popleft())
+
+        while pending:
+            write(*pending.popleft())
+
+    output.flush()
+    os.fsync(output.fileno())
+    save_checkpoint(checkpoint_path, fingerprint, done_chunks, done_rows, output.tell())
+    output.close()
+
+    elapsed = time.perf_counter() - start
+    rate = scored_rows / elapsed if elapsed else 0.0
+    print(f"Scored {scored_rows} rows in {elapsed:.1f}s ({rate:.1f} rows/sec) with {workers} workers; "
+          f"{done_rows} rows in {args.output}")
+
+if __name__ == "__main__":
+    main()
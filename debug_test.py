@@ -8,8 +8,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.technical_evaluator import technical_evaluator
-from utils.json_encoder import convert_numpy_types
-import json
+from utils.json_encoder import dumps
 
 def test_technical_evaluator():
     """Test the technical evaluator functions"""
@@ -25,23 +24,22 @@ def test_technical_evaluator():
             current_complexity=3.0
         )
         
-        print(f"Question: {question_data['question'][:100]}...")
-        print(f"Complexity: {question_data['complexity_score']} (type: {type(question_data['complexity_score'])})")
-        print(f"Technology: {question_data['technology']} (type: {type(question_data['technology'])})")
-        print(f"Question ID: {question_data['question_id']} (type: {type(question_data['question_id'])})")
+        print(f"Question: {question_data.question[:100]}...")
+        print(f"Complexity: {question_data.complexity_score} (type: {type(question_data.complexity_score)})")
+        print(f"Technology: {question_data.technology} (type: {type(question_data.technology)})")
+        print(f"Question ID: {question_data.question_id} (type: {type(question_data.question_id)})")
         
-        # Test 2: Convert to JSON-safe format
-        print("\n2. Testing JSON conversion:")
-        safe_data = convert_numpy_types(question_data)
-        json_string = json.dumps(safe_data, indent=2)
+        # Test 2: Serialize the question record
+        print("\n2. Testing JSON serialization:")
+        json_string = dumps(question_data, indent=2)
         print("✅ JSON serialization successful!")
         print(f"JSON length: {len(json_string)} characters")
         
         # Test 3: Evaluate answer
         print("\n3. Testing answer evaluation:")
         eval_result = technical_evaluator.evaluate_technical_answer(
-            question=question_data["question"],
-            expected_answer=question_data["expected_answer"],
+            question=question_data.question,
+            expected_answer=question_data.expected_answer,
             candidate_answer="This is a test answer about technical concepts."
         )
         
@@ -51,13 +49,12 @@ def test_technical_evaluator():
         # Test 4: Full evaluation
         print("\n4. Testing comprehensive evaluation:")
         comp_eval = technical_evaluator.get_comprehensive_evaluation(
-            question_data=question_data,
+            question_data=question_data.to_dict(),
             candidate_answer="This is a comprehensive test answer with technical details.",
             experience_level="associate"
         )
         
-        safe_eval = convert_numpy_types(comp_eval)
-        eval_json = json.dumps(safe_eval, indent=2)
+        eval_json = dumps(comp_eval, indent=2)
         print("✅ Comprehensive evaluation JSON serialization successful!")
         
         print("\n🎉 All tests passed!")
@@ -0,0 +1,90 @@
+"""
+Production serving: prefork workers sharing preloaded models.
+
+    gunicorn -c gunicorn.conf.py app:app
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker asgi:app   (async, see asgi.py)
+
+The master imports the app and loads every model, index and question bank
+once (``preload_models``), then forks the workers. Read-only weights and
+arrays stay shared copy-on-write, the expected-answer embedding index is
+memory-mapped, and each worker limits torch to ``cores / workers`` intra-op
+threads so workers do not oversubscribe the CPU.
+
+Environment:
+    WEB_CONCURRENCY        number of workers (default: CPU count)
+    WORKER_THREADS         request threads per worker (default: 4); under asgi:app the
+                           pools are sized by ASGI_INFERENCE_WORKERS, ASGI_UPLOAD_WORKERS
+                           and ASGI_WORKERS
+    WORKER_TORCH_THREADS   torch threads per worker (default: cores / workers)
+    BIND                   listen address (default: 0.0.0.0:5000)
+    METRICS_ENABLED        record /metrics (default: 1). Samples carry a pid label; each
+                           worker counts its own requests, so set METRICS_DIR (a directory
+                           writable by the workers) for a scrape of any worker to include
+                           every live worker's samples, at most METRICS_SNAPSHOT_SECONDS old
+                           (default: 5). Without it a scrape reports one random worker
+    ASSESSMENT_STORE       memory (one store per worker) or sqlite (file: ASSESSMENT_DB_PATH);
+                           sqlite by default with more than one worker, as a session must
+                           be visible to whichever worker gets its next request
+    ANSWER_MAX_CHARS       longest answer accepted for evaluation (default: 20000);
+                           longer ones get 413, so one request's work stays bounded
+                           (client-supplied questions and expected answers too);
+                           BATCH_MAX_ITEMS caps answers per batch request (default: 256)
+    INFERENCE_SLOTS        concurrent evaluations per worker (default here: 1, as each
+                           worker already gets cores / workers torch threads); more
+                           wait in bounded interactive/bulk queues (ADMISSION_QUEUE_*)
+                           or get 429/503 with Retry-After
+    HOT_RELOAD_WATCH       1 to reload banks and models in every worker when their
+                           files change (POST /admin/reload, enabled by RELOAD_TOKEN,
+                           only reaches one worker)
+    DRAFT_MAX_SESSIONS     draft sessions kept per worker (default: 1000, idle ones
+                           expire after DRAFT_TTL_SECONDS); a draft held by another
+                           worker is rebuilt from the full text, so send "text", not
+                           "append", unless requests stick to one worker ("append"
+                           to a draft the worker does not hold gets 409)
+    PROFILE_TOKEN          profile an evaluation request sent with a matching
+                           X-Profile-Token header; PROFILE_SAMPLE_RATE profiles a
+                           fraction of them. Stacks and top frames go to PROFILE_DIR,
+                           at most PROFILE_MAX_PER_MINUTE per worker; unset, no cost
+    SEMANTIC_TIERS         encoder tiers, e.g. "fast=models/minilm,accurate=all-mpnet-base-v2";
+                           every tier is preloaded and shared, so budget memory for each.
+                           Fit calibrations with benchmarks/encoder_tiers.py --fit
+
+Measure resident memory per worker with:
+    python benchmarks/worker_memory.py --pid <master pid>
+"""
+
+import os
+
+# The master loads models synchronously; no background loader thread before fork
+os.environ.setdefault("MODEL_PRELOAD", "lazy")
+# One inference slot per worker; slots plus the queue stay below WORKER_THREADS so cheap routes get a thread
+os.environ.setdefault("INFERENCE_SLOTS", "1")
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1))
+# Assessment sessions must be shared between workers; set before the app is imported
+if workers > 1:
+    if os.environ.setdefault("ASSESSMENT_STORE", "sqlite").strip().lower() == "memory":
+        print(f"ASSESSMENT_STORE=memory with {workers} workers: a session is only found by the worker that started it")
+threads = int(os.environ.get("WORKER_THREADS", 4))
+worker_class = "gthread"
+preload_app = True
+timeout = 120
+
+def on_starting(server):
+    from utils.serving import preload_models
+    preload_models()
+    server.log.info("Models preloaded in master pid %s", os.getpid())
+
+def post_fork(server, worker):
+    from utils.serving import configure_worker
+    torch_threads = configure_worker(server.cfg.workers)
+    server.log.info("Worker %s using %s torch threads", worker.pid, torch_threads)
+
+    from utils.metrics import metrics
+    metrics.start_snapshots()
+
+    from utils.hot_reload import HOT_RELOAD_WATCH
+    if HOT_RELOAD_WATCH:
+        from app import reloader
+        reloader.start_watching()
@@ -0,0 +1,183 @@
+import collections
+import contextlib
+import math
+import os
+import threading
+import time
+from utils.metrics import metrics
+
+LANES = ("interactive", "bulk")
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+# Concurrent CPU-heavy evaluations per process; keep slots x torch threads near the cores available
+INFERENCE_SLOTS = int(os.environ.get("INFERENCE_SLOTS", os.cpu_count() or 1))
+# Slots bulk work may hold at once, so interactive requests always find one soon
+BULK_SLOTS = int(os.environ.get("ADMISSION_BULK_SLOTS", 0)) or max(1, INFERENCE_SLOTS // 2)
+# Waiters per lane beyond which requests get 429; keep slots + queue below the server's request threads
+QUEUE_LIMITS = {
+    "interactive": int(os.environ.get("ADMISSION_QUEUE_INTERACTIVE", 2 * INFERENCE_SLOTS)),
+    "bulk": int(os.environ.get("ADMISSION_QUEUE_BULK", INFERENCE_SLOTS))
+}
+# Longest a request may wait for a slot; a request can ask for less (X-Request-Deadline-Ms)
+DEADLINES = {
+    "interactive": float(os.environ.get("ADMISSION_DEADLINE_MS", 2000)) / 1000.0,
+    "bulk": float(os.environ.get("ADMISSION_BULK_DEADLINE_MS", 60000)) / 1000.0
+}
+
+# Weight of the newest hold time in the service-time estimate
+_EWMA_ALPHA = 0.2
+
+rejections_total = metrics.counter(
+    "admission_rejected_total", "Requests turned away by admission control", ("lane", "reason")
+)
+wait_seconds = metrics.histogram(
+    "admission_wait_seconds", "Time spent waiting for an inference slot", ("lane",)
+)
+
+class Rejected(Exception):
+    """No slot is available in time: 429 when the queue is full, 503 when the deadline cannot be met"""
+
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+class _Waiter:
+    __slots__ = ("lane", "event", "granted")
+
+    def __init__(self, lane):
+        self.lane = lane
+        self.event = threading.Event()
+        self.granted = False
+
+class AdmissionController:
+    """Fixed inference slots with priority lanes, bounded queues and deadlines.
+
+    A request holds a slot while it runs CPU-heavy evaluation. When all are
+    busy it queues in its lane; a freed slot goes to the oldest interactive
+    waiter first, and to bulk only while bulk holds fewer than
+    ``bulk_slots``. A full lane is rejected at once (429), and so is a
+    request whose estimated wait exceeds its deadline (503); a request still
+    queued at its deadline gets 503 too. Rejections carry a Retry-After
+    estimated from recent hold times.
+    """
+
+    def __init__(self, slots=INFERENCE_SLOTS, bulk_slots=BULK_SLOTS, queue_limits=None, deadlines=None,
+                 enabled=ADMISSION_ENABLED):
+        self.enabled = enabled
+        self.slots = max(1, int(slots))
+        self.bulk_slots = max(1, min(int(bulk_slots), self.slots))
+        self.queue_limits = dict(QUEUE_LIMITS, **(queue_limits or {}))
+        self.deadlines = dict(DEADLINES, **(deadlines or {}))
+        self._lock = threading.Lock()
+        self._waiting = {lane: collections.deque() for lane in LANES}
+        self._in_use = {lane: 0 for lane in LANES}
+        # Recent hold time per lane (EWMA); bulk chunks hold far longer than one answer
+        self._service_seconds = {lane: None for lane in LANES}
+
+    @contextlib.contextmanager
+    def slot(self, lane="interactive", deadline=None):
+        """Hold an inference slot for the block; ``deadline`` is seconds to wait at most"""
+        if not self.enabled:
+            yield
+            return
+        self.acquire(lane, deadline)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(lane, time.perf_counter() - start)
+
+    def acquire(self, lane="interactive", deadline=None):
+        """Take a slot, waiting in ``lane`` up to the deadline; raises Rejected"""
+        limit = self.deadlines[lane]
+        timeout = limit if deadline is None else max(0.0, min(float(deadline), limit))
+        start = time.perf_counter()
+
+        with self._lock:
+            if self._can_run(lane) and not self._waiting[lane] and \
+                    (lane == "interactive" or not self._waiting["interactive"]):
+                self._in_use[lane] += 1
+                wait_seconds.observe(0.0, lane=lane)
+                return
+            self._check_queue(lane, timeout)
+            waiter = _Waiter(lane)
+            self._waiting[lane].append(waiter)
+
+        waiter.event.wait(timeout)
+        with self._lock:
+            if not waiter.granted:
+                self._waiting[lane].remove(waiter)
+                self._reject(lane, 503, "deadline", "no inference slot became free before the deadline")
+        wait_seconds.observe(time.perf_counter() - start, lane=lane)
+
+    def admit(self, lane):
+        """Check, without queueing, that ``lane`` is accepting work; raises Rejected"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._can_run(lane):
+                self._check_queue(lane, self.deadlines[lane])
+
+    def release(self, lane, held_seconds=None):
+        with self._lock:
+            self._in_use[lane] -= 1
+            if held_seconds is not None:
+                previous = self._service_seconds[lane]
+                self._service_seconds[lane] = held_seconds if previous is None \
+                    else previous + _EWMA_ALPHA * (held_seconds - previous)
+            # Hand the slot straight to the next waiter, interactive first
+            for next_lane in LANES:
+                if self._waiting[next_lane] and self._can_run(next_lane):
+                    waiter = self._waiting[next_lane].popleft()
+                    waiter.granted = True
+                    self._in_use[next_lane] += 1
+                    waiter.event.set()
+                    break
+
+    def _can_run(self, lane):
+        if sum(self._in_use.values()) >= self.slots:
+            return False
+        return lane != "bulk" or self._in_use["bulk"] < self.bulk_slots
+
+    def _check_queue(self, lane, timeout):
+        """Called with the lock held before queueing"""
+        waiting = len(self._waiting[lane])
+        if waiting >= self.queue_limits[lane]:
+            self._reject(lane, 429, "queue_full", f"the {lane} queue is full")
+        if self._estimated_wait(lane, waiting) > timeout:
+            self._reject(lane, 503, "deadline", "the estimated wait exceeds the deadline")
+
+    def _estimated_wait(self, lane, ahead):
+        service_seconds = self._service_seconds[lane]
+        if service_seconds is None:
+            return 0.0
+        if lane == "bulk":
+            ahead += len(self._waiting["interactive"])
+            slots = self.bulk_slots
+        else:
+            slots = self.slots
+        return service_seconds * (ahead + 1) / slots
+
+    def _reject(self, lane, status, reason, message):
+        rejections_total.inc(lane=lane, reason=reason)
+        retry_after = max(1, math.ceil(self._estimated_wait(lane, len(self._waiting[lane]))))
+        raise Rejected(status, message, retry_after)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "slots": self.slots,
+                "bulk_slots": self.bulk_slots,
+                "in_use": dict(self._in_use),
+                "waiting": {lane: len(waiting) for lane, waiting in self._waiting.items()},
+                "queue_limits": dict(self.queue_limits),
+                "deadline_seconds": dict(self.deadlines),
+                "service_seconds": {
+                    lane: round(seconds, 4) if seconds is not None else None
+                    for lane, seconds in self._service_seconds.items()
+                }
+            }
@@ -0,0 +1,330 @@
+import asyncio
+import contextvars
+import io
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import record_error
+
+_END = object()
+
+class ExecutorPool:
+    """A fixed pool of worker threads, with a count of the calls queued or running on it.
+
+    With ``max_requests``, requests beyond that many at once are turned
+    away (503) instead of waiting unseen in the executor's queue.
+    """
+
+    def __init__(self, name, workers, max_requests=0):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_requests = max(0, int(max_requests))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"asgi-{name}")
+        # Only touched on the event loop thread
+        self.pending = 0
+        self.requests = 0
+        self.rejected = 0
+
+    @property
+    def full(self):
+        return bool(self.max_requests) and self.requests >= self.max_requests
+
+    async def run(self, context, fn, *args):
+        """Run ``fn(*args)`` on the pool inside ``context`` (the request's contextvars)"""
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, context.run, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "requests": self.requests,
+            "max_requests": self.max_requests,
+            "rejected": self.rejected
+        }
+
+class _UploadStream(io.RawIOBase):
+    """Request body read by a worker thread while the client is still sending it.
+
+    The event loop tops the buffer up to ``read_ahead`` bytes (``fill``)
+    before each step of the app, so the thread reads what has already
+    arrived. Only when a step needs more than that does the thread wait
+    for the next message from the loop.
+    """
+
+    def __init__(self, receive, loop, read_ahead):
+        self._receive = receive
+        self._loop = loop
+        self.read_ahead = read_ahead
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._more = True
+        self._disconnected = False
+        # A read from a thread and a fill on the loop must not both wait on receive
+        self._receiving = asyncio.Lock()
+
+    def readable(self):
+        return True
+
+    async def fill(self):
+        """Receive on the loop until ``read_ahead`` bytes are buffered or the body has ended"""
+        while self._more and len(self._buffer) < self.read_ahead:
+            await self._receive_one()
+
+    async def _receive_one(self):
+        async with self._receiving:
+            if not self._more:
+                return
+            message = await self._receive()
+            with self._lock:
+                if message["type"] == "http.disconnect":
+                    self._more, self._disconnected = False, True
+                    return
+                self._buffer += message.get("body", b"")
+                self._more = message.get("more_body", False)
+
+    def readinto(self, buffer):
+        while True:
+            with self._lock:
+                if self._buffer or not self._more:
+                    if self._disconnected:
+                        raise OSError("client disconnected during the upload")
+                    size = min(len(buffer), len(self._buffer))
+                    buffer[:size] = self._buffer[:size]
+                    del self._buffer[:size]
+                    return size
+            # Ran past the read-ahead: wait for the client
+            asyncio.run_coroutine_threadsafe(self._receive_one(), self._loop).result()
+
+class _BodyTooLarge(Exception):
+    pass
+
+class WSGIExecutorBridge:
+    """ASGI front for a WSGI app whose handlers run on fixed thread pools.
+
+    The event loop owns every connection: it reads request bodies, writes
+    responses and waits on slow clients without holding a thread. Only a
+    complete request is handed to a pool thread, which runs the WSGI app and
+    returns; streamed responses take a thread per chunk they produce.
+    ``choose_pool(method, path)`` names the pool for a request, so CPU-heavy
+    routes get a small dedicated pool and cheap ones cannot queue behind
+    them. Bodies are buffered up to ``max_body_bytes`` (413 beyond it),
+    except on ``streaming_uploads`` paths, which the app reads while the
+    client is still sending: the loop reads up to ``upload_read_ahead``
+    bytes ahead of the app, and a thread waits on the client only past
+    that. Route those paths to a pool of their own with ``max_requests``
+    so slow uploaders never hold threads other requests need.
+    """
+
+    def __init__(self, wsgi_app, pools, choose_pool, max_body_bytes, streaming_uploads=(),
+                 upload_read_ahead=1024 * 1024, on_shutdown=None):
+        self.wsgi_app = wsgi_app
+        self.pools = {pool.name: pool for pool in pools}
+        self.choose_pool = choose_pool
+        self.max_body_bytes = max_body_bytes
+        self.streaming_uploads = tuple(streaming_uploads)
+        self.upload_read_ahead = upload_read_ahead
+        self.on_shutdown = on_shutdown
+        # Requests accepted and not yet answered (only touched on the event loop thread)
+        self.open_requests = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.open_requests += 1
+            try:
+                await self._http(scope, receive, send)
+            finally:
+                self.open_requests -= 1
+        elif scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 1003})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.on_shutdown is not None:
+                    self.on_shutdown()
+                for pool in self.pools.values():
+                    pool.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        pool = self.pools[self.choose_pool(scope["method"], scope["path"])]
+        if pool.full:
+            pool.rejected += 1
+            await self._send_json(send, 503, {"error": f"Server busy ({pool.name})", "retry_after": 1},
+                                  [(b"retry-after", b"1")])
+            return
+        pool.requests += 1
+        try:
+            await self._run(pool, scope, receive, send)
+        finally:
+            pool.requests -= 1
+
+    async def _run(self, pool, scope, receive, send):
+        path = scope["path"]
+        environ = self._environ(scope)
+        upload = None
+
+        if path.startswith(self.streaming_uploads):
+            upload = _UploadStream(receive, asyncio.get_running_loop(), self.upload_read_ahead)
+            environ["wsgi.input"] = io.BufferedReader(upload)
+        else:
+            try:
+                body = await self._read_body(receive, environ.get("CONTENT_LENGTH"))
+            except _BodyTooLarge:
+                await self._send_json(send, 413, {"error": f"request body is over {self.max_body_bytes} bytes"})
+                return
+            except ConnectionError:
+                return  # The client went away before finishing the upload
+            environ["wsgi.input"] = io.BytesIO(body)
+            environ["CONTENT_LENGTH"] = str(len(body))
+
+        # One context per request: Flask's request context lives in contextvars, and a
+        # streamed response resumes on whichever pool thread is free
+        context = contextvars.copy_context()
+        try:
+            if upload is not None:
+                await upload.fill()
+            status, headers, chunks, iterator = await pool.run(context, self._start, environ)
+        except Exception as e:
+            print(f"Error in ASGI bridge for {path}: {e}")
+            record_error("asgi_bridge")
+            await self._send_json(send, 500, {"error": str(e)})
+            return
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        try:
+            for chunk in chunks:
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            while iterator is not None:
+                if upload is not None:
+                    await upload.fill()
+                chunk = await pool.run(context, next, iterator, _END)
+                if chunk is _END:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if iterator is not None and hasattr(iterator, "close"):
+                await pool.run(context, iterator.close)
+
+    def _start(self, environ):
+        """Run the WSGI app on a pool thread; a response of known length is drained here too"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = headers
+            return response.setdefault("written", []).append
+
+        iterable = self.wsgi_app(environ, start_response)
+        streamed = not any(name.lower() == "content-length" for name, _ in response.get("headers", ()))
+        if streamed:
+            iterator = iter(iterable)
+            first = next(iterator, _END)
+            if not response:
+                raise RuntimeError("the WSGI app did not start a response")
+            chunks = response.get("written", []) + ([] if first is _END else [first])
+            if first is _END:
+                iterator = None
+                if hasattr(iterable, "close"):
+                    iterable.close()
+            elif hasattr(iterable, "close") and not hasattr(iterator, "close"):
+                iterator = _ClosingIterator(iterator, iterable.close)
+        else:
+            try:
+                chunks = response.get("written", []) + list(iterable)
+            finally:
+                if hasattr(iterable, "close"):
+                    iterable.close()
+            iterator = None
+
+        headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response["headers"]]
+        return response["status"], headers, chunks, iterator
+
+    async def _read_body(self, receive, content_length):
+        if content_length and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            raise _BodyTooLarge()
+        parts, size, more = [], 0, True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise ConnectionError("client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise _BodyTooLarge()
+            parts.append(chunk)
+            more = message.get("more_body", False)
+        return b"".join(parts)
+
+    @staticmethod
+    async def _send_json(send, status, body, headers=()):
+        payload = json.dumps(body).encode("utf-8")
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode("latin-1")),
+            *headers
+        ]})
+        await send({"type": "http.response.body", "body": payload, "more_body": False})
+
+    @staticmethod
+    def _environ(scope):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1] or 80),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": str(client[0]),
+            "REMOTE_PORT": str(client[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+            # The body ends where the ASGI messages end, with or without Content-Length
+            "wsgi.input_terminated": True
+        }
+        for raw_name, raw_value in scope.get("headers", ()):
+            name, value = raw_name.decode("latin-1").lower(), raw_value.decode("latin-1")
+            if name == "content-type":
+                key = "CONTENT_TYPE"
+            elif name == "content-length":
+                key = "CONTENT_LENGTH"
+            else:
+                key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+class _ClosingIterator:
+    """Iterator that closes the WSGI iterable it came from"""
+
+    def __init__(self, iterator, close):
+        self._iterator = iterator
+        self.close = close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
@@ -0,0 +1,375 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from utils.question_index import question_hash
+
+ASSESSMENT_STORE = os.environ.get("ASSESSMENT_STORE", "memory").strip().lower()
+ASSESSMENT_DB_PATH = os.environ.get("ASSESSMENT_DB_PATH", "model/assessment_sessions.sqlite3")
+ASSESSMENT_MAX_SESSIONS = int(os.environ.get("ASSESSMENT_MAX_SESSIONS", 10000))
+ASSESSMENT_TTL_SECONDS = float(os.environ.get("ASSESSMENT_TTL_SECONDS", 4 * 3600))
+# Attempts at a session update that keeps losing to concurrent updates from other workers
+ASSESSMENT_UPDATE_ATTEMPTS = 5
+
+class SessionConflict(Exception):
+    """A session kept changing in another worker while this one was updating it"""
+
+class AssessmentSession:
+    """Server-side state of one adaptive assessment"""
+
+    __slots__ = (
+        "session_id", "level", "skills", "type", "current_complexity", "questions_asked", "questions_answered",
+        "total_score", "asked_question_hashes", "complexity_trajectory", "scores", "pending", "created_at",
+        "updated_at", "tier"
+    )
+
+    def __init__(self, session_id, level, skills, type, current_complexity, questions_asked=0,
+                 questions_answered=0, total_score=0.0, asked_question_hashes=None, complexity_trajectory=None, scores=None,
+                 pending=None, created_at=None, updated_at=None, tier=None):
+        self.session_id = session_id
+        self.level = level
+        self.skills = list(skills)
+        self.type = type
+        self.current_complexity = float(current_complexity)
+        self.questions_asked = int(questions_asked)
+        self.questions_answered = int(questions_answered)
+        self.total_score = float(total_score)
+        # Technical questions asked, by question_hash: row ids change when the bank is reloaded
+        self.asked_question_hashes = list(asked_question_hashes or [])
+        self.complexity_trajectory = list(complexity_trajectory or [self.current_complexity])
+        self.scores = list(scores or [])
+        # The question last served and not yet scored
+        self.pending = pending
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        # Encoder tier technical answers in this session are scored with (None: the default)
+        self.tier = tier
+
+    @property
+    def average_score(self):
+        return round(self.total_score / len(self.scores), 2) if self.scores else None
+
+    def next_question_type(self):
+        # Alternate between technical and communication when the assessment covers both
+        if self.type == "both":
+            return "technical" if self.questions_asked % 2 == 0 else "communication"
+        return self.type
+
+    def summary(self):
+        """Small payload returned with every question"""
+        return {
+            "session_id": self.session_id,
+            "level": self.level,
+            "type": self.type,
+            "current_complexity": self.current_complexity,
+            "questions_asked": self.questions_asked,
+            "questions_answered": self.questions_answered,
+            "average_score": self.average_score,
+            "tier": self.tier
+        }
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Fields a session stored before an upgrade may no longer exist (e.g. asked_question_ids)
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+class MemorySessionStore:
+    """Sessions kept in process memory, LRU-bounded with an idle TTL"""
+
+    def __init__(self, max_sessions=ASSESSMENT_MAX_SESSIONS, ttl_seconds=ASSESSMENT_TTL_SECONDS):
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if self.ttl_seconds and session.updated_at + self.ttl_seconds < time.time():
+                del self._sessions[session_id]
+                self.expirations += 1
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def get_versioned(self, session_id):
+        """(session, version) for ``update``; one process, so there is no version to check"""
+        return self.get(session_id), None
+
+    def update(self, session, version):
+        """Write back a session from ``get_versioned``; SessionEngine's locks already serialize updates"""
+        self.put(session)
+        return True
+
+    def put(self, session):
+        with self._lock:
+            self._sessions[session.session_id] = session
+            self._sessions.move_to_end(session.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": "memory",
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+class SQLiteSessionStore:
+    """Sessions in a local SQLite file, shared by every worker process on the host.
+
+    Each row carries a version, bumped by every ``update``: an update of a
+    session another process changed since it was read matches no row and
+    returns False, so the caller rereads and retries instead of
+    overwriting the other worker's change.
+    """
+
+    def __init__(self, path=ASSESSMENT_DB_PATH, max_sessions=ASSESSMENT_MAX_SESSIONS,
+                 ttl_seconds=ASSESSMENT_TTL_SECONDS):
+        self.path = path
+        self.max_sessions = max(1, int(max_sessions))
+        self.ttl_seconds = ttl_seconds
+        self._last_prune = 0.0
+        # One connection per thread; connections must not cross fork or threads
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at)")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+            if "version" not in columns:
+                conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, session_id):
+        return self.get_versioned(session_id)[0]
+
+    def get_versioned(self, session_id):
+        """(session, version), or (None, None) when there is no live session"""
+        row = self._connection().execute(
+            "SELECT data, updated_at, version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        if self.ttl_seconds and row[1] + self.ttl_seconds < time.time():
+            self.delete(session_id)
+            return None, None
+        return AssessmentSession.from_dict(json.loads(row[0])), row[2]
+
+    def put(self, session):
+        """Store a new session"""
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, updated_at, version) VALUES (?, ?, ?, 0)",
+                (session.session_id, json.dumps(session.to_dict()), session.updated_at)
+            )
+        self._prune()
+
+    def update(self, session, version):
+        """Write back a session read at ``version``; False if it has changed (or gone) since"""
+        with self._connection() as conn:
+            updated = conn.execute(
+                "UPDATE sessions SET data = ?, updated_at = ?, version = version + 1 "
+                "WHERE session_id = ? AND version = ?",
+                (json.dumps(session.to_dict()), session.updated_at, session.session_id, version)
+            ).rowcount
+        self._prune()
+        return updated == 1
+
+    def _prune(self, interval=60.0):
+        # Pruning scans the table, so it runs at most once per interval
+        now = time.time()
+        if now - self._last_prune < interval:
+            return
+        self._last_prune = now
+        with self._connection() as conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM sessions WHERE session_id IN ("
+                "SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+
+    def delete(self, session_id):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def stats(self):
+        count = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "sessions": count, "max_sessions": self.max_sessions}
+
+def make_session_store(backend=ASSESSMENT_STORE):
+    """Store selected by ASSESSMENT_STORE=memory|sqlite"""
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend != "memory":
+        print(f"Unknown ASSESSMENT_STORE '{backend}', using memory")
+    return MemorySessionStore()
+
+def performance_score(last_performance):
+    """0-10 score from a number or an evaluation dict, or None; ValueError if it is neither"""
+    if last_performance is None:
+        return None
+    if isinstance(last_performance, dict):
+        for key in ("score", "technical_accuracy", "adjusted_score"):
+            if last_performance.get(key) is not None:
+                return _finite_score(last_performance[key])
+        return None
+    return _finite_score(last_performance)
+
+def _finite_score(value):
+    if isinstance(value, bool):
+        raise ValueError("last_performance must be a number")
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("last_performance must be a number or an evaluation with a numeric score")
+    if not math.isfinite(score):
+        raise ValueError("last_performance must be a finite number")
+    return score
+
+class SessionEngine:
+    """Adaptive assessments: records each score, predicts the next complexity
+    and serves the closest question not yet asked in the session."""
+
+    def __init__(self, technical_evaluator, question_store, store=None):
+        self.technical_evaluator = technical_evaluator
+        self.question_store = question_store
+        self.store = store if store is not None else make_session_store()
+        # Striped locks serialize updates to one session within this process; the store's
+        # versioned update catches concurrent updates from other workers
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def _lock_for(self, session_id):
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    def start(self, level, skills, assessment_type="both", tier=None):
+        level = level.lower()
+        if tier is not None:
+            tier = self.technical_evaluator.tier(tier).name  # UnknownTier for a bad name
+        session = AssessmentSession(
+            session_id=uuid.uuid4().hex,
+            level=level,
+            skills=skills,
+            type=assessment_type,
+            current_complexity=self.technical_evaluator.experience_starting_score.get(level, 2.0),
+            tier=tier
+        )
+        self.store.put(session)
+        return session
+
+    def get(self, session_id):
+        return self.store.get(str(session_id))
+
+    def end(self, session_id):
+        self.store.delete(str(session_id))
+        self.question_store.forget_session(session_id)
+
+    def next_question(self, session_id, last_performance=None):
+        """Score the pending question (if any) and return (session, next question), or None.
+
+        Another worker updating the same session meanwhile makes this one
+        start over from the stored session; SessionConflict if that keeps
+        happening.
+        """
+        session_id = str(session_id)
+        score = performance_score(last_performance)
+        with self._lock_for(session_id):
+            for _ in range(ASSESSMENT_UPDATE_ATTEMPTS):
+                session, version = self.store.get_versioned(session_id)
+                if session is None:
+                    return None
+                question_data = self._advance(session, score)
+                if self.store.update(session, version):
+                    return session, question_data
+        raise SessionConflict(f"session {session_id} is being updated by another request")
+
+    def _advance(self, session, score):
+        """Record ``score`` for the pending question and pick the next one, in place"""
+        session_id = session.session_id
+        if score is not None and session.pending is not None:
+            self._record(session, score)
+
+        question_type = session.next_question_type()
+        if question_type == "technical":
+            question = self.technical_evaluator.get_technical_question(
+                experience_level=session.level,
+                skills=session.skills,
+                current_complexity=session.current_complexity,
+                exclude_ids=self.asked_question_ids(session)
+            )
+            session.asked_question_hashes.append(question_hash(question.question, question.expected_answer))
+            # Kept by content so scoring it does not depend on the bank still holding the row
+            session.pending = {
+                "type": "technical",
+                "question_id": question.question_id,
+                "question": question.question,
+                "expected_answer": question.expected_answer,
+                "complexity_score": question.complexity_score
+            }
+            question_data = question.to_dict()
+        else:
+            question_data = {"question": self.question_store.sample(session.level, session_id=session_id)}
+            session.pending = {"type": "communication"}
+        question_data["type"] = question_type
+        session.questions_asked += 1
+
+        session.updated_at = time.time()
+        return question_data
+
+    def asked_question_ids(self, session):
+        """Current bank row ids of the technical questions the session was asked"""
+        return self.technical_evaluator.question_ids(session.asked_question_hashes)
+
+    def _record(self, session, score):
+        pending = session.pending
+        session.scores.append({"type": pending["type"], "question_id": pending.get("question_id"), "score": score})
+        session.total_score += score
+        session.questions_answered += 1
+
+        # Questions pending from before the upgrade to content-keyed sessions carry no text; they only count
+        if pending["type"] == "technical" and "expected_answer" in pending:
+            # The row id only selects a precomputed text term, and is checked against the text
+            session.current_complexity = float(self.technical_evaluator.predict_next_complexity(
+                pending["question"],
+                pending["expected_answer"],
+                score,
+                pending["complexity_score"],
+                session.level,
+                question_id=pending["question_id"]
+            ))
+            session.complexity_trajectory.append(session.current_complexity)
+        session.pending = None
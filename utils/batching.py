@@ -0,0 +1,120 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+import numpy as np
+
+class _PendingEncode:
+    """One caller's texts waiting to be encoded"""
+
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class BatchingEncoder:
+    """Micro-batches encode calls from concurrent request threads.
+
+    Callers block in ``encode`` while a single worker thread gathers pending
+    texts until ``max_batch_size`` texts are queued or ``max_wait_ms`` has
+    passed since the first one arrived, runs one ``model.encode`` over the
+    batch, and hands every caller back its own rows.
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait_ms=5.0):
+        self.model = model
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._start_worker()
+        # Threads do not survive fork; a forked worker process gets its own
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._start_worker)
+
+    def _start_worker(self):
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._batch_sizes = Counter()
+
+        self._worker = threading.Thread(target=self._run, name="batching-encoder", daemon=True)
+        self._worker.start()
+
+    def encode(self, sentences, **kwargs):
+        """Drop-in for ``SentenceTransformer.encode`` returning NumPy arrays.
+
+        Keyword arguments are accepted for signature compatibility; results
+        are always float32 NumPy arrays (1-D for a string, 2-D for a list).
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [str(text) for text in sentences]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        pending = _PendingEncode(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result[0] if single else pending.result
+
+    def stats(self):
+        """Queue depth and batch-size statistics"""
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())}
+            }
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(pending)
+                size += len(pending.texts)
+
+            self._encode_batch(batch, size)
+
+    def _encode_batch(self, batch, size):
+        texts = [text for pending in batch for text in pending.texts]
+        try:
+            embeddings = self.model.encode(texts, batch_size=self.max_batch_size, convert_to_numpy=True)
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            offset = 0
+            for pending in batch:
+                pending.result = embeddings[offset:offset + len(pending.texts)]
+                offset += len(pending.texts)
+        except Exception as e:
+            print(f"Error in batched encode: {e}")
+            for pending in batch:
+                pending.error = e
+        finally:
+            for pending in batch:
+                pending.done.set()
+
+        with self._stats_lock:
+            self._batches += 1
+            self._items += size
+            self._largest_batch = max(self._largest_batch, size)
+            self._batch_sizes[size] += 1
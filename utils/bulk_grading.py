@@ -0,0 +1,362 @@
+import csv
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from utils.evaluation_logic import evaluate_answers_batch, UnscorableAnswer
+from utils.json_encoder import dumps
+from utils.records import EvaluationResponse
+from utils.metrics import record_error
+from utils.question_selector import level_map
+from utils.input_budget import check_answer, InputTooLarge
+from utils.admission import Rejected
+
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", 64))
+BULK_MAX_CHUNK_SIZE = 512
+READ_BLOCK_SIZE = 64 * 1024
+MAX_LINE_BYTES = 1024 * 1024
+# Upload bytes received ahead of the grader kept in memory; the rest go to a temporary file
+BULK_SPOOL_MEMORY_BYTES = int(os.environ.get("BULK_SPOOL_MEMORY_BYTES", 8 * 1024 * 1024))
+
+RECORD_TYPES = ("communication", "technical")
+
+class RecordError(ValueError):
+    """A single upload record that cannot be graded"""
+
+class SpooledUpload:
+    """An upload copied into a spool by a thread of its own, read back by the grader.
+
+    Receiving the upload never waits on the response: a client that sends
+    its whole body before reading any results (as most HTTP clients do)
+    keeps sending into the spool, in memory up to ``memory_bytes`` and on
+    disk past that, instead of deadlocking against results it is not yet
+    reading. ``read`` waits only for bytes the client has not sent yet.
+    """
+
+    def __init__(self, stream, memory_bytes=BULK_SPOOL_MEMORY_BYTES, block_size=READ_BLOCK_SIZE):
+        self._spool = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+        self._condition = threading.Condition()
+        self._written = 0
+        self._read = 0
+        self._done = False
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._copy, args=(stream, block_size), name="bulk-upload", daemon=True
+        )
+        self._thread.start()
+
+    def _copy(self, stream, block_size):
+        try:
+            while True:
+                block = stream.read(block_size)
+                if not block:
+                    break
+                with self._condition:
+                    if self._closed:
+                        return
+                    self._spool.seek(self._written)
+                    self._spool.write(block)
+                    self._written += len(block)
+                    self._condition.notify_all()
+        except Exception as e:
+            with self._condition:
+                self._error = e
+        finally:
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    def read(self, size=READ_BLOCK_SIZE):
+        with self._condition:
+            while self._read == self._written and not self._done:
+                self._condition.wait()
+            if self._read == self._written:
+                if self._error is not None:
+                    raise OSError(f"upload interrupted: {self._error}")
+                return b""
+            self._spool.seek(self._read)
+            block = self._spool.read(min(size, self._written - self._read))
+            self._read += len(block)
+            return block
+
+    def close(self):
+        """Drop the spool; the copying thread stops at its next block"""
+        with self._condition:
+            self._closed = True
+            self._spool.close()
+
+def iter_lines(stream, block_size=READ_BLOCK_SIZE, max_line_bytes=MAX_LINE_BYTES):
+    """Decoded lines of a binary stream, read a bounded block at a time.
+
+    A line over ``max_line_bytes`` is skipped up to its newline and a
+    RecordError takes its place, so the records after it are still read.
+    """
+    pending = b""
+    first = True
+    skipping = False
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        if first:
+            block = block[3:] if block.startswith(b"\xef\xbb\xbf") else block  # UTF-8 BOM
+            first = False
+        if skipping:
+            end = block.find(b"\n")
+            if end < 0:
+                continue
+            block = block[end + 1:]
+            skipping = False
+        pending += block
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace") + "\n"
+        if len(pending) > max_line_bytes:
+            yield RecordError(f"line longer than {max_line_bytes} bytes, skipped")
+            pending = b""
+            skipping = True
+    if pending:
+        yield pending.decode("utf-8", errors="replace")
+
+def parse_ndjson(lines):
+    """One record per non-blank line; bad lines become RecordError items"""
+    for number, line in enumerate(lines, 1):
+        if isinstance(line, RecordError):
+            yield RecordError(f"line {number}: {line}")
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield RecordError(f"line {number}: invalid JSON ({e})")
+            continue
+        if not isinstance(record, dict):
+            yield RecordError(f"line {number}: expected a JSON object")
+            continue
+        yield record
+
+def parse_csv(lines):
+    """Rows keyed by the header line; empty cells are treated as missing.
+
+    Overlong lines reach the reader as blank lines (which it skips); their
+    RecordErrors are yielded in order before the next row.
+    """
+    skipped = []
+
+    def text_lines():
+        for line in lines:
+            if isinstance(line, RecordError):
+                skipped.append(line)
+                yield "\n"
+            else:
+                yield line
+
+    for row in csv.DictReader(text_lines()):
+        yield from skipped
+        skipped.clear()
+        yield {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+    yield from skipped
+
+def read_records(stream, fmt="ndjson"):
+    lines = iter_lines(stream)
+    return parse_csv(lines) if fmt == "csv" else parse_ndjson(lines)
+
+class BulkGrader:
+    """Grades a stream of records chunk by chunk through the batched evaluators.
+
+    Only one chunk of records and results is held at a time, so memory does
+    not grow with the upload; results are produced in input order.
+    """
+
+    def __init__(self, technical_evaluator, get_communication_bundle, chunk_size=BULK_CHUNK_SIZE, admission=None,
+                 tier=None):
+        self.technical_evaluator = technical_evaluator
+        # Encoder tier for technical records (the evaluator's default when None)
+        self.tier = tier
+        self.get_communication_bundle = get_communication_bundle
+        self.chunk_size = max(1, min(int(chunk_size), BULK_MAX_CHUNK_SIZE))
+        # Optional AdmissionController; each chunk then holds one bulk-lane slot while it is graded
+        self.admission = admission
+
+    def grade(self, records, start=0):
+        """Yield one result dict per record, indexed from ``start``"""
+        numbered = enumerate(records, start)
+        while True:
+            chunk = list(itertools.islice(numbered, self.chunk_size))
+            if not chunk:
+                return
+            if self.admission is None:
+                yield from self._grade_chunk(chunk)
+                continue
+            try:
+                with self.admission.slot("bulk"):
+                    results = list(self._grade_chunk(chunk))
+            except Rejected as e:
+                results = [self._error(index, record, e) for index, record in chunk]
+            yield from results
+
+    def stream(self, records):
+        """NDJSON lines, one write per chunk, then a summary line"""
+        start = time.perf_counter()
+        count = errors = 0
+        buffer = []
+        for result in self.grade(records):
+            count += 1
+            errors += "error" in result
+            buffer.append(dumps(result))
+            if len(buffer) >= self.chunk_size:
+                yield "\n".join(buffer) + "\n"
+                buffer = []
+        if buffer:
+            yield "\n".join(buffer) + "\n"
+        yield dumps({"summary": {
+            "records": count,
+            "errors": errors,
+            "seconds": round(time.perf_counter() - start, 3)
+        }}) + "\n"
+
+    def _grade_chunk(self, chunk):
+        results = {}
+        communication, technical = [], []
+        for index, record in chunk:
+            try:
+                if isinstance(record, RecordError):
+                    raise record
+                kind = str(record.get("type", "")).strip().lower()
+                if kind == "communication":
+                    communication.append((index, record, self._communication_input(record)))
+                elif kind == "technical":
+                    technical.append((index, record, self._technical_input(record)))
+                else:
+                    raise RecordError(f"type must be one of {', '.join(RECORD_TYPES)}")
+            except RecordError as e:
+                results[index] = self._error(index, record, e)
+
+        if communication:
+            self._grade_communication(communication, results)
+        if technical:
+            self._grade_technical(technical, results)
+
+        for index, _ in chunk:
+            yield results[index]
+
+    def _communication_input(self, record):
+        return {
+            "level": level_map.get(str(record.get("level", "")).lower(), "basic"),
+            "question": record.get("question", ""),
+            "answer": self._answer(record)
+        }
+
+    def _technical_input(self, record):
+        # Same defaults as /technical/evaluation; a question_id fills in missing bank fields
+        question_data = {
+            "question": record.get("question", ""),
+            "expected_answer": record.get("expected_answer", ""),
+            "complexity_score": record.get("complexity_score", 2.0),
+            "technology": record.get("technology", "general"),
+            "bloom_label": record.get("bloom_label", ""),
+            "question_id": None
+        }
+        if record.get("question_id") is not None:
+            try:
+                question_id = int(record["question_id"])
+                if question_id < 0:
+                    raise IndexError(question_id)
+                bank_question = self.technical_evaluator.get_question_by_id(question_id)
+            except (ValueError, IndexError):
+                raise RecordError(f"unknown question_id {record['question_id']!r}")
+            question_data["question_id"] = question_id
+            for field in ("question", "expected_answer", "complexity_score", "technology", "bloom_label"):
+                if field not in record:
+                    question_data[field] = getattr(bank_question, field)
+        try:
+            question_data["complexity_score"] = float(question_data["complexity_score"])
+        except (TypeError, ValueError):
+            raise RecordError("complexity_score must be a number")
+        for field in ("question", "expected_answer"):
+            try:
+                check_answer(str(question_data[field] or ""), field=field)
+            except InputTooLarge as e:
+                raise RecordError(str(e))
+        return {
+            "level": str(record.get("level", "intern")).lower(),
+            "question_data": question_data,
+            "answer": self._answer(record)
+        }
+
+    @staticmethod
+    def _answer(record):
+        answer = str(record.get("answer", "") or "")
+        try:
+            check_answer(answer)
+        except InputTooLarge as e:
+            raise RecordError(str(e))
+        return answer
+
+    def _grade_communication(self, items, results):
+        try:
+            models, vectorizer, scalers, experience_indicators, digest = self.get_communication_bundle()
+            evaluations = evaluate_answers_batch(
+                models, vectorizer, scalers, experience_indicators,
+                [item["answer"] for _, _, item in items], [item["level"] for _, _, item in items], digest
+            )
+        except UnscorableAnswer as e:
+            if len(items) == 1:
+                index, record, _ = items[0]
+                results[index] = self._error(index, record, e)
+                return
+            # Only that record fails; grade the rest of the chunk one by one
+            for item in items:
+                self._grade_communication([item], results)
+            return
+        except Exception as e:
+            print(f"Error in bulk communication grading: {e}")
+            record_error("bulk_communication")
+            for index, record, _ in items:
+                results[index] = self._error(index, record, e)
+            return
+        for (index, record, item), evaluation in zip(items, evaluations):
+            results[index] = self._result(
+                index, record, EvaluationResponse(evaluation, item["question"], item["level"], "communication")
+            )
+
+    def _grade_technical(self, items, results):
+        try:
+            evaluations = self.technical_evaluator.get_comprehensive_evaluations_batch(
+                [item["question_data"] for _, _, item in items],
+                [item["answer"] for _, _, item in items],
+                [item["level"] for _, _, item in items],
+                tier=self.tier
+            )
+        except Exception as e:
+            print(f"Error in bulk technical grading: {e}")
+            record_error("bulk_technical")
+            for index, record, _ in items:
+                results[index] = self._error(index, record, e)
+            return
+        for (index, record, item), evaluation in zip(items, evaluations):
+            results[index] = self._result(
+                index, record,
+                EvaluationResponse(evaluation, item["question_data"]["question"], item["level"], "technical")
+            )
+
+    @staticmethod
+    def _result(index, record, response):
+        result = {"index": index}
+        if "id" in record:
+            result["id"] = record["id"]
+        for name in response.__slots__:
+            result[name] = getattr(response, name)
+        return result
+
+    @staticmethod
+    def _error(index, record, error):
+        result = {"index": index}
+        if isinstance(record, dict) and "id" in record:
+            result["id"] = record["id"]
+        result["error"] = str(error)
+        return result
@@ -0,0 +1,96 @@
+import numpy as np
+
+TEXT_COLUMN = "qa_text"
+NUMERIC_COLUMNS = ("complexity_score", "answer_quality_score", "experience_encoded")
+
+class LinearComplexityPredictor:
+    """Pandas-free equivalent of the next-complexity pipeline.
+
+    The pipeline is TF-IDF on ``qa_text`` and a StandardScaler on three
+    numeric columns feeding a linear regressor, so a prediction is
+    ``bias + text_contribution(qa_text) + numeric_weights . numeric``.
+    The text term only depends on the question, so it is computed once per
+    bank question; the rest is three multiply-adds.
+    """
+
+    def __init__(self, vectorizer, text_weights, numeric_weights, bias):
+        self.vectorizer = vectorizer
+        self.text_weights = np.asarray(text_weights, dtype=np.float64)
+        self.numeric_weights = np.asarray(numeric_weights, dtype=np.float64)
+        self.bias = float(bias)
+        self._numeric_weights = tuple(float(w) for w in self.numeric_weights)
+        self.question_texts = []
+        self.question_terms = []
+        self._terms_by_text = {}
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """Build from a fitted pipeline; ValueError if it has a different shape"""
+        steps = getattr(pipeline, "steps", None)
+        if not steps or len(steps) != 2:
+            raise ValueError("expected a two-step pipeline")
+        features, regressor = steps[0][1], steps[1][1]
+        if not hasattr(regressor, "coef_") or np.ndim(regressor.coef_) != 1:
+            raise ValueError("expected a single-output linear regressor")
+        if getattr(features, "remainder", "drop") != "drop":
+            raise ValueError("expected remaining columns to be dropped")
+
+        transformers = [t for t in getattr(features, "transformers_", []) if t[1] != "drop"]
+        if len(transformers) != 2:
+            raise ValueError("expected a text and a numeric transformer")
+        (_, vectorizer, text_column), (_, scaler, numeric_columns) = transformers
+        if text_column != TEXT_COLUMN or tuple(numeric_columns) != NUMERIC_COLUMNS:
+            raise ValueError("unexpected feature columns")
+        if not hasattr(vectorizer, "vocabulary_") or not hasattr(scaler, "scale_"):
+            raise ValueError("expected a fitted TfidfVectorizer and StandardScaler")
+
+        coef = np.asarray(regressor.coef_, dtype=np.float64)
+        vocabulary_size = len(vectorizer.vocabulary_)
+        if coef.shape[0] != vocabulary_size + len(NUMERIC_COLUMNS):
+            raise ValueError("coefficients do not match the features")
+        text_weights = coef[:vocabulary_size]
+        numeric_coef = coef[vocabulary_size:]
+
+        # Fold the scaler into the weights: w * (x - mean) / scale
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(NUMERIC_COLUMNS))
+        mean = scaler.mean_ if getattr(scaler, "with_mean", True) and scaler.mean_ is not None \
+            else np.zeros(len(NUMERIC_COLUMNS))
+        numeric_weights = numeric_coef / scale
+        bias = float(np.ravel(regressor.intercept_)[0]) - float(np.dot(numeric_weights, mean))
+        return cls(vectorizer, text_weights, numeric_weights, bias)
+
+    def text_contributions(self, qa_texts):
+        """The text term for each of ``qa_texts``"""
+        matrix = self.vectorizer.transform(list(qa_texts))
+        return np.asarray(matrix @ self.text_weights, dtype=np.float64).ravel()
+
+    def text_contribution(self, qa_text):
+        return float(self.text_contributions([qa_text])[0])
+
+    def precompute(self, qa_texts):
+        """Compute and keep the text term of every bank question, indexed by question id"""
+        qa_texts = list(qa_texts)
+        self.question_texts = qa_texts
+        self.question_terms = [float(term) for term in self.text_contributions(qa_texts)]
+        self._terms_by_text = dict(zip(qa_texts, self.question_terms))
+        return self
+
+    def text_term(self, qa_text, question_id=None):
+        """Precomputed text term for a bank question, else computed for this text"""
+        # The id is only trusted when it names the same text
+        if isinstance(question_id, int) and 0 <= question_id < len(self.question_texts) \
+                and self.question_texts[question_id] == qa_text:
+            return self.question_terms[question_id]
+        term = self._terms_by_text.get(qa_text)
+        return term if term is not None else self.text_contribution(qa_text)
+
+    def predict(self, text_contribution, complexity_score, answer_quality_score, experience_encoded):
+        """One prediction from plain floats"""
+        w0, w1, w2 = self._numeric_weights
+        return (self.bias + text_contribution + w0 * float(complexity_score)
+                + w1 * float(answer_quality_score) + w2 * float(experience_encoded))
+
+    def predict_batch(self, text_contributions, numeric):
+        """Predictions for an (n,) vector of text terms and an (n, 3) numeric matrix"""
+        numeric = np.asarray(numeric, dtype=np.float64).reshape(-1, len(NUMERIC_COLUMNS))
+        return self.bias + np.asarray(text_contributions, dtype=np.float64) + numeric @ self.numeric_weights
@@ -0,0 +1,292 @@
+import bisect
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+from utils.evaluation_logic import score_features
+from utils.features import TextStats, statistical_features
+from utils.lexicon import matcher_for_indicators, experience_lexicon_names, FEATURE_LEXICON_NAMES
+from utils.metrics import timed
+
+DRAFT_MAX_SESSIONS = int(os.environ.get("DRAFT_MAX_SESSIONS", 1000))
+DRAFT_TTL_SECONDS = float(os.environ.get("DRAFT_TTL_SECONDS", 1800))
+
+# A block is a sentence: it ends after a run of terminators and the whitespace that follows.
+# Nothing the features look at (words, sentences, lexicon terms, tokens) spans such a boundary.
+_BLOCK_END = re.compile(r'[.!?]+\s+')
+
+def split_blocks(text):
+    """Sentence blocks of ``text``; joined, they give ``text`` back"""
+    blocks, start = [], 0
+    for match in _BLOCK_END.finditer(text):
+        if match.end() < len(text):
+            blocks.append(text[start:match.end()])
+            start = match.end()
+    blocks.append(text[start:])
+    return blocks
+
+def _is_block_start(text, position):
+    """Whether a block of ``text`` starts at ``position`` (or it is the end of the text)"""
+    if position >= len(text):
+        return True
+    if position == 0 or text[position].isspace() or not text[position - 1].isspace():
+        return False
+    before = text[:position].rstrip()
+    return bool(before) and before[-1] in ".!?"
+
+def _common_prefix(a, b):
+    """Length of the common prefix, by halving slice comparisons (done in C)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _common_suffix(a, b, limit):
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+class _Block:
+    __slots__ = ("text", "stats", "terms", "tokens", "grams")
+
+    def __init__(self, text, stats, terms, tokens):
+        self.text = text
+        self.stats = stats
+        self.terms = terms
+        self.tokens = tokens
+        # Vocabulary indices of the n-grams starting in this block (they may run into the next blocks)
+        self.grams = Counter()
+
+class DraftScorer:
+    """Per-bundle analysis pieces for scoring drafts incrementally.
+
+    Mirrors the word analyzer of the bundle's TfidfVectorizer (preprocess,
+    tokenize, stop words, n-grams) so term counts can be kept per block.
+    """
+
+    def __init__(self, bundle):
+        self.bundle = bundle
+        vectorizer = bundle["tfidf_vectorizer"]
+        if vectorizer.analyzer != "word" or not hasattr(vectorizer, "vocabulary_"):
+            raise ValueError("incremental drafts need a fitted word-analyzer TfidfVectorizer")
+        self.vectorizer = vectorizer
+        self.preprocess = vectorizer.build_preprocessor()
+        self.tokenize = vectorizer.build_tokenizer()
+        self.stop_words = vectorizer.get_stop_words() or frozenset()
+        self.min_n, self.max_n = vectorizer.ngram_range
+        self.vocabulary = vectorizer.vocabulary_
+        self.idf = getattr(vectorizer, "idf_", None) if vectorizer.use_idf else None
+        self.matcher = matcher_for_indicators(bundle["experience_indicators"])
+
+    def block(self, text):
+        tokens = [token for token in self.tokenize(self.preprocess(text)) if token not in self.stop_words]
+        return _Block(text, TextStats.from_text(text), self.matcher.found_terms(text.lower()), tokens)
+
+    def grams(self, tokens, lookahead):
+        """Vocabulary counts of the n-grams starting in ``tokens``, continued into ``lookahead``"""
+        counts = Counter()
+        sequence = tokens + lookahead
+        vocabulary = self.vocabulary
+        for n in range(self.min_n, self.max_n + 1):
+            for i in range(min(len(tokens), len(sequence) - n + 1)):
+                index = vocabulary.get(" ".join(sequence[i:i + n]))
+                if index is not None:
+                    counts[index] += 1
+        return counts
+
+    def tfidf_row(self, counts):
+        """Same row as ``vectorizer.transform`` from the document's term counts"""
+        indices = np.flatnonzero(counts)
+        row = sp.csr_matrix(
+            (counts[indices], indices, [0, len(indices)]), shape=(1, len(counts)), dtype=self.vectorizer.dtype
+        )
+        if self.vectorizer.binary:
+            row.data.fill(1)
+        if self.vectorizer.sublinear_tf:
+            np.log(row.data, row.data)
+            row.data += 1.0
+        if self.idf is not None:
+            row.data *= self.idf[row.indices]
+        if self.vectorizer.norm is not None:
+            row = normalize(row, norm=self.vectorizer.norm, copy=False)
+        return row
+
+class DraftState:
+    """One candidate's draft, kept as sentence blocks with running totals.
+
+    ``update`` re-analyzes only the blocks an edit touches (plus the block
+    before it, whose n-grams run into the edit), so its cost follows the
+    size of the edit rather than the size of the answer.
+    """
+
+    def __init__(self, scorer):
+        self.scorer = scorer
+        self.text = ""
+        self.blocks = []
+        self.starts = []
+        self.totals = TextStats()
+        self.terms = Counter()
+        self.counts = np.zeros(len(scorer.vocabulary), dtype=np.int64)
+        self.lock = threading.Lock()
+        self.updated_at = time.monotonic()
+        # No text received yet: a new session, or one this process never held or has dropped
+        self.fresh = True
+
+    def update(self, text):
+        """Bring the draft to ``text``; returns how many blocks were re-analyzed"""
+        old = self.text
+        if text == old and self.blocks:
+            return 0
+
+        prefix = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, min(len(old), len(text)) - prefix)
+
+        # First block touched: the one holding the character before the edit
+        first = max(0, bisect.bisect_right(self.starts, max(prefix - 1, 0)) - 1) if self.blocks else 0
+        # Last block touched: the first one ending past the edit at a boundary that survives it
+        shift = len(text) - len(old)
+        last = len(self.blocks) - 1
+        for j in range(first, len(self.blocks)):
+            end = self.starts[j] + len(self.blocks[j].text)
+            if end >= len(old) - suffix and _is_block_start(text, end + shift):
+                last = j
+                break
+
+        start = self.starts[first] if self.blocks else 0
+        end = (self.starts[last] + len(self.blocks[last].text) + shift) if self.blocks else len(text)
+        new_blocks = [self.scorer.block(block_text) for block_text in split_blocks(text[start:end])]
+
+        for block in self.blocks[first:last + 1]:
+            self._account(block, -1)
+        for block in new_blocks:
+            self._account(block, 1)
+        self.blocks[first:last + 1] = new_blocks
+        self.starts = self.starts[:first] + self._starts_from(start, new_blocks) + \
+            [s + shift for s in self.starts[last + 1:]]
+        self.text = text
+        self.fresh = False
+        self.updated_at = time.monotonic()
+
+        # N-grams of the new blocks, and of earlier blocks whose n-grams reach into them
+        reach, refresh = self.scorer.max_n - 1, first
+        while refresh > 0 and reach > 0:
+            refresh -= 1
+            reach -= len(self.blocks[refresh].tokens)
+        for index in range(refresh, first + len(new_blocks)):
+            self._refresh_grams(index)
+        return len(new_blocks)
+
+    def append(self, text):
+        return self.update(self.text + text)
+
+    @staticmethod
+    def _starts_from(start, blocks):
+        starts = []
+        for block in blocks:
+            starts.append(start)
+            start += len(block.text)
+        return starts
+
+    def _account(self, block, sign):
+        self.totals.add(block.stats, sign)
+        for term in block.terms:
+            self.terms[term] += sign
+            if self.terms[term] <= 0:
+                del self.terms[term]
+        if sign < 0:
+            self._apply_grams(block.grams, -1)
+
+    def _apply_grams(self, grams, sign):
+        if grams:
+            indices = np.fromiter(grams.keys(), dtype=np.int64, count=len(grams))
+            values = np.fromiter(grams.values(), dtype=np.int64, count=len(grams))
+            np.add.at(self.counts, indices, sign * values)
+
+    def _refresh_grams(self, index):
+        block = self.blocks[index]
+        lookahead, following = [], index + 1
+        while len(lookahead) < self.scorer.max_n - 1 and following < len(self.blocks):
+            lookahead.extend(self.blocks[following].tokens)
+            following += 1
+        grams = self.scorer.grams(block.tokens, lookahead[:self.scorer.max_n - 1])
+        self._apply_grams(block.grams, -1)
+        self._apply_grams(grams, 1)
+        block.grams = grams
+
+    def score(self, experience_level):
+        """Model scores for the current draft, equal to ``evaluate_answer`` on its full text"""
+        scorer = self.scorer
+        bundle = scorer.bundle
+        names = FEATURE_LEXICON_NAMES + experience_lexicon_names(experience_level)
+        lexicon_counts = scorer.matcher.counts_found(self.terms, names=names)
+        with timed("communication.draft_features"):
+            stat_values = np.array([list(statistical_features(self.totals, lexicon_counts).values())])
+            tfidf_row = scorer.tfidf_row(self.counts)
+        return score_features(
+            bundle["models"], bundle["scalers"], stat_values, tfidf_row, [lexicon_counts], [experience_level]
+        )[0]
+
+class DraftSessions:
+    """Draft states by session id, bounded in number and idle time"""
+
+    def __init__(self, max_sessions=DRAFT_MAX_SESSIONS, ttl_seconds=DRAFT_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._states = OrderedDict()
+        self._scorers = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id, bundle):
+        """The draft state of a session (a new one for a new id or a reloaded bundle)"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            state = self._states.get(session_id)
+            if state is None or state.scorer.bundle is not bundle:
+                state = DraftState(self._scorer(bundle))
+                self._states[session_id] = state
+                while len(self._states) > self.max_sessions:
+                    self._states.popitem(last=False)
+            self._states.move_to_end(session_id)
+            return state
+
+    def forget(self, session_id):
+        with self._lock:
+            return self._states.pop(session_id, None) is not None
+
+    @staticmethod
+    def new_id():
+        return uuid.uuid4().hex
+
+    def _scorer(self, bundle):
+        scorer = self._scorers.get(id(bundle))
+        if scorer is None or scorer.bundle is not bundle:
+            # Only the live bundle's scorer is kept
+            self._scorers = {id(bundle): DraftScorer(bundle)}
+            scorer = self._scorers[id(bundle)]
+        return scorer
+
+    def _expire(self, now):
+        while self._states:
+            session_id, state = next(iter(self._states.items()))
+            if now - state.updated_at <= self.ttl_seconds:
+                break
+            del self._states[session_id]
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._states), "max_sessions": self.max_sessions, "ttl_seconds": self.ttl_seconds}
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+DEFAULT_INDEX_PATH = "model/expected_answer_embeddings"
+
+def content_hash(text):
+    """Hash of the exact text an embedding was computed from"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class EmbeddingIndex:
+    """Precomputed embeddings of the question bank's expected answers.
+
+    Stored on disk as ``<path>.npy`` (float32 matrix, one row per bank row)
+    plus ``<path>.json`` (model name and per-row content hashes). The matrix
+    is memory-mapped on load so it is shared between processes.
+    """
+
+    def __init__(self, embeddings, hashes, model_name):
+        self.embeddings = embeddings
+        self.hashes = list(hashes)
+        self.model_name = model_name
+        # Rows encoded (rather than reused) when this index was built
+        self.encoded = 0
+        # Identical answers share a row; the embedding is the same either way
+        self._row_by_hash = {}
+        for row, digest in enumerate(self.hashes):
+            self._row_by_hash.setdefault(digest, row)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    @classmethod
+    def build(cls, encoder, texts, model_name, batch_size=64):
+        """Encode every text in one batched pass"""
+        texts = [str(text) for text in texts]
+        embeddings = encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        index = cls(embeddings, [content_hash(text) for text in texts], model_name)
+        index.encoded = len(texts)
+        return index
+
+    @classmethod
+    def update(cls, previous, encoder, texts, model_name, batch_size=64):
+        """Index ``texts``, reusing ``previous`` rows whose content hash is unchanged.
+
+        Only added or edited texts are encoded. A previous index from another
+        model is not reused.
+        """
+        if previous is None or previous.model_name != model_name:
+            return cls.build(encoder, texts, model_name, batch_size=batch_size)
+
+        texts = [str(text) for text in texts]
+        hashes = [content_hash(text) for text in texts]
+        missing = {}
+        for text, digest in zip(texts, hashes):
+            if digest not in previous._row_by_hash:
+                missing.setdefault(digest, text)
+
+        encoded = {}
+        if missing:
+            vectors = encoder.encode(list(missing.values()), batch_size=batch_size, convert_to_numpy=True)
+            encoded = dict(zip(missing, np.asarray(vectors, dtype=np.float32)))
+
+        dimension = previous.embeddings.shape[1]
+        embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+        for row, digest in enumerate(hashes):
+            vector = encoded.get(digest)
+            embeddings[row] = vector if vector is not None else previous.embeddings[previous._row_by_hash[digest]]
+        index = cls(embeddings, hashes, model_name)
+        index.encoded = len(missing)
+        return index
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH, mmap=True):
+        with open(f"{path}.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        embeddings = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)
+        if embeddings.shape[0] != len(meta["hashes"]):
+            raise ValueError(f"Embedding index at {path} is inconsistent")
+        return cls(embeddings, meta["hashes"], meta["model_name"])
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """Write the index, replacing any previous version atomically"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # np.save appends .npy to names that lack it, so keep the suffix last
+        # Per-process temporary names: several workers may refresh the same index
+        tmp_npy = f"{path}.tmp{os.getpid()}.npy"
+        tmp_json = f"{path}.tmp{os.getpid()}.json"
+        np.save(tmp_npy, np.asarray(self.embeddings, dtype=np.float32))
+        with open(tmp_json, "w", encoding="utf-8") as f:
+            json.dump({"model_name": self.model_name, "hashes": self.hashes}, f)
+        os.replace(tmp_npy, f"{path}.npy")
+        os.replace(tmp_json, f"{path}.json")
+
+    @classmethod
+    def load_or_build(cls, encoder, texts, model_name, path=DEFAULT_INDEX_PATH):
+        """Load the persisted index, re-encoding only rows whose text or model changed"""
+        texts = [str(text) for text in texts]
+        expected_hashes = [content_hash(text) for text in texts]
+
+        persisted = None
+        try:
+            persisted = cls.load(path)
+            if persisted.model_name == model_name and persisted.hashes == expected_hashes:
+                return persisted
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Embedding index not loaded from {path}: {e}")
+
+        index = cls.update(persisted, encoder, texts, model_name)
+        if persisted is not None:
+            print(f"Embedding index refreshed: {index.encoded} of {len(index)} rows encoded")
+        try:
+            index.save(path)
+            return cls.load(path)
+        except OSError as e:
+            print(f"Could not persist embedding index to {path}: {e}")
+            return index
+
+    def lookup(self, text=None, question_id=None):
+        """Return the stored embedding for a bank row or answer text, or None"""
+        digest = content_hash(text) if text is not None else None
+
+        if question_id is not None:
+            try:
+                row = int(question_id)
+            except (TypeError, ValueError):
+                row = -1
+            # Only trust the id when it agrees with the text we were given
+            if 0 <= row < len(self.hashes) and (digest is None or self.hashes[row] == digest):
+                return self.embeddings[row]
+
+        if digest is not None:
+            row = self._row_by_hash.get(digest)
+            if row is not None:
+                return self.embeddings[row]
+
+        return None
+
+    def get(self, text, encode, question_id=None):
+        """Return the embedding for ``text``; when not indexed it is ``encode(text)``, computed live"""
+        embedding = self.lookup(text=text, question_id=question_id)
+        if embedding is None:
+            embedding = encode(text)
+        return np.asarray(embedding, dtype=np.float32)
+
+def cosine_similarity(a, b):
+    """Cosine similarity of two 1-D vectors"""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    if denom == 0:
+        return 0.0
+    return float(np.dot(a, b) / denom)
+
+if __name__ == "__main__":
+    # Build (or refresh) the index for the configured model ahead of time: python -m utils.embedding_index
+    from utils.technical_evaluator import technical_evaluator
+    index = technical_evaluator.embedding_index
+    print(f"Embedding index ready: {len(index)} rows, model {index.model_name}")
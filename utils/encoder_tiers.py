@@ -0,0 +1,279 @@
+import json
+import os
+import random
+import re
+import threading
+import numpy as np
+from utils.batching import BatchingEncoder
+from utils.embedding_index import EmbeddingIndex, cosine_similarity, DEFAULT_INDEX_PATH
+from utils.encoders import load_sentence_encoder
+from utils.input_budget import encode_pooled, words_per_chunk
+from utils.model_registry import LazyModel, registry
+from utils.semantic_inference import InferenceConfig, apply_inference_config
+
+# Encoder tiers as "name=model[@mode],...", e.g. "fast=models/minilm@int8,accurate=all-mpnet-base-v2";
+# unset, one "accurate" tier runs SEMANTIC_MODEL_NAME. Models may be names or local paths.
+SEMANTIC_TIERS = os.environ.get("SEMANTIC_TIERS", "")
+# Tier used when a request or session does not pick one
+SEMANTIC_DEFAULT_TIER = os.environ.get("SEMANTIC_DEFAULT_TIER", "")
+# Tier whose similarity scale the others are calibrated onto
+SEMANTIC_REFERENCE_TIER = os.environ.get("SEMANTIC_REFERENCE_TIER", "")
+CALIBRATION_DIR = os.environ.get("CALIBRATION_DIR", "model/calibration")
+ENCODER_MAX_BATCH_SIZE = int(os.environ.get("ENCODER_MAX_BATCH_SIZE", 32))
+ENCODER_MAX_WAIT_MS = float(os.environ.get("ENCODER_MAX_WAIT_MS", 5))
+
+DEFAULT_TIER_NAME = "accurate"
+
+class UnknownTier(ValueError):
+    """A request or session named a tier that is not configured"""
+
+def parse_tiers(spec, default_model, inference_config):
+    """Tier name -> (model name, InferenceConfig) from a SEMANTIC_TIERS spec"""
+    tiers = {}
+    for entry in (part.strip() for part in spec.split(",")):
+        if not entry:
+            continue
+        name, _, model = entry.partition("=")
+        name, model = name.strip().lower(), model.strip()
+        if not name or not model:
+            raise ValueError(f"Bad SEMANTIC_TIERS entry '{entry}', expected name=model[@mode]")
+        config = inference_config
+        if "@" in model:
+            model, _, mode = model.rpartition("@")
+            config = InferenceConfig(mode.strip().lower(), inference_config.num_threads,
+                                     inference_config.max_seq_length)
+        tiers[name] = (model, config)
+    return tiers or {DEFAULT_TIER_NAME: (default_model, inference_config)}
+
+def _file_key(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_")
+
+def calibration_path(model_key, reference_key, directory=CALIBRATION_DIR):
+    return os.path.join(directory, f"{_file_key(model_key)}--{_file_key(reference_key)}.json")
+
+class Calibration:
+    """Monotone map from one encoder's cosine similarity onto a reference encoder's.
+
+    Stored as the knots of an isotonic fit and applied by linear
+    interpolation, clamped at both ends. With no knots it is the identity.
+    """
+
+    __slots__ = ("model_key", "reference_key", "x", "y", "pairs")
+
+    def __init__(self, model_key, reference_key, x=(), y=(), pairs=0):
+        self.model_key = model_key
+        self.reference_key = reference_key
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.pairs = int(pairs)
+
+    @property
+    def identity(self):
+        return self.x.size == 0
+
+    def apply(self, similarity):
+        if self.identity:
+            return similarity
+        return float(np.interp(similarity, self.x, self.y))
+
+    @classmethod
+    def fit(cls, model_key, reference_key, similarities, reference_similarities):
+        from sklearn.isotonic import IsotonicRegression
+        fitted = IsotonicRegression(increasing=True, out_of_bounds="clip").fit(
+            np.asarray(similarities, dtype=np.float64), np.asarray(reference_similarities, dtype=np.float64)
+        )
+        return cls(model_key, reference_key, fitted.X_thresholds_, fitted.y_thresholds_, len(similarities))
+
+    def to_dict(self):
+        return {
+            "model_key": self.model_key,
+            "reference_key": self.reference_key,
+            "pairs": self.pairs,
+            "x": [round(float(value), 6) for value in self.x],
+            "y": [round(float(value), 6) for value in self.y]
+        }
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["model_key"], data["reference_key"], data["x"], data["y"], data.get("pairs", 0))
+
+def calibration_candidates(bank, limit, seed=13):
+    """(row, kind, candidate answer) triples covering paraphrased, partial and wrong answers"""
+    rng = random.Random(seed)
+    by_technology = bank.groupby(bank["technology"].str.lower()).indices
+    candidates = []
+    for row in range(min(limit, len(bank))):
+        expected = str(bank.at[row, "expected_answer"])
+        words = expected.split()
+        sentences = [s for s in re.split(r"(?<=[.!?])\s+", expected) if s]
+        candidates.append((row, "reordered", " ".join(reversed(sentences)) if len(sentences) > 1 else expected))
+        candidates.append((row, "dropped_words", " ".join(word for i, word in enumerate(words) if i % 5 != 4)))
+        candidates.append((row, "partial", " ".join(words[: max(1, len(words) // 3)])))
+        peers = [peer for peer in by_technology[str(bank.at[row, "technology"]).lower()] if peer != row]
+        if peers:
+            candidates.append((row, "other_question", str(bank.at[rng.choice(peers), "expected_answer"])))
+        candidates.append((row, "question_text", str(bank.at[row, "question_text"])))
+    return candidates
+
+class EncoderTier:
+    """One semantic encoder the technical evaluator can score with.
+
+    Holds the model, its batching front-end, the expected-answer index it
+    produces and the calibration that puts its similarities on the
+    reference tier's scale (identity for the reference tier itself).
+    """
+
+    def __init__(self, name, model_name, inference_config, expected_answers, reference_key=None,
+                 index_path=None, registry_suffix=""):
+        self.name = name
+        self.model_name = model_name
+        self.inference_config = inference_config
+        self.expected_answers = expected_answers
+        self.reference_key = reference_key
+        self.index_path = (index_path or DEFAULT_INDEX_PATH + registry_suffix) + inference_config.suffix()
+        self._semantic_model = registry.register(LazyModel(
+            "semantic_model" + registry_suffix, self._load_semantic_model, warmup=self._warm_up_semantic_model
+        ))
+        self._embedding_index = registry.register(LazyModel(
+            "embedding_index" + registry_suffix, self._load_embedding_index
+        ))
+        self._calibration = LazyModel("calibration" + registry_suffix, self._load_calibration)
+        if reference_key is not None:
+            registry.register(self._calibration)
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+
+    @property
+    def model_key(self):
+        """Identity of the embeddings this tier produces"""
+        return self.inference_config.model_key(self.model_name)
+
+    @property
+    def semantic_model(self):
+        return self._semantic_model.get()
+
+    @property
+    def embedding_index(self):
+        return self._embedding_index.get()
+
+    def loaded_index(self):
+        """The expected-answer index if it is loaded, else None"""
+        return self._embedding_index.value if self._embedding_index.ready else None
+
+    def replace_index(self, index):
+        self._embedding_index.replace(index)
+
+    @property
+    def calibration(self):
+        return self._calibration.get()
+
+    @property
+    def encoder(self):
+        """Batching front-end of the semantic model, shared by request threads"""
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    self._encoder = BatchingEncoder(
+                        self.semantic_model,
+                        max_batch_size=ENCODER_MAX_BATCH_SIZE,
+                        max_wait_ms=ENCODER_MAX_WAIT_MS
+                    )
+        return self._encoder
+
+    @property
+    def chunk_words(self):
+        """Words per encoder chunk; longer answers are encoded in pooled chunks"""
+        return words_per_chunk(getattr(self.semantic_model, "max_seq_length", None))
+
+    def encode_answers(self, answers):
+        """Embed candidate answers of any length, all chunks in one encoder call"""
+        return encode_pooled(self.encoder, answers, self.chunk_words)
+
+    def calibrate(self, similarity):
+        """Similarity on the reference tier's scale"""
+        return self.calibration.apply(similarity)
+
+    def encoder_stats(self):
+        """Batching statistics, or None while the semantic model is not loaded"""
+        return self._encoder.stats() if self._encoder is not None else None
+
+    def _load_semantic_model(self):
+        model = load_sentence_encoder(self.model_name)
+        return apply_inference_config(model, self.inference_config)
+
+    def _warm_up_semantic_model(self, model):
+        model.encode(["Warm-up sentence for the semantic model."], convert_to_numpy=True)
+
+    def _load_embedding_index(self):
+        # Expected answers are fixed, so their embeddings are computed once;
+        # embeddings differ per model and inference config, so each keeps its own index
+        return EmbeddingIndex.load_or_build(
+            self.semantic_model, self.expected_answers(), self.model_key, path=self.index_path
+        )
+
+    def _load_calibration(self):
+        path = self.calibration_file()
+        if path is None:
+            return Calibration(self.model_key, self.model_key)
+        try:
+            calibration = Calibration.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ No calibration for tier {self.name} at {path} ({e}); its scores use the raw scale")
+            return Calibration(self.model_key, self.reference_key)
+        if (calibration.model_key, calibration.reference_key) != (self.model_key, self.reference_key):
+            print(f"⚠️ Calibration at {path} is for another model pair; tier {self.name} uses the raw scale")
+            return Calibration(self.model_key, self.reference_key)
+        return calibration
+
+    def reload_calibration(self):
+        return self._calibration.reload()
+
+    def calibration_file(self):
+        """Path of this tier's calibration, or None for the reference tier"""
+        if self.reference_key is None or self.reference_key == self.model_key:
+            return None
+        return calibration_path(self.model_key, self.reference_key)
+
+    def pair_similarities(self, expected_texts, candidates):
+        """Cosine similarity of each (row, kind, text) candidate to its expected answer"""
+        expected = np.asarray(self.semantic_model.encode(expected_texts, convert_to_numpy=True))
+        encoded = self.encode_answers([text for _, _, text in candidates])
+        return np.array([
+            cosine_similarity(expected[row], embedding) for (row, _, _), embedding in zip(candidates, encoded)
+        ])
+
+    def status(self):
+        reference = self.calibration_file() is None
+        calibrated = None  # Not loaded yet
+        if reference:
+            calibrated = True
+        elif self._calibration.ready:
+            calibrated = not self._calibration.value.identity
+        return {
+            "model": self.model_name,
+            "model_key": self.model_key,
+            "inference": self.inference_config.as_dict(),
+            "reference": reference,
+            "calibrated": calibrated,
+            "encoder": self.encoder_stats()
+        }
+
+def fit_calibration(tier, reference, bank, limit=None):
+    """Fit ``tier``'s calibration onto ``reference`` over bank answers and their variants; returns it"""
+    candidates = calibration_candidates(bank, limit or len(bank))
+    rows = sorted({row for row, _, _ in candidates})
+    expected_texts = [str(text) for text in bank["expected_answer"].iloc[:max(rows) + 1]]
+    similarities = tier.pair_similarities(expected_texts, candidates)
+    reference_similarities = reference.pair_similarities(expected_texts, candidates)
+    return Calibration.fit(tier.model_key, reference.model_key, similarities, reference_similarities)
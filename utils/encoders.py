@@ -0,0 +1,56 @@
+import hashlib
+import re
+import numpy as np
+
+STAND_IN_PREFIX = "hashing"
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+class HashingEncoder:
+    """Deterministic, dependency-free stand-in for a SentenceTransformer.
+
+    Hashes word unigrams and bigrams into a fixed-size signed bag of words and
+    L2-normalizes it. Similar texts get similar vectors, results are identical
+    on every machine and nothing is downloaded, which makes it suitable for
+    offline benchmarks and tests of the scoring pipeline (not for grading).
+    """
+
+    def __init__(self, dimension=384, max_seq_length=384):
+        self.dimension = int(dimension)
+        self.max_seq_length = max_seq_length
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def _features(self, text):
+        tokens = _TOKEN_PATTERN.findall(str(text).lower())[: self.max_seq_length or None]
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _encode_one(self, text):
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimension] += 1.0 if (value >> 63) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, **kwargs):
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        if len(sentences) == 0:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self._encode_one(text) for text in sentences])
+
+def is_stand_in(model_name):
+    return str(model_name).split(":", 1)[0] == STAND_IN_PREFIX
+
+def load_sentence_encoder(model_name):
+    """SentenceTransformer for a name or local path; ``hashing[:dim]`` for the stand-in"""
+    if is_stand_in(model_name):
+        _, _, dimension = str(model_name).partition(":")
+        return HashingEncoder(int(dimension) if dimension else 384)
+
+    # Imported here so importing this module does not pull in torch
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
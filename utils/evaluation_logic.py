@@ -1,40 +1,114 @@
 import numpy as np
 from utils.features import extract_statistical_features
+from utils.lexicon import matcher_for_indicators, experience_lexicon_names, FEATURE_LEXICON_NAMES
+from utils.result_cache import get_cache, make_key, normalize_text
+from utils.metrics import timed
+
+# Keys include the bundle digest from load_model, so a swapped-in bundle never sees the old
+# bundle's results, and a reload of identical files keeps them
+evaluation_cache = get_cache("communication_evaluation")
+
+class UnscorableAnswer(ValueError):
+    """An answer whose statistical features are undefined, e.g. punctuation only"""
+
+def evaluate_answer(models, vectorizer, scalers, experience_indicators, answer, experience_level, digest=None):
+    return evaluate_answers_batch(
+        models, vectorizer, scalers, experience_indicators, [answer], [experience_level], digest=digest
+    )[0]
+
+def evaluate_answers_batch(models, vectorizer, scalers, experience_indicators, answers, experience_levels,
+                           digest=None):
+    """Score many answers with one transform and one predict per model.
+
+    With the bundle's ``digest``, answers already in the result cache are
+    served from it and the rest are scored together and cached; without
+    one nothing is cached.
+    """
+    if isinstance(experience_levels, str):
+        experience_levels = [experience_levels] * len(answers)
+    if len(answers) != len(experience_levels):
+        raise ValueError("answers and experience_levels must have the same length")
+
+    if digest is None:
+        return _score_answers(models, vectorizer, scalers, experience_indicators, answers, experience_levels)
+
+    keys = [
+        make_key("communication", digest, normalize_text(answer), str(experience_level))
+        for answer, experience_level in zip(answers, experience_levels)
+    ]
+    results = [evaluation_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        scored = _score_answers(
+            models, vectorizer, scalers, experience_indicators,
+            [answers[i] for i in missing], [experience_levels[i] for i in missing]
+        )
+        for i, result in zip(missing, scored):
+            evaluation_cache.put(keys[i], result)
+            results[i] = result
+
+    return results
+
+def _score_answers(models, vectorizer, scalers, experience_indicators, answers, experience_levels):
+    """Uncached scoring of a non-empty list of answers"""
+    # One lexicon sweep per answer covers both the features and the level indicators
+    with timed("communication.lexicon"):
+        matcher = matcher_for_indicators(experience_indicators)
+        lexicon_counts = [
+            matcher.counts(answer, names=FEATURE_LEXICON_NAMES + experience_lexicon_names(experience_level))
+            for answer, experience_level in zip(answers, experience_levels)
+        ]
 
-def evaluate_answer(models, vectorizer, scalers, experience_indicators, answer, experience_level):
     # Extract statistical features
-    stats = extract_statistical_features(answer)
-    stat_values = np.array(list(stats.values())).reshape(1, -1)
+    with timed("communication.features"):
+        stat_values = np.array([
+            list(extract_statistical_features(answer, counts).values())
+            for answer, counts in zip(answers, lexicon_counts)
+        ])
 
     # TF-IDF features
-    tfidf_vector = vectorizer.transform([answer])
+    with timed("communication.tfidf"):
+        tfidf_matrix = vectorizer.transform(answers)
 
+    return score_features(models, scalers, stat_values, tfidf_matrix, lexicon_counts, experience_levels)
+
+def score_features(models, scalers, stat_values, tfidf_matrix, lexicon_counts, experience_levels):
+    """Model scores from statistical feature rows, TF-IDF rows and lexicon counts"""
+    # A text of words but no sentence (e.g. "!!!") has no mean sentence length; the models reject NaN
+    finite = np.isfinite(stat_values).all(axis=1)
+    if not finite.all():
+        which = f"answer {int(np.argmin(finite))}" if len(finite) > 1 else "answer"
+        raise UnscorableAnswer(f"{which} cannot be scored: it has no sentence text")
     # Combine features
-    input_vector = np.hstack((stat_values, tfidf_vector.toarray()))
+    with timed("communication.combine"):
+        input_matrix = np.hstack((stat_values, tfidf_matrix.toarray()))
 
-    # Predictions
-    predictions = {}
+    # Predictions, one pass per model over the whole matrix
+    model_predictions = {}
     for key in models:
         model = models[key]
         scaler = scalers[key]
-        scaled_input = scaler.transform(input_vector)
-        pred = model.predict(scaled_input)[0]
-        predictions[key] = round(float(pred), 2)
-
-    # Experience-level based score adjustment (optional but recommended)
-    level_indicators = experience_indicators.get(experience_level, {})
-    positive_words = level_indicators.get("positive", [])
-    negative_words = level_indicators.get("negative", [])
-
-    lower_answer = answer.lower()
-    bonus = sum(1 for word in positive_words if word in lower_answer)
-    penalty = sum(1 for word in negative_words if word in lower_answer)
-
-    predictions["adjusted_score"] = round(
-        (predictions["technical_accuracy"] + predictions["communication_effectiveness"] + predictions["competency_demonstration"]) / 3
-        + bonus * 0.5
-        - penalty * 0.5,
-        2
-    )
-
-    return predictions
+        with timed(f"communication.scale.{key}"):
+            scaled_input = scaler.transform(input_matrix)
+        with timed(f"communication.predict.{key}"):
+            model_predictions[key] = model.predict(scaled_input)
+
+    results = []
+    for i, (counts, experience_level) in enumerate(zip(lexicon_counts, experience_levels)):
+        predictions = {key: round(float(preds[i]), 2) for key, preds in model_predictions.items()}
+
+        # Experience-level based score adjustment (optional but recommended)
+        positive_name, negative_name = experience_lexicon_names(experience_level)
+        bonus = counts.get(positive_name, 0)
+        penalty = counts.get(negative_name, 0)
+
+        predictions["adjusted_score"] = round(
+            (predictions["technical_accuracy"] + predictions["communication_effectiveness"] + predictions["competency_demonstration"]) / 3
+            + bonus * 0.5
+            - penalty * 0.5,
+            2
+        )
+        results.append(predictions)
+
+    return results
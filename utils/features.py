@@ -1,39 +1,140 @@
+import math
 import re
+from collections import Counter
 import numpy as np
-from typing import Dict
-from textstat import flesch_reading_ease
+from typing import Dict, Optional
+from importlib.metadata import version, PackageNotFoundError
+from textstat import lexicon_count, syllable_count
+from utils.lexicon import default_matcher, FEATURE_LEXICON_NAMES
 
-def extract_statistical_features(text: str) -> Dict[str, float]:
-    if not text or len(text.strip()) == 0:
+# TextStats.flesch_reading_ease reproduces textstat's internals as of this version (pinned in
+# requirements.txt); benchmarks/draft_scoring.py checks the two agree on the dataset answers
+TEXTSTAT_VERSION = "0.7.3"
+try:
+    _installed_textstat = version("textstat")
+except PackageNotFoundError:
+    _installed_textstat = None
+if _installed_textstat not in (None, TEXTSTAT_VERSION):
+    print(f"⚠️ textstat {_installed_textstat} is installed; reading ease follows {TEXTSTAT_VERSION} and may differ")
+
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+# textstat's sentence pattern for Flesch reading ease
+_READABILITY_SENTENCE = re.compile(r'\b[^.!?]+[.!?]*', re.UNICODE)
+
+# Flesch reading ease constants for English, as textstat uses them
+FRE_BASE = 206.835
+FRE_SENTENCE_LENGTH = 1.015
+FRE_SYLLABLES_PER_WORD = 84.6
+
+def _legacy_round(number, points=0):
+    """textstat's rounding: half away from zero"""
+    p = 10 ** points
+    return float(math.floor((number * p) + math.copysign(0.5, number))) / p
+
+class TextStats:
+    """Additive counts behind the statistical features.
+
+    Counts of two texts joined at a sentence boundary (terminator, then
+    whitespace) are the sums of their counts, which is what lets a draft be
+    re-scored from only the sentences that changed.
+    """
+
+    __slots__ = ("words", "word_chars", "long_words", "questions", "sentences", "sentence_words",
+                 "readability_words", "readability_sentences", "syllables", "vocabulary")
+
+    def __init__(self):
+        self.words = 0
+        self.word_chars = 0
+        self.long_words = 0
+        self.questions = 0
+        self.sentences = 0
+        self.sentence_words = 0
+        self.readability_words = 0
+        self.readability_sentences = 0
+        self.syllables = 0
+        self.vocabulary = Counter()
+
+    @classmethod
+    def from_text(cls, text):
+        stats = cls()
+        words = text.split()
+        stats.words = len(words)
+        stats.word_chars = sum(len(word) for word in words)
+        stats.long_words = sum(1 for word in words if len(word) > 8)
+        stats.questions = text.count('?')
+        sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s.strip()]
+        stats.sentences = len(sentences)
+        stats.sentence_words = sum(len(s.split()) for s in sentences)
+        stats.vocabulary = Counter(text.lower().split())
+
+        # Flesch reading ease inputs; textstat ignores "sentences" of two words or fewer
+        stats.readability_words = lexicon_count(text)
+        stats.readability_sentences = sum(
+            1 for sentence in _READABILITY_SENTENCE.findall(text) if lexicon_count(sentence) > 2
+        )
+        stats.syllables = syllable_count(text)
+        return stats
+
+    def add(self, other, sign=1):
+        """Add (or with ``sign=-1`` remove) another text's counts in place"""
+        for name in self.__slots__[:-1]:
+            setattr(self, name, getattr(self, name) + sign * getattr(other, name))
+        if sign > 0:
+            self.vocabulary.update(other.vocabulary)
+        else:
+            self.vocabulary.subtract(other.vocabulary)
+            for word in other.vocabulary:
+                if self.vocabulary[word] <= 0:
+                    del self.vocabulary[word]
+        return self
+
+    def flesch_reading_ease(self):
+        """Same value as ``textstat.flesch_reading_ease`` on the text"""
+        sentence_length = _legacy_round(self.readability_words / max(1, self.readability_sentences), 1)
+        syllables_per_word = (
+            _legacy_round(self.syllables / self.readability_words, 1) if self.readability_words else 0.0
+        )
+        return _legacy_round(
+            FRE_BASE - float(FRE_SENTENCE_LENGTH * sentence_length)
+            - float(FRE_SYLLABLES_PER_WORD * syllables_per_word), 2
+        )
+
+def statistical_features(stats: TextStats, lexicon_counts: Dict) -> Dict[str, float]:
+    """The 15 statistical features from a text's counts and lexicon hits"""
+    if not stats.words:
         return {f'stat_{i}': 0.0 for i in range(15)}
-    words = text.split()
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    words = stats.words
     features = {}
-    features['stat_0'] = len(words)
-    features['stat_1'] = len(sentences)
-    features['stat_2'] = np.mean([len(word) for word in words])
-    features['stat_3'] = np.mean([len(s.split()) for s in sentences])
+    features['stat_0'] = words
+    features['stat_1'] = stats.sentences
+    features['stat_2'] = np.float64(stats.word_chars) / words
+    # Mean of no sentences is NaN, as np.mean([]) gives
+    features['stat_3'] = np.float64(stats.sentence_words) / stats.sentences if stats.sentences else np.nan
     try:
-        features['stat_4'] = flesch_reading_ease(text)
-    except:
+        features['stat_4'] = stats.flesch_reading_ease()
+    except Exception:
         features['stat_4'] = 50.0
-    unique_words = len(set(word.lower() for word in words))
-    features['stat_5'] = unique_words / len(words)
-    technical_terms = ['api', 'system', 'database', 'server', 'code', 'algorithm', 'architecture', 'performance', 'security', 'debugging', 'compiler','syntax', 'spaced repetition', 'flashcards', 'mnemonic', 'cheat sheet', 'annotations','ide', 'vscode', 'autocomplete', 'leetcode', 'hackerrank', 'codewars', 'git','implement', 'optimize', 'deploy', 'integrate', 'refactor', 'simulate', 'unit test', 'benchmark']
-    features['stat_6'] = sum(1 for term in technical_terms if term in text.lower()) / len(words)
-    quality_words = ['clear', 'efficient', 'scalable', 'maintain', 'optimize', 'collaborate']
-    features['stat_7'] = sum(1 for word in quality_words if word in text.lower()) / len(words)
-    action_words = ['implemented', 'created', 'built', 'designed', 'led', 'managed', 'developed']
-    features['stat_8'] = sum(1 for word in action_words if word in text.lower()) / len(words)
-    negative_phrases = ["don't know", 'no experience', 'not familiar', 'never used', "can't"]
-    features['stat_9'] = sum(1 for phrase in negative_phrases if phrase in text.lower())
-    features['stat_10'] = sum(1 for word in words if len(word) > 8) / len(words)
-    features['stat_11'] = text.count('?') / len(words)
-    professional_words = ['strategy', 'process', 'methodology', 'framework', 'solution']
-    features['stat_12'] = sum(1 for word in professional_words if word in text.lower()) / len(words)
-    example_indicators = ['example', 'instance', 'such as', 'like', 'including']
-    features['stat_13'] = sum(1 for indicator in example_indicators if indicator in text.lower())
-    confidence_words = ['will', 'would', 'can', 'able', 'ensure', 'achieve']
-    features['stat_14'] = sum(1 for word in confidence_words if word in text.lower()) / len(words)
+    features['stat_5'] = len(stats.vocabulary) / words
+    features['stat_6'] = lexicon_counts['stat_6'] / words
+    features['stat_7'] = lexicon_counts['stat_7'] / words
+    features['stat_8'] = lexicon_counts['stat_8'] / words
+    features['stat_9'] = lexicon_counts['stat_9']
+    features['stat_10'] = stats.long_words / words
+    features['stat_11'] = stats.questions / words
+    features['stat_12'] = lexicon_counts['stat_12'] / words
+    features['stat_13'] = lexicon_counts['stat_13']
+    features['stat_14'] = lexicon_counts['stat_14'] / words
     return features
+
+def extract_statistical_features(text: str, lexicon_counts: Optional[Dict] = None) -> Dict[str, float]:
+    """Statistical features of an answer.
+
+    ``lexicon_counts`` may carry per-lexicon hit counts already computed by a
+    ``LexiconMatcher`` that includes the ``stat_*`` lexicons; otherwise they
+    are computed here in one sweep.
+    """
+    if not text or len(text.strip()) == 0:
+        return {f'stat_{i}': 0.0 for i in range(15)}
+    if lexicon_counts is None:
+        lexicon_counts = default_matcher.counts(text.lower(), names=FEATURE_LEXICON_NAMES, lowered=True)
+    return statistical_features(TextStats.from_text(text), lexicon_counts)
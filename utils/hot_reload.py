@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+import time
+from utils.metrics import metrics, record_error
+
+# HOT_RELOAD_WATCH=1 polls the watched files every HOT_RELOAD_INTERVAL seconds
+HOT_RELOAD_WATCH = os.environ.get("HOT_RELOAD_WATCH", "0").strip().lower() in ("1", "true", "yes", "on")
+HOT_RELOAD_INTERVAL = float(os.environ.get("HOT_RELOAD_INTERVAL", 2.0))
+
+reloads_total = metrics.counter(
+    "hot_reloads_total", "Hot reloads of banks and models, by source and outcome", ("source", "status")
+)
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _digest(path):
+    """SHA-1 of a file's bytes, or None when it does not exist"""
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+class ReloadSource:
+    """Files backing one bank or model, and the callable that reloads it"""
+
+    __slots__ = ("name", "paths", "reload", "stats", "digests", "pending", "reloads", "last_reload",
+                 "last_seconds", "last_error", "detail")
+
+    def __init__(self, name, paths, reload):
+        self.name = name
+        self.paths = tuple(paths)
+        self.reload = reload
+        self.stats = tuple(_stat(path) for path in self.paths)
+        self.digests = tuple(_digest(path) for path in self.paths)
+        self.pending = None
+        self.reloads = 0
+        self.last_reload = None
+        self.last_seconds = None
+        self.last_error = None
+        self.detail = None
+
+    def status(self):
+        return {
+            "paths": list(self.paths),
+            "reloads": self.reloads,
+            "last_reload": self.last_reload,
+            "last_seconds": self.last_seconds,
+            "last_error": self.last_error,
+            "detail": self.detail
+        }
+
+class HotReloader:
+    """Reloads question banks and models in place, on request or when their files change.
+
+    Each source's ``reload`` builds the new version next to the current one
+    and swaps it in with a reference assignment, so requests in flight
+    finish on the version they started with. Reloads run one at a time,
+    which bounds memory to the current version plus one being built.
+
+    The watcher polls file stats and only reloads once a change has been
+    stable for one interval (so half-written files are not read) and the
+    content hash actually differs (so a touch is not a reload).
+    """
+
+    def __init__(self, interval=HOT_RELOAD_INTERVAL):
+        self.interval = interval
+        self.sources = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def add(self, name, paths, reload):
+        self.sources[name] = ReloadSource(name, paths, reload)
+
+    def reload(self, names=None):
+        """Reload the named sources (all by default); returns name -> outcome"""
+        names = list(self.sources) if names is None else list(names)
+        unknown = [name for name in names if name not in self.sources]
+        if unknown:
+            raise KeyError(f"unknown reload source(s): {', '.join(unknown)}")
+        with self._lock:
+            return {name: self._reload(self.sources[name]) for name in names}
+
+    def _reload(self, source):
+        # Fingerprint first: a change landing during the reload is picked up by the next check
+        stats = tuple(_stat(path) for path in source.paths)
+        digests = tuple(_digest(path) for path in source.paths)
+        start = time.perf_counter()
+        try:
+            detail = source.reload()
+        except Exception as e:
+            # Not retried by the watcher until the files change again
+            source.stats, source.pending = stats, None
+            source.last_error = str(e)
+            print(f"❌ Reload of {source.name} failed, still serving the previous version: {e}")
+            record_error(f"reload.{source.name}")
+            reloads_total.inc(source=source.name, status="failed")
+            return {"status": "failed", "error": str(e)}
+
+        source.stats, source.digests, source.pending = stats, digests, None
+        source.reloads += 1
+        source.last_reload = time.time()
+        source.last_seconds = round(time.perf_counter() - start, 3)
+        source.last_error = None
+        source.detail = detail
+        reloads_total.inc(source=source.name, status="reloaded")
+        print(f"🔄 Reloaded {source.name} in {source.last_seconds:.2f}s")
+        return {"status": "reloaded", "seconds": source.last_seconds, "detail": detail}
+
+    def changed(self):
+        """Sources whose files changed and have been stable since the previous check"""
+        changed = []
+        for source in self.sources.values():
+            stats = tuple(_stat(path) for path in source.paths)
+            if stats == source.stats:
+                source.pending = None
+                continue
+            if stats != source.pending:
+                source.pending = stats  # Still being written, or just noticed; check again next time
+                continue
+            digests = tuple(_digest(path) for path in source.paths)
+            if digests == source.digests:
+                source.stats, source.pending = stats, None  # Touched, not changed
+                continue
+            changed.append(source.name)
+        return changed
+
+    def check(self):
+        """Reload whatever changed; returns the outcomes"""
+        names = self.changed()
+        return self.reload(names) if names else {}
+
+    def start_watching(self):
+        """Poll for changes on a daemon thread (once per process; call after fork)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="hot-reload", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop_watching(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Hot reload check failed: {e}")
+
+    def status(self):
+        return {
+            "watching": self._thread is not None and self._thread.is_alive(),
+            "interval": self.interval,
+            "sources": {name: source.status() for name, source in self.sources.items()}
+        }
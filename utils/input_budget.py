@@ -0,0 +1,95 @@
+import os
+import numpy as np
+
+# Worst case per answer: the statistical features, lexicon sweep and TF-IDF
+# transform are linear in its length, capped by ANSWER_MAX_CHARS, and the
+# semantic encode is one batched call over at most ENCODE_MAX_CHUNKS
+# sequences of at most the model's max_seq_length tokens. So a request costs
+# no more than a fixed-size batch, whatever is pasted in
+# (benchmarks/long_answers.py measures it). A client-supplied question and
+# expected answer get the same budget and the same chunked encoding, and a
+# batch request holds at most BATCH_MAX_ITEMS answers.
+
+# Hard per-answer budget; longer answers are rejected (413) rather than scored slowly
+ANSWER_MAX_CHARS = int(os.environ.get("ANSWER_MAX_CHARS", 20000))
+# Words per encoder chunk (default: derived from the model's max_seq_length) and chunks per answer
+ENCODE_CHUNK_WORDS = int(os.environ.get("ENCODE_CHUNK_WORDS", 0)) or None
+ENCODE_MAX_CHUNKS = int(os.environ.get("ENCODE_MAX_CHUNKS", 16))
+# Answers per /communication/evaluation/batch request; larger batches are rejected (413)
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", 256))
+
+# Subword tokens per word is ~1.3 for English prose; leave headroom under the sequence cap
+TOKENS_PER_WORD = 1.5
+
+class InputTooLarge(ValueError):
+    """A request over the input budget"""
+
+def check_answer(answer, max_chars=ANSWER_MAX_CHARS, field="answer"):
+    """Raise InputTooLarge when ``answer`` (or another text ``field``) exceeds the character budget"""
+    if max_chars and answer and len(answer) > max_chars:
+        raise InputTooLarge(f"{field} is {len(answer)} characters; the limit is {max_chars}")
+
+def check_batch(items, max_items=BATCH_MAX_ITEMS):
+    """Raise InputTooLarge when a batch has more than ``max_items`` items"""
+    if max_items and len(items) > max_items:
+        raise InputTooLarge(f"batch has {len(items)} items; the limit is {max_items}")
+
+def words_per_chunk(max_seq_length, configured=ENCODE_CHUNK_WORDS):
+    """Words that fit one encoder sequence without truncation"""
+    if configured:
+        return configured
+    return max(16, int((max_seq_length or 256) / TOKENS_PER_WORD))
+
+def split_chunks(text, chunk_words, max_chunks=ENCODE_MAX_CHUNKS):
+    """Split ``text`` into word windows; returns (chunks, word counts).
+
+    Text that fits one window comes back unchanged, so short answers encode
+    exactly as before. Beyond ``max_chunks`` windows, evenly spaced windows
+    are kept so the start, middle and end of the answer all still count.
+    """
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [text], [max(1, len(words))]
+
+    starts = list(range(0, len(words), chunk_words))
+    if max_chunks and len(starts) > max_chunks:
+        keep = np.linspace(0, len(starts) - 1, max_chunks).round().astype(int)
+        starts = [starts[i] for i in sorted(set(keep.tolist()))]
+    chunks = [words[start:start + chunk_words] for start in starts]
+    return [" ".join(chunk) for chunk in chunks], [len(chunk) for chunk in chunks]
+
+def encode_pooled(encoder, texts, chunk_words, max_chunks=ENCODE_MAX_CHUNKS):
+    """Embed texts of any length: chunk, encode every chunk in one call, mean-pool per text.
+
+    Chunk embeddings are averaged weighted by their word counts, so the
+    whole answer counts toward similarity instead of only the part before
+    the model's truncation point. Returns a float32 (len(texts), dim) array;
+    a single string gives one row as a 1-D array.
+    """
+    single = isinstance(texts, str)
+    texts = [texts] if single else list(texts)
+
+    chunks, weights, owners = [], [], []
+    for owner, text in enumerate(texts):
+        text_chunks, text_weights = split_chunks(text, chunk_words, max_chunks)
+        chunks.extend(text_chunks)
+        weights.extend(text_weights)
+        owners.extend([owner] * len(text_chunks))
+
+    embeddings = np.asarray(encoder.encode(chunks, convert_to_numpy=True), dtype=np.float32)
+    if len(chunks) == len(texts):
+        return embeddings[0] if single else embeddings
+
+    pooled = np.zeros((len(texts), embeddings.shape[1]), dtype=np.float32)
+    totals = np.zeros(len(texts), dtype=np.float32)
+    weights = np.asarray(weights, dtype=np.float32)
+    np.add.at(pooled, owners, embeddings * weights[:, None])
+    np.add.at(totals, owners, weights)
+    pooled /= totals[:, None]
+
+    # Single-chunk rows are returned as encoded, not rescaled by a float division
+    counts = np.bincount(owners, minlength=len(texts))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    for owner in np.flatnonzero(counts == 1):
+        pooled[owner] = embeddings[starts[owner]]
+    return pooled[0] if single else pooled
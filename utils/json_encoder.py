@@ -1,49 +1,68 @@
 import json
+import math
 import numpy as np
-import pandas as pd
 from flask.json.provider import DefaultJSONProvider
+from utils.metrics import timed
+from utils.records import Record
 
-class CustomJSONEncoder(DefaultJSONProvider):
-    """Custom JSON encoder that handles NumPy and Pandas types"""
-    
-    def dumps(self, obj, **kwargs):
-        return json.dumps(obj, default=self.json_serializer, **kwargs)
-    
-    def loads(self, s):
-        return json.loads(s)
-    
-    @staticmethod
-    def json_serializer(obj):
-        """JSON serializer for objects not serializable by default json code"""
-        
-        if isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, (pd.Timestamp, pd.DatetimeIndex)):
-            return obj.isoformat()
-        elif hasattr(obj, 'item'):  # Handle numpy scalars
-            return obj.item()
-        elif hasattr(obj, 'tolist'):  # Handle numpy arrays
-            return obj.tolist()
-        
-        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
-
-def convert_numpy_types(obj):
-    """Recursively convert numpy types to native Python types"""
-    if isinstance(obj, dict):
-        return {key: convert_numpy_types(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(item) for item in obj]
-    elif isinstance(obj, (np.integer, np.int64, np.int32)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float64, np.float32)):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    elif hasattr(obj, 'item'):  # Handle numpy scalars
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder below produces the same JSON, more slowly
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+def json_default(obj):
+    """Serialize the types json/orjson do not know, in the same single pass"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    if isinstance(obj, np.floating) and obj.dtype.itemsize < 8:
+        return float(str(obj))  # Shortest repr at its own precision, as orjson writes float32
+    if isinstance(obj, np.generic):
         return obj.item()
-    else:
-        return obj
\ No newline at end of file
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):  # pandas / datetime timestamps
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _finite(obj):
+    """``obj`` as plain JSON values, with NaN and infinities as None, the way orjson writes them"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if obj is None or isinstance(obj, (str, int)):
+        return obj
+    return _finite(json_default(obj))
+
+def dumps(obj, indent=None):
+    """JSON text for responses, records and NumPy values included.
+
+    Compact, keys in insertion order, non-ASCII characters unescaped and
+    non-finite floats as null, with or without orjson.
+    """
+    if orjson is not None:
+        options = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=json_default, option=options).decode("utf-8")
+    options = {"indent": indent, "separators": None if indent else (",", ":"), "ensure_ascii": False,
+               "allow_nan": False}
+    try:
+        return json.dumps(obj, default=json_default, **options)
+    except ValueError:
+        # Only NaN or an infinity gets here; a second, converting pass keeps the output valid JSON
+        return json.dumps(_finite(obj), **options)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider: orjson when installed, else stdlib json, with no pre-conversion pass"""
+
+    def dumps(self, obj, **kwargs):
+        with timed("response.serialize"):
+            return dumps(obj, indent=kwargs.get("indent"))
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
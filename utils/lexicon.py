@@ -0,0 +1,109 @@
+import threading
+
+class LexiconMatcher:
+    """Counts substring hits for several named lexicons in one sweep.
+
+    The text is lowercased once and every distinct term across all lexicons
+    is searched once, so a term shared by two lexicons costs a single scan.
+    Counts keep the ``sum(1 for term in terms if term in text.lower())``
+    semantics: each listed term counts at most once, duplicates in a list
+    count twice.
+    """
+
+    def __init__(self, lexicons):
+        self.lexicons = {name: tuple(terms) for name, terms in lexicons.items()}
+        self.terms = tuple(dict.fromkeys(term for terms in self.lexicons.values() for term in terms))
+        self._selections = {}
+
+    def extend(self, lexicons):
+        """New matcher with extra lexicons added to this one"""
+        combined = dict(self.lexicons)
+        combined.update(lexicons)
+        return LexiconMatcher(combined)
+
+    def _select(self, names):
+        """Lexicons and distinct terms for a subset of lexicon names"""
+        if names is None:
+            return self.lexicons, self.terms
+        names = tuple(names)
+        selection = self._selections.get(names)
+        if selection is None:
+            lexicons = {name: self.lexicons.get(name, ()) for name in names}
+            terms = tuple(dict.fromkeys(term for terms in lexicons.values() for term in terms))
+            selection = (lexicons, terms)
+            self._selections[names] = selection
+        return selection
+
+    def found_terms(self, lower_text, names=None):
+        """Set of terms present in already-lowercased text"""
+        return {term for term in self._select(names)[1] if term in lower_text}
+
+    def counts(self, text, names=None, lowered=False):
+        """Per-lexicon hit counts for ``text``, optionally for some lexicons only"""
+        lower_text = text if lowered else text.lower()
+        found = {term for term in self._select(names)[1] if term in lower_text}
+        return self.counts_found(found, names)
+
+    def counts_found(self, found, names=None):
+        """Per-lexicon hit counts from a set of terms already known to be present"""
+        lexicons = self._select(names)[0]
+        return {name: sum(1 for term in lexicon if term in found) for name, lexicon in lexicons.items()}
+
+    def count(self, text, name, lowered=False):
+        """Hit count for a single lexicon"""
+        return self.counts(text, names=(name,), lowered=lowered)[name]
+
+# Lexicons used by utils.features.extract_statistical_features
+FEATURE_LEXICONS = {
+    'stat_6': ['api', 'system', 'database', 'server', 'code', 'algorithm', 'architecture', 'performance', 'security', 'debugging', 'compiler','syntax', 'spaced repetition', 'flashcards', 'mnemonic', 'cheat sheet', 'annotations','ide', 'vscode', 'autocomplete', 'leetcode', 'hackerrank', 'codewars', 'git','implement', 'optimize', 'deploy', 'integrate', 'refactor', 'simulate', 'unit test', 'benchmark'],
+    'stat_7': ['clear', 'efficient', 'scalable', 'maintain', 'optimize', 'collaborate'],
+    'stat_8': ['implemented', 'created', 'built', 'designed', 'led', 'managed', 'developed'],
+    'stat_9': ["don't know", 'no experience', 'not familiar', 'never used', "can't"],
+    'stat_12': ['strategy', 'process', 'methodology', 'framework', 'solution'],
+    'stat_13': ['example', 'instance', 'such as', 'like', 'including'],
+    'stat_14': ['will', 'would', 'can', 'able', 'ensure', 'achieve'],
+}
+
+# Lexicon used by TechnicalEvaluator._count_technical_terms
+TECHNICAL_TERMS = [
+    'api', 'database', 'algorithm', 'function', 'method', 'class', 'object',
+    'array', 'string', 'boolean', 'integer', 'async', 'await', 'promise',
+    'callback', 'closure', 'prototype', 'inheritance', 'polymorphism',
+    'encapsulation', 'abstraction', 'framework', 'library', 'module',
+    'component', 'service', 'controller', 'model', 'view', 'rest', 'json',
+    'xml', 'http', 'https', 'sql', 'nosql', 'crud', 'mvc', 'mvvm'
+]
+
+FEATURE_LEXICON_NAMES = tuple(FEATURE_LEXICONS)
+
+default_matcher = LexiconMatcher({**FEATURE_LEXICONS, 'technical_terms': TECHNICAL_TERMS})
+
+def experience_lexicon_names(experience_level):
+    """Lexicon names holding the positive/negative indicators of a level"""
+    return (experience_level, "positive"), (experience_level, "negative")
+
+_indicator_matchers = []
+_indicator_lock = threading.Lock()
+
+def matcher_for_indicators(experience_indicators):
+    """Default matcher extended with a model bundle's experience indicators.
+
+    Indicator lexicons are named ``(level_key, "positive"|"negative")`` using
+    the bundle's own keys. Matchers are cached per bundle object.
+    """
+    for indicators, matcher in _indicator_matchers:
+        if indicators is experience_indicators:
+            return matcher
+
+    extra = {}
+    for level, level_indicators in experience_indicators.items():
+        positive_name, negative_name = experience_lexicon_names(level)
+        extra[positive_name] = level_indicators.get("positive", [])
+        extra[negative_name] = level_indicators.get("negative", [])
+    matcher = default_matcher.extend(extra)
+
+    with _indicator_lock:
+        _indicator_matchers.append((experience_indicators, matcher))
+        # Only the current and a reloaded bundle are ever live
+        del _indicator_matchers[:-4]
+    return matcher
@@ -0,0 +1,272 @@
+import atexit
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+# Directory where each worker process publishes its samples, so a scrape of any one worker
+# reports all of them (see MetricsRegistry.start_snapshots); unset, a process reports only itself
+METRICS_DIR = os.environ.get("METRICS_DIR", "").strip()
+METRICS_SNAPSHOT_SECONDS = float(os.environ.get("METRICS_SNAPSHOT_SECONDS", 5))
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self, extra=None):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}"
+                for key, value in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self, extra=None):
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, {**(extra or {}), "le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, extra)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose samples are read from a callback at scrape time"""
+
+    def __init__(self, name, help_text, labelnames, callback, kind="gauge"):
+        super().__init__(name, help_text, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self, extra=None):
+        try:
+            samples = self.callback()
+        except Exception as e:
+            print(f"Error collecting metric {self.name}: {e}")
+            samples = {}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}"
+            for key, value in samples.items() if value is not None
+        ]
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class MetricsRegistry:
+    """Every metric of this process, each sample labelled with the process id.
+
+    Counters and histograms live in the worker that recorded them, so under
+    a prefork server one scrape would only see whichever worker answered.
+    With METRICS_DIR set, each worker writes its samples there every
+    METRICS_SNAPSHOT_SECONDS (``start_snapshots``) and /metrics on any
+    worker adds the other live workers' latest snapshots to its own; sum
+    over ``pid`` in queries. Without it, a scrape reports one process.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._snapshot_thread = None
+
+    def _add(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._add(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, labelnames, callback, kind="gauge"):
+        return self._add(CallbackMetric(name, help_text, labelnames, callback, kind))
+
+    def _samples(self):
+        extra = {"pid": os.getpid()}
+        return {name: metric.samples(extra) for name, metric in self._metrics.items()}
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        local = self._samples()
+        others = self._read_snapshots() if METRICS_DIR else []
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.extend(metric.header())
+            lines.extend(local[name])
+            for snapshot in others:
+                lines.extend(snapshot.get(name, ()))
+        return "\n".join(lines) + "\n"
+
+    def _snapshot_path(self, pid):
+        return os.path.join(METRICS_DIR, f"{pid}.json")
+
+    def write_snapshot(self):
+        """Publish this process's samples to METRICS_DIR, replacing its previous snapshot"""
+        path = self._snapshot_path(os.getpid())
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._samples(), f)
+        os.replace(tmp_path, path)
+
+    def _read_snapshots(self):
+        """Latest snapshots of the other live processes; those of exited ones are removed"""
+        snapshots = []
+        try:
+            entries = os.listdir(METRICS_DIR)
+        except OSError as e:
+            print(f"Error reading metrics snapshots from {METRICS_DIR}: {e}")
+            return snapshots
+        for entry in entries:
+            stem, extension = os.path.splitext(entry)
+            if extension != ".json" or not stem.isdigit() or int(stem) == os.getpid():
+                continue
+            if not _alive(int(stem)):
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(METRICS_DIR, entry))
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, entry), "r", encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Exited or mid-replace; its next snapshot will be read
+        return snapshots
+
+    def start_snapshots(self):
+        """Write this process's snapshot every METRICS_SNAPSHOT_SECONDS (after fork, in each worker)"""
+        if not (METRICS_ENABLED and METRICS_DIR) or self._snapshot_thread is not None:
+            return
+        os.makedirs(METRICS_DIR, exist_ok=True)
+
+        def loop():
+            while True:
+                try:
+                    self.write_snapshot()
+                except Exception as e:
+                    print(f"Error writing metrics snapshot: {e}")
+                time.sleep(METRICS_SNAPSHOT_SECONDS)
+
+        def remove():
+            with contextlib.suppress(OSError):
+                os.remove(self._snapshot_path(os.getpid()))
+
+        atexit.register(remove)
+        self._snapshot_thread = threading.Thread(target=loop, name="metrics-snapshots", daemon=True)
+        self._snapshot_thread.start()
+
+metrics = MetricsRegistry()
+
+stage_seconds = metrics.histogram(
+    "evaluation_stage_seconds", "Time spent in each evaluation stage", ("stage",)
+)
+errors_total = metrics.counter(
+    "evaluation_errors_total", "Errors caught while serving, by where they happened", ("where",)
+)
+
+class _StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stage_seconds.observe(time.perf_counter() - self.start, stage=self.stage)
+        return False
+
+_NOOP_TIMER = contextlib.nullcontext()
+
+def timed(stage):
+    """Context manager recording the duration of a stage (no-op when disabled)"""
+    return _StageTimer(stage) if METRICS_ENABLED else _NOOP_TIMER
+
+def record_error(where):
+    errors_total.inc(where=where)
@@ -0,0 +1,432 @@
+"""
+Versioned artifact directory for the communication evaluator.
+
+Replaces the pickled bundle with plain files:
+
+    manifest.json      schema version, model metadata and a sha256 per file
+    vocabulary.txt     TF-IDF terms, one per line, in column order
+    arrays/<hash>.npy  numeric arrays (idf, scalers, coefficients, trees),
+                       content-addressed so identical arrays are stored once
+
+The converter writes each version to ``<dir>.<hash>`` and points ``<dir>``,
+a symlink, at it with one atomic rename, so a reader (or a hot reload)
+sees either the old version or the new one, never a half-written or
+missing directory.
+
+Arrays are memory-mapped read-only, so every process on the host shares
+the same pages. Tree ensembles are evaluated by ``TreeEnsembleRegressor``
+and scalers and linear models by small numpy classes, all with the same
+``predict``/``transform`` interface and results as the scikit-learn
+objects they were converted from.
+
+Convert a pickled bundle with:
+
+    python -m utils.model_artifacts model/trained_communication_evaluator.pkl model/communication_evaluator
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import numpy as np
+from utils.enums import ExperienceLevel
+
+SCHEMA_VERSION = 1
+ARTIFACT_FORMAT = "communication-evaluator"
+MANIFEST_NAME = "manifest.json"
+VOCABULARY_NAME = "vocabulary.txt"
+DEFAULT_ARTIFACT_DIR = "model/communication_evaluator"
+
+# TfidfVectorizer parameters that can be stored in JSON and restored as-is
+VECTORIZER_PARAMS = (
+    "analyzer", "binary", "decode_error", "encoding", "input", "lowercase", "max_df", "max_features",
+    "min_df", "ngram_range", "norm", "smooth_idf", "stop_words", "strip_accents", "sublinear_tf",
+    "token_pattern", "use_idf"
+)
+
+class ArtifactSchemaError(ValueError):
+    """The artifact directory is missing, corrupt or of an unsupported schema"""
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _check_finite(X, allow_nan=False):
+    """Reject infinity, and NaN unless ``allow_nan``, as scikit-learn's input validation does"""
+    if allow_nan:
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity or a value too large for dtype('float64').")
+    elif not np.isfinite(X).all():
+        raise ValueError("Input X contains NaN or infinity.")
+    return X
+
+class StandardScalerArrays:
+    """``StandardScaler.transform`` over stored mean and scale arrays"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        # StandardScaler passes NaN through
+        X = _check_finite(np.array(X, dtype=np.float64), allow_nan=True)
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+class LinearRegressor:
+    """``LinearRegression.predict`` over a stored coefficient vector"""
+
+    def __init__(self, coef, intercept):
+        self.coef_ = coef
+        self.intercept_ = intercept
+
+    def predict(self, X):
+        return _check_finite(np.asarray(X, dtype=np.float64)) @ self.coef_ + self.intercept_
+
+class TreeEnsembleRegressor:
+    """Random forest or gradient boosting prediction over flattened tree arrays.
+
+    All trees share one set of node arrays; leaves point to themselves, so
+    walking every tree for every sample at once for ``max_depth`` steps
+    lands each walk on its leaf. Leaf values are then accumulated tree by
+    tree in the same order and arithmetic as scikit-learn.
+    """
+
+    def __init__(self, kind, roots, left, right, feature, threshold, value, max_depth,
+                 learning_rate=1.0, init=0.0):
+        if kind not in ("random_forest", "gradient_boosting"):
+            raise ArtifactSchemaError(f"unknown tree ensemble kind '{kind}'")
+        self.kind = kind
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.max_depth = int(max_depth)
+        self.learning_rate = float(learning_rate)
+        self.init = float(init)
+
+    def predict(self, X):
+        # Trees compare float32 features against float64 thresholds, as in scikit-learn. Its forests
+        # route NaN down a per-node branch that is not stored here, so NaN is rejected, not mis-scored
+        X = _check_finite(np.asarray(X, dtype=np.float32))
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        leaf_values = self.value[nodes]
+
+        if self.kind == "gradient_boosting":
+            out = np.full(X.shape[0], self.init, dtype=np.float64)
+            for j in range(leaf_values.shape[1]):
+                out += self.learning_rate * leaf_values[:, j]
+            return out
+
+        out = np.zeros(X.shape[0], dtype=np.float64)
+        for j in range(leaf_values.shape[1]):
+            out += leaf_values[:, j]
+        out /= leaf_values.shape[1]
+        return out
+
+def _flatten_trees(trees):
+    """Concatenate fitted sklearn trees into self-looping node arrays"""
+    roots, lefts, rights, features, thresholds, values = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        t = tree.tree_
+        if t.n_outputs != 1:
+            raise ValueError("only single-output trees are supported")
+        node_ids = np.arange(t.node_count, dtype=np.int64) + offset
+        is_leaf = t.children_left == -1
+        lefts.append(np.where(is_leaf, node_ids, t.children_left + offset))
+        rights.append(np.where(is_leaf, node_ids, t.children_right + offset))
+        features.append(np.where(is_leaf, 0, t.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, t.threshold))
+        values.append(t.value[:, 0, 0].astype(np.float64))
+        roots.append(offset)
+        offset += t.node_count
+        max_depth = max(max_depth, int(t.max_depth))
+    return {
+        "roots": np.asarray(roots, dtype=np.int64),
+        "left": np.concatenate(lefts).astype(np.int64),
+        "right": np.concatenate(rights).astype(np.int64),
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds).astype(np.float64),
+        "value": np.concatenate(values)
+    }, max_depth
+
+def _export_model(model):
+    """(manifest entry, arrays) for a supported regressor"""
+    name = type(model).__name__
+    if name == "RandomForestRegressor":
+        arrays, max_depth = _flatten_trees(model.estimators_)
+        return {"kind": "random_forest", "max_depth": max_depth}, arrays
+    if name == "GradientBoostingRegressor":
+        if model.init_ == "zero":
+            init = 0.0
+        elif type(model.init_).__name__ == "DummyRegressor":
+            init = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError("only constant initial estimators are supported")
+        arrays, max_depth = _flatten_trees(model.estimators_[:, 0])
+        return {
+            "kind": "gradient_boosting",
+            "max_depth": max_depth,
+            "learning_rate": float(model.learning_rate),
+            "init": init
+        }, arrays
+    if hasattr(model, "coef_") and np.ndim(model.coef_) == 1 and np.ndim(model.intercept_) == 0:
+        return {"kind": "linear", "intercept": float(model.intercept_)}, {
+            "coef": np.asarray(model.coef_, dtype=np.float64)
+        }
+    raise ValueError(f"unsupported model type {name}")
+
+def _level_key(level):
+    """JSON form of an experience indicator key, keeping its type"""
+    if isinstance(level, ExperienceLevel):
+        return {"type": "ExperienceLevel", "value": level.value}
+    return {"type": "str", "value": str(level)}
+
+def _restore_level_key(key):
+    if key["type"] == "ExperienceLevel":
+        return ExperienceLevel(key["value"])
+    if key["type"] == "str":
+        return key["value"]
+    raise ArtifactSchemaError(f"unknown experience level key type '{key['type']}'")
+
+def convert_bundle(bundle, output_dir, source=None):
+    """Write a communication bundle (as unpickled) as an artifact directory"""
+    vectorizer = bundle["tfidf_vectorizer"]
+    if getattr(vectorizer, "preprocessor", None) or getattr(vectorizer, "tokenizer", None) \
+            or callable(vectorizer.analyzer):
+        raise ValueError("vectorizers with custom callables cannot be stored")
+
+    terms = [None] * len(vectorizer.vocabulary_)
+    for term, column in vectorizer.vocabulary_.items():
+        if "\n" in term:
+            raise ValueError(f"vocabulary term {term!r} contains a newline")
+        terms[column] = term
+
+    output_dir = output_dir.rstrip("/")
+    tmp_dir = output_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(os.path.join(tmp_dir, "arrays"))
+    files = {}
+
+    def add_array(array):
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(array), allow_pickle=False)
+        data = buffer.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        relative = f"arrays/{digest[:20]}.npy"
+        if relative not in files:
+            with open(os.path.join(tmp_dir, relative), "wb") as f:
+                f.write(data)
+            files[relative] = {"sha256": digest, "bytes": len(data)}
+        return {"file": relative, "dtype": str(array.dtype), "shape": list(array.shape)}
+
+    with open(os.path.join(tmp_dir, VOCABULARY_NAME), "w", encoding="utf-8", newline="\n") as f:
+        f.write("\n".join(terms))
+    files[VOCABULARY_NAME] = {
+        "sha256": _sha256(os.path.join(tmp_dir, VOCABULARY_NAME)),
+        "bytes": os.path.getsize(os.path.join(tmp_dir, VOCABULARY_NAME))
+    }
+
+    params = vectorizer.get_params()
+    vectorizer_entry = {key: params[key] for key in VECTORIZER_PARAMS}
+    vectorizer_entry["dtype"] = np.dtype(params["dtype"]).name
+    vectorizer_entry["vocabulary_size"] = len(terms)
+    if vectorizer.use_idf:
+        vectorizer_entry["idf"] = add_array(np.asarray(vectorizer.idf_, dtype=np.float64))
+
+    models = {}
+    for key, model in bundle["models"].items():
+        entry, arrays = _export_model(model)
+        entry["arrays"] = {name: add_array(array) for name, array in arrays.items()}
+        models[key] = entry
+
+    scalers = {}
+    for key, scaler in bundle["scalers"].items():
+        scalers[key] = {
+            "mean": add_array(np.asarray(scaler.mean_, dtype=np.float64)) if scaler.with_mean else None,
+            "scale": add_array(np.asarray(scaler.scale_, dtype=np.float64)) if scaler.with_std else None
+        }
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "schema_version": SCHEMA_VERSION,
+        "source": source,
+        "feature_count": int(len(next(iter(bundle["scalers"].values())).scale_)),
+        "vectorizer": vectorizer_entry,
+        "models": models,
+        "scalers": scalers,
+        "experience_indicators": [
+            {"level": _level_key(level), "indicators": indicators}
+            for level, indicators in bundle["experience_indicators"].items()
+        ],
+        "is_trained": bool(bundle.get("is_trained", True)),
+        "files": files
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+    # The manifest hashes every file, so its own hash names this version
+    version_dir = f"{output_dir}.{_sha256(os.path.join(tmp_dir, MANIFEST_NAME))[:12]}"
+    if os.path.isdir(version_dir):
+        shutil.rmtree(tmp_dir)  # The same version is already there
+    else:
+        os.rename(tmp_dir, version_dir)
+    _point_to(output_dir, version_dir)
+    return manifest
+
+def _point_to(output_dir, version_dir):
+    """Make ``output_dir`` a symlink to ``version_dir`` in one rename, then drop the previous version"""
+    link_tmp = output_dir + ".link"
+    if os.path.lexists(link_tmp):
+        os.remove(link_tmp)
+    os.symlink(os.path.basename(version_dir), link_tmp)
+
+    if os.path.isdir(output_dir) and not os.path.islink(output_dir):
+        # A plain directory from an earlier converter: a rename cannot replace a directory with a
+        # link, so it is moved aside first (the only swap with a moment of no manifest)
+        aside = output_dir + ".old"
+        shutil.rmtree(aside, ignore_errors=True)
+        os.rename(output_dir, aside)
+        os.replace(link_tmp, output_dir)
+        shutil.rmtree(aside)
+        return
+
+    previous = os.path.realpath(output_dir) if os.path.islink(output_dir) else None
+    os.replace(link_tmp, output_dir)
+    if previous and previous != os.path.realpath(version_dir):
+        # Processes that already loaded it keep their mapped arrays; a load in progress fails and
+        # the hot reloader keeps the version it has
+        shutil.rmtree(previous, ignore_errors=True)
+
+def read_manifest(artifact_dir=DEFAULT_ARTIFACT_DIR):
+    path = os.path.join(artifact_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        raise ArtifactSchemaError(f"no {MANIFEST_NAME} in {artifact_dir}")
+    except ValueError as e:
+        raise ArtifactSchemaError(f"{path} is not valid JSON: {e}")
+
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ArtifactSchemaError(f"{artifact_dir} holds '{manifest.get('format')}', not '{ARTIFACT_FORMAT}'")
+    if manifest.get("schema_version") != SCHEMA_VERSION:
+        raise ArtifactSchemaError(
+            f"{artifact_dir} has schema version {manifest.get('schema_version')}; "
+            f"this code reads version {SCHEMA_VERSION}, re-run the converter"
+        )
+    return manifest
+
+def verify_artifacts(artifact_dir, manifest):
+    """Check every listed file against its recorded size and sha256"""
+    for relative, entry in manifest["files"].items():
+        path = os.path.join(artifact_dir, relative)
+        if not os.path.exists(path):
+            raise ArtifactSchemaError(f"missing artifact file {relative}")
+        if os.path.getsize(path) != entry["bytes"] or _sha256(path) != entry["sha256"]:
+            raise ArtifactSchemaError(f"artifact file {relative} does not match its manifest hash")
+
+def load_artifacts(artifact_dir=DEFAULT_ARTIFACT_DIR, verify=True):
+    """Load an artifact directory as a bundle dict shaped like the pickled one"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    manifest = read_manifest(artifact_dir)
+    if verify:
+        verify_artifacts(artifact_dir, manifest)
+
+    def array(entry):
+        if entry is None:
+            return None
+        if entry["file"] not in manifest["files"]:
+            raise ArtifactSchemaError(f"{entry['file']} is not listed in the manifest")
+        # Read-only mapping: pages come from the page cache, shared by every process
+        values = np.asarray(np.load(os.path.join(artifact_dir, entry["file"]), mmap_mode="r", allow_pickle=False))
+        if str(values.dtype) != entry["dtype"] or list(values.shape) != entry["shape"]:
+            raise ArtifactSchemaError(f"{entry['file']} has dtype/shape {values.dtype}{values.shape}, "
+                                      f"expected {entry['dtype']}{tuple(entry['shape'])}")
+        return values
+
+    try:
+        spec = manifest["vectorizer"]
+        with open(os.path.join(artifact_dir, VOCABULARY_NAME), "r", encoding="utf-8", newline="\n") as f:
+            terms = f.read().split("\n")
+        if len(terms) != spec["vocabulary_size"]:
+            raise ArtifactSchemaError(f"vocabulary has {len(terms)} terms, expected {spec['vocabulary_size']}")
+
+        params = {key: spec[key] for key in VECTORIZER_PARAMS}
+        params["ngram_range"] = tuple(params["ngram_range"])
+        vectorizer = TfidfVectorizer(dtype=np.dtype(spec["dtype"]).type, **params)
+        vectorizer.vocabulary_ = {term: column for column, term in enumerate(terms)}
+        vectorizer.fixed_vocabulary_ = False
+        if params["use_idf"]:
+            vectorizer.idf_ = array(spec["idf"])
+
+        models = {}
+        for key, entry in manifest["models"].items():
+            arrays = {name: array(value) for name, value in entry["arrays"].items()}
+            if entry["kind"] == "linear":
+                models[key] = LinearRegressor(arrays["coef"], entry["intercept"])
+            else:
+                models[key] = TreeEnsembleRegressor(
+                    entry["kind"], max_depth=entry["max_depth"], learning_rate=entry.get("learning_rate", 1.0),
+                    init=entry.get("init", 0.0), **arrays
+                )
+
+        scalers = {
+            key: StandardScalerArrays(array(entry["mean"]), array(entry["scale"]))
+            for key, entry in manifest["scalers"].items()
+        }
+        # Every model sees the same [statistical features | TF-IDF] row
+        feature_count = manifest["feature_count"]
+        for key, scaler in scalers.items():
+            for values in (scaler.mean_, scaler.scale_):
+                if values is not None and values.shape != (feature_count,):
+                    raise ArtifactSchemaError(f"scaler '{key}' expects {values.shape[0]} features, not {feature_count}")
+        for key, model in models.items():
+            if isinstance(model, LinearRegressor) and model.coef_.shape != (feature_count,):
+                raise ArtifactSchemaError(f"model '{key}' expects {model.coef_.shape[0]} features, not {feature_count}")
+
+        experience_indicators = {
+            _restore_level_key(item["level"]): item["indicators"]
+            for item in manifest["experience_indicators"]
+        }
+    except (KeyError, TypeError) as e:
+        raise ArtifactSchemaError(f"{artifact_dir}/{MANIFEST_NAME} is missing or has a malformed field: {e}")
+
+    return {
+        "tfidf_vectorizer": vectorizer,
+        "models": models,
+        "scalers": scalers,
+        "experience_indicators": experience_indicators,
+        "is_trained": manifest["is_trained"]
+    }
+
+def main(argv):
+    if len(argv) != 3:
+        print("usage: python -m utils.model_artifacts <bundle.pkl> <output dir>")
+        return 2
+    from utils.model_loader import load_pickled_bundle
+    source, output_dir = argv[1], argv[2]
+    manifest = convert_bundle(load_pickled_bundle(source), output_dir, source=os.path.basename(source))
+    total = sum(entry["bytes"] for entry in manifest["files"].values())
+    print(f"Wrote {len(manifest['files'])} files ({total / 1024:.0f} KiB) to {output_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
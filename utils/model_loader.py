@@ -1,19 +1,39 @@
+import hashlib
+import os
 import pickle
 import sys
 from utils.enums import ExperienceLevel
+from utils.model_artifacts import DEFAULT_ARTIFACT_DIR, MANIFEST_NAME, load_artifacts
 
-# Ensure global registration
-sys.modules['__main__'].ExperienceLevel = ExperienceLevel
+# Artifact directory written by ``python -m utils.model_artifacts``; the pickle is the fallback
+COMMUNICATION_ARTIFACT_DIR = os.environ.get("COMMUNICATION_ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR)
+COMMUNICATION_PICKLE_PATH = "model/trained_communication_evaluator.pkl"
 
-# def load_model():
-#     with open('model/trained_communication_evaluator.pkl', 'rb') as f:
-#         return pickle.load(f)
+def load_pickled_bundle(path=COMMUNICATION_PICKLE_PATH):
+    # The bundle was pickled from a script defining ExperienceLevel in __main__
+    sys.modules['__main__'].ExperienceLevel = ExperienceLevel
+    with open(path, "rb") as f:
+        return pickle.load(f)
 
-import pickle
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 def load_model():
-    with open("model/trained_communication_evaluator.pkl", "rb") as f:
-        bundle = pickle.load(f)
-    print("🔍 Loaded model bundle type:", type(bundle))
-    print("📦 Bundle content:", bundle)
+    """The communication bundle, with ``digest`` naming the exact files it came from"""
+    if os.path.exists(os.path.join(COMMUNICATION_ARTIFACT_DIR, MANIFEST_NAME)):
+        # Schema errors propagate: a bad artifact directory must not silently fall back
+        # Resolved once, so a version swapped in meanwhile cannot mix with this one
+        source = os.path.realpath(COMMUNICATION_ARTIFACT_DIR)
+        bundle = load_artifacts(source)
+        # The manifest records a sha256 per file, so its own hash covers the whole directory
+        bundle["digest"] = _file_digest(os.path.join(source, MANIFEST_NAME))
+    else:
+        bundle = load_pickled_bundle()
+        source = COMMUNICATION_PICKLE_PATH
+        bundle["digest"] = _file_digest(COMMUNICATION_PICKLE_PATH)
+    print(f"🔍 Loaded communication model bundle from {source}: {', '.join(sorted(bundle))}")
     return bundle
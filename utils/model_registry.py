@@ -0,0 +1,154 @@
+import threading
+import time
+from utils.metrics import record_error
+
+class LazyModel:
+    """A model loaded on first use or ahead of time by a background thread.
+
+    ``loader`` builds the model; the optional ``warmup`` callable receives it
+    and runs a dummy inference so the first real request is not the slow one.
+    """
+
+    def __init__(self, name, loader, warmup=None):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.state = "pending"
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.version = 0
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def get(self):
+        """Return the model, loading it on this thread if nobody has yet"""
+        if self.state == "ready":
+            return self.value
+        return self.load()
+
+    def load(self):
+        with self._lock:
+            if self.state == "ready":
+                return self.value
+
+            self.state = "loading"
+            self.error = None
+            try:
+                value, self.load_seconds, self.warmup_seconds = self._build()
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                print(f"❌ Failed to load {self.name}: {e}")
+                record_error(f"load.{self.name}")
+                raise
+
+            self.value = value
+            self.state = "ready"
+            self.version += 1
+            print(f"✅ Loaded {self.name} in {self.load_seconds:.2f}s")
+            return value
+
+    def reload(self):
+        """Build a new value next to the current one, then swap it in.
+
+        Requests that already hold the old value finish with it. If the
+        build fails the old value keeps serving. A model that was never
+        loaded is simply loaded.
+        """
+        with self._reload_lock:
+            if self.state != "ready":
+                return self.load()
+            try:
+                value, load_seconds, warmup_seconds = self._build()
+            except Exception as e:
+                print(f"❌ Failed to reload {self.name}, keeping the current version: {e}")
+                record_error(f"reload.{self.name}")
+                raise
+            self.replace(value)
+            self.load_seconds, self.warmup_seconds = load_seconds, warmup_seconds
+            print(f"🔄 Reloaded {self.name} in {load_seconds:.2f}s")
+            return value
+
+    def replace(self, value):
+        """Swap in a value built elsewhere; a single reference assignment"""
+        with self._lock:
+            self.value = value
+            self.state = "ready"
+            self.error = None
+            self.version += 1
+
+    def _build(self):
+        """Run the loader and the warm-up; returns (value, load seconds, warm-up seconds)"""
+        start = time.perf_counter()
+        value = self.loader()
+        load_seconds = round(time.perf_counter() - start, 3)
+
+        warmup_seconds = None
+        if self.warmup is not None:
+            start = time.perf_counter()
+            try:
+                self.warmup(value)
+                warmup_seconds = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                # A failed warm-up leaves a usable model, just a cold one
+                print(f"Warm-up of {self.name} failed: {e}")
+                record_error(f"warmup.{self.name}")
+        return value, load_seconds, warmup_seconds
+
+    def status(self):
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "version": self.version,
+            "error": self.error
+        }
+
+class ModelRegistry:
+    """Named lazy models with background loading and readiness reporting"""
+
+    def __init__(self):
+        self._models = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def register(self, model):
+        self._models[model.name] = model
+        return model
+
+    def get(self, name):
+        return self._models[name].get()
+
+    def __getitem__(self, name):
+        return self._models[name]
+
+    def load_all(self):
+        """Load and warm every registered model, in registration order"""
+        for model in list(self._models.values()):
+            try:
+                model.load()
+            except Exception:
+                pass  # Reported through status(); first use will retry
+
+    def start_background(self):
+        """Start loading all models on a daemon thread (once per process)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.load_all, name="model-warmup", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def all_ready(self):
+        return all(model.ready for model in self._models.values())
+
+    def status(self):
+        return {name: model.status() for name, model in self._models.items()}
+
+# Process-wide registry shared by the evaluators and the app
+registry = ModelRegistry()
@@ -0,0 +1,225 @@
+import collections
+import contextlib
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from utils.metrics import metrics, record_error
+
+# Profiles are taken only when asked for: a request carrying X-Profile-Token equal to
+# PROFILE_TOKEN, or a PROFILE_SAMPLE_RATE fraction of requests. Neither set: no cost.
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN") or None
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+# Profiles started per rolling minute, whatever triggers them
+PROFILE_MAX_PER_MINUTE = int(os.environ.get("PROFILE_MAX_PER_MINUTE", 6))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 2))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+# Newest profiles kept in PROFILE_DIR; older ones are deleted
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 200))
+# Worker threads a request hands work to (the batched encoder); sampled too while busy
+PROFILE_HELPER_THREADS = tuple(
+    name.strip() for name in os.environ.get("PROFILE_HELPER_THREADS", "batching-encoder").split(",") if name.strip()
+)
+# A helper whose innermost frame is in these modules is idle, waiting for work
+_IDLE_MODULES = ("threading.py", "queue.py")
+
+TOP_FRAMES = 15
+
+profiles_total = metrics.counter(
+    "profiles_total", "Request profiles by trigger and outcome", ("trigger", "outcome")
+)
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _depth(frame):
+    depth = 0
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
+
+class _Capture:
+    """Samples one thread's stack on a background thread until stopped"""
+
+    def __init__(self, name, trigger, thread_id, interval, skip=0, helpers=()):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{uuid.uuid4().hex[:8]}"
+        self.name = name
+        self.trigger = trigger
+        self.thread_id = thread_id
+        self.interval = interval
+        # Frames above the profiled call (server, framework) are left out of every stack
+        self.skip = skip
+        self.helpers = helpers
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name=f"profile-{self.id}", daemon=True)
+        self.started = time.perf_counter()
+        self.seconds = None
+        self._sampler.start()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self._stop.is_set():
+                break
+            self._record(frames.get(self.thread_id), self.skip)
+            # Looked up each time: a helper may start after the profile does
+            for thread in threading.enumerate() if self.helpers else ():
+                frame = frames.get(thread.ident) if thread.name in self.helpers else None
+                if frame is not None and os.path.basename(frame.f_code.co_filename) not in _IDLE_MODULES:
+                    # Helper stacks get their own root; they may include other requests' work
+                    self._record(frame, 0, f"[{thread.name}]")
+
+    def _record(self, frame, skip, root=None):
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame.f_code))
+            frame = frame.f_back
+        stack = stack[::-1][skip:]
+        if stack:
+            self.stacks[";".join([root] + stack if root else stack)] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def summary(self):
+        """Top frames by samples spent in them (self) and under them (total).
+
+        Busy helper-thread samples count alongside the request thread's.
+        """
+        own, total = collections.Counter(), collections.Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        samples = sum(self.stacks.values())
+
+        def top(counter):
+            return [
+                {"frame": frame, "samples": count, "percent": round(100.0 * count / samples, 1)}
+                for frame, count in counter.most_common(TOP_FRAMES)
+            ]
+
+        return {
+            "id": self.id,
+            "name": self.name,
+            "trigger": self.trigger,
+            "seconds": round(self.seconds, 4),
+            "interval_ms": self.interval * 1000.0,
+            "samples": samples,
+            "top_self": top(own),
+            "top_total": top(total)
+        }
+
+class RequestProfiler:
+    """Opt-in sampling profiles of single requests.
+
+    A triggered request is sampled on a side thread every ``interval_ms``,
+    along with any busy ``helper_threads`` it hands work to; when it
+    finishes, its stacks are written to ``directory`` in collapsed form
+    (``<id>.collapsed``, one ``frame;frame;frame count`` line per stack,
+    ready for flamegraph.pl or speedscope) next to ``<id>.json`` with the
+    top frames. At most ``max_per_minute`` profiles start per rolling
+    minute; the rest run unprofiled.
+    """
+
+    def __init__(self, token=PROFILE_TOKEN, sample_rate=PROFILE_SAMPLE_RATE, max_per_minute=PROFILE_MAX_PER_MINUTE,
+                 interval_ms=PROFILE_INTERVAL_MS, directory=PROFILE_DIR, keep=PROFILE_KEEP,
+                 helper_threads=PROFILE_HELPER_THREADS):
+        self.token = token
+        self.sample_rate = sample_rate
+        self.max_per_minute = max_per_minute
+        self.interval = max(0.0005, interval_ms / 1000.0)
+        self.directory = directory
+        self.keep = keep
+        self.helper_threads = helper_threads
+        self.enabled = bool(token or sample_rate > 0) and max_per_minute > 0
+        self._started = collections.deque()
+        self._lock = threading.Lock()
+        self.last = None
+
+    def trigger(self, token=None):
+        """Why this request should be profiled ("header" or "sampled"), or None"""
+        if token and self.token and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8")):
+            return "header"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def start(self, name, trigger, root=None):
+        """Begin sampling the calling thread; None when over the per-minute cap.
+
+        Stacks are rooted at ``root`` (default: the caller's frame).
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] > 60.0:
+                self._started.popleft()
+            if len(self._started) >= self.max_per_minute:
+                profiles_total.inc(trigger=trigger, outcome="capped")
+                return None
+            self._started.append(now)
+        root = root or sys._getframe(1)
+        return _Capture(name, trigger, threading.get_ident(), self.interval, _depth(root) - 1, self.helper_threads)
+
+    def finish(self, capture):
+        """Stop sampling and write the profile; returns its summary"""
+        capture.stop()
+        summary = capture.summary()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, capture.id)
+            with open(base + ".collapsed", "w") as f:
+                for stack, count in capture.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(base + ".json", "w") as f:
+                json.dump(summary, f, indent=2)
+            self._prune()
+            profiles_total.inc(trigger=capture.trigger, outcome="written")
+        except OSError as e:
+            print(f"Could not write profile {capture.id}: {e}")
+            record_error("profiling.write")
+        self.last = summary
+        return summary
+
+    @contextlib.contextmanager
+    def capture(self, name, trigger="manual"):
+        """Profile the block unconditionally (still within the cap), e.g. from a script"""
+        # Root the stacks at the frame running the with block, not at contextlib
+        capture = self.start(name, trigger, sys._getframe(2))
+        try:
+            yield capture
+        finally:
+            if capture is not None:
+                self.finish(capture)
+
+    def _prune(self):
+        if not self.keep:
+            return
+        summaries = sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+        for name in summaries[:-self.keep]:
+            for suffix in (".json", ".collapsed"):
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(self.directory, name[:-len(".json")] + suffix))
+
+    def stats(self):
+        with self._lock:
+            recent = sum(1 for started in self._started if time.monotonic() - started <= 60.0)
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "max_per_minute": self.max_per_minute,
+            "last_minute": recent,
+            "directory": self.directory,
+            "last": self.last["id"] if self.last else None
+        }
+
+profiler = RequestProfiler()
@@ -0,0 +1,147 @@
+import bisect
+import numpy as np
+import pandas as pd
+from utils.embedding_index import content_hash
+
+def question_hash(question_text, expected_answer):
+    """Identity of a bank question that survives reloads, unlike its row id"""
+    return content_hash(f"{question_text}\n{expected_answer}")
+
+class EmptyQuestionBank(LookupError):
+    """The technical question bank has no rows to pick from"""
+
+class ComplexityIndex:
+    """Question bank rows grouped by technology and sorted by complexity.
+
+    Each lowercased technology maps to a sorted list of ``complexity_score``
+    values plus the matching row ids, so finding the question closest to a
+    target complexity is a binary search per requested skill.
+    """
+
+    def __init__(self, question_bank):
+        technologies = question_bank["technology"].astype(str).str.lower().to_numpy()
+        scores = question_bank["complexity_score"].to_numpy(dtype=float)
+        rows = np.arange(len(scores))
+
+        # Sort by score, then row id, so ties are always in a stable order
+        order = np.lexsort((rows, scores))
+        self._all = (scores[order].tolist(), order.tolist())
+
+        self.by_technology = {}
+        for technology in np.unique(technologies):
+            selected = order[technologies[order] == technology]
+            self.by_technology[technology] = (scores[selected].tolist(), selected.tolist())
+
+    def technologies(self):
+        return list(self.by_technology)
+
+    def closest(self, skills, target, exclude_ids=None, rotation=0):
+        """Row id whose complexity is closest to ``target`` across ``skills``.
+
+        Rows in ``exclude_ids`` are skipped unless every candidate is
+        excluded. Equally close rows are ordered by row id and ``rotation``
+        picks among them. Unknown skills fall back to the whole bank. None
+        when the bank is empty.
+        """
+        buckets = [self.by_technology[skill] for skill in skills if skill in self.by_technology]
+        if not buckets:
+            buckets = [self._all]
+
+        exclude = set(exclude_ids) if exclude_ids else ()
+        best, ties = self._merge(buckets, target, exclude)
+        if not ties and exclude:
+            # Everything requested was already asked; allow a repeat
+            best, ties = self._merge(buckets, target, ())
+        if not ties:
+            return None
+
+        ties.sort()
+        return ties[rotation % len(ties)]
+
+    @classmethod
+    def _merge(cls, buckets, target, exclude):
+        best = float("inf")
+        ties = []
+        for scores, rows in buckets:
+            diff, candidates = cls._nearest(scores, rows, target, exclude)
+            if diff < best:
+                best, ties = diff, candidates
+            elif diff == best:
+                ties.extend(candidates)
+        return best, ties
+
+    @staticmethod
+    def _nearest(scores, rows, target, exclude):
+        """Closest distance in one sorted bucket and every row at that distance"""
+        position = bisect.bisect_left(scores, target)
+
+        left = position - 1
+        while left >= 0 and rows[left] in exclude:
+            left -= 1
+        right = position
+        while right < len(scores) and rows[right] in exclude:
+            right += 1
+
+        left_diff = abs(scores[left] - target) if left >= 0 else float("inf")
+        right_diff = abs(scores[right] - target) if right < len(scores) else float("inf")
+        best = min(left_diff, right_diff)
+
+        candidates = []
+        if left >= 0 and left_diff == best:
+            score = scores[left]
+            while left >= 0 and scores[left] == score:
+                if rows[left] not in exclude:
+                    candidates.append(rows[left])
+                left -= 1
+        if right < len(scores) and right_diff == best:
+            score = scores[right]
+            while right < len(scores) and scores[right] == score:
+                if rows[right] not in exclude:
+                    candidates.append(rows[right])
+                right += 1
+        return best, candidates
+
+class QuestionBank:
+    """One version of the technical question bank and what is derived from it.
+
+    The frame, the complexity index and the plain-Python rows always belong
+    to the same CSV read, so a reader holding one bank never mixes versions.
+    """
+
+    __slots__ = ("frame", "index", "rows", "rows_by_hash")
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.index = ComplexityIndex(frame)
+        # Plain-Python rows, so picking a question allocates no DataFrame
+        self.rows = [
+            {
+                "question_text": str(row.question_text),
+                "expected_answer": str(row.expected_answer),
+                "complexity_score": float(row.complexity_score),
+                "technology": str(row.technology),
+                "bloom_label": str(row.bloom_label)
+            }
+            for row in frame.itertuples(index=False)
+        ]
+        self.rows_by_hash = {}
+        for row_id, row in enumerate(self.rows):
+            digest = question_hash(row["question_text"], row["expected_answer"])
+            self.rows_by_hash.setdefault(digest, []).append(row_id)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def row_ids(self, hashes):
+        """Rows of this bank holding the questions with these hashes; missing ones are skipped"""
+        return [row_id for digest in hashes for row_id in self.rows_by_hash.get(digest, ())]
+
+    def expected_answers(self):
+        return [row["expected_answer"] for row in self.rows]
+
+    def qa_texts(self):
+        return [row["question_text"] + " " + row["expected_answer"] for row in self.rows]
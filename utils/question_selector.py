@@ -1,14 +1,123 @@
+import os
+import random
+import threading
+from collections import OrderedDict
 import pandas as pd
 
-def get_question_by_level(level: str, path='model/softskill_dataset.csv') -> str:
-    df = pd.read_csv(path)
-    level_map = {
+DEFAULT_DATASET_PATH = 'model/softskill_dataset.csv'
+NO_QUESTION_MESSAGE = "No question available for this level."
+
+level_map = {
     "intern": "basic",
     "associate": "medium",
     "software engineer": "hard"
-    }
-    mapped_level = level_map.get(level, "basic")
-    filtered = df[df['Level'].str.lower() == mapped_level.lower()]
-    if filtered.empty:
-        return "No question available for this level."
-    return filtered.sample(1).iloc[0]['Question']
+}
+
+class ShuffledCursor:
+    """Walks a random permutation of a bucket, reshuffling once it is used up"""
+
+    __slots__ = ("order", "position", "rng")
+
+    def __init__(self, size, rng):
+        self.order = list(range(size))
+        self.position = len(self.order)
+        self.rng = rng
+
+    def next(self):
+        if self.position >= len(self.order):
+            self.rng.shuffle(self.order)
+            self.position = 0
+        index = self.order[self.position]
+        self.position += 1
+        return index
+
+class QuestionStore:
+    """Communication questions loaded once and bucketed by level"""
+
+    def __init__(self, path=DEFAULT_DATASET_PATH, max_sessions=10000, seed=None):
+        self.path = path
+        self.buckets = self._read_buckets(path)
+        self.max_sessions = max_sessions
+        self.seed = seed
+        self._rng_inst = None
+        self._rng_pid = None
+        self._rng_lock = threading.Lock()
+        self._cursors = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def _rng(self):
+        """This process's RNG, created on first use so forked workers do not share one sequence"""
+        if self._rng_pid != os.getpid():
+            with self._rng_lock:
+                if self._rng_pid != os.getpid():
+                    # Unseeded, each process draws its own seed from the OS; an explicit seed stays reproducible
+                    self._rng_inst = random.Random(self.seed)
+                    self._rng_pid = os.getpid()
+        return self._rng_inst
+
+    @staticmethod
+    def _read_buckets(path):
+        df = pd.read_csv(path, usecols=['Question', 'Level'])
+        df = df.dropna()
+        levels = df['Level'].astype(str).str.strip().str.lower()
+        return {
+            level: tuple(questions)
+            for level, questions in df['Question'].astype(str).groupby(levels, sort=False)
+        }
+
+    def reload(self, path=None):
+        """Read the dataset again and swap the buckets in; returns the new question count"""
+        buckets = self._read_buckets(path or self.path)
+        self.buckets = buckets
+        return sum(len(bucket) for bucket in buckets.values())
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    def sample(self, level: str, session_id=None) -> str:
+        """Pick a question for a UI level; with a session id, avoid repeats"""
+        mapped_level = level_map.get(level, "basic")
+        bucket = self.buckets.get(mapped_level)
+        if not bucket:
+            return NO_QUESTION_MESSAGE
+
+        if session_id is None:
+            return bucket[self._rng.randrange(len(bucket))]
+
+        key = (str(session_id), mapped_level)
+        with self._lock:
+            cursor = self._cursors.get(key)
+            # A reload that resized the bucket restarts the session's rotation
+            if cursor is None or len(cursor.order) != len(bucket):
+                cursor = ShuffledCursor(len(bucket), random.Random(self._rng.random()))
+                self._cursors[key] = cursor
+                # Forget the least recently used sessions beyond the bound
+                while len(self._cursors) > self.max_sessions:
+                    self._cursors.popitem(last=False)
+            else:
+                self._cursors.move_to_end(key)
+            return bucket[cursor.next()]
+
+    def forget_session(self, session_id):
+        """Drop the no-repeat state kept for a session"""
+        with self._lock:
+            for key in [key for key in self._cursors if key[0] == str(session_id)]:
+                del self._cursors[key]
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_question_store(path=DEFAULT_DATASET_PATH) -> QuestionStore:
+    """Return the shared store for a dataset, loading it on first use"""
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = QuestionStore(path)
+                _stores[path] = store
+    return store
+
+def get_question_by_level(level: str, path=DEFAULT_DATASET_PATH, session_id=None) -> str:
+    return get_question_store(path).sample(level, session_id=session_id)
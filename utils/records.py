@@ -0,0 +1,73 @@
+class Record:
+    """Small typed payload serialized directly by the JSON provider.
+
+    Subclasses list their fields in ``__slots__``; ``to_dict`` yields them in
+    that order, which is the order they appear in responses.
+    """
+
+    __slots__ = ()
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+class TechnicalQuestion(Record):
+    """A technical question from the bank"""
+
+    __slots__ = ("question", "expected_answer", "complexity_score", "technology", "bloom_label", "question_id",
+                 "type")
+
+    def __init__(self, question: str, expected_answer: str, complexity_score: float, technology: str,
+                 bloom_label: str, question_id: int, type: str = "technical"):
+        self.question = question
+        self.expected_answer = expected_answer
+        self.complexity_score = complexity_score
+        self.technology = technology
+        self.bloom_label = bloom_label
+        self.question_id = question_id
+        self.type = type
+
+class AnswerAnalysis(Record):
+    __slots__ = ("word_count", "technical_terms", "completeness")
+
+    def __init__(self, word_count: int, technical_terms: int, completeness: float):
+        self.word_count = word_count
+        self.technical_terms = technical_terms
+        self.completeness = completeness
+
+class TechnicalEvaluation(Record):
+    """Result of ``TechnicalEvaluator.get_comprehensive_evaluation``"""
+
+    __slots__ = ("technical_accuracy", "semantic_similarity", "current_complexity", "next_complexity",
+                 "technology", "bloom_level", "answer_analysis", "encoder_tier")
+
+    def __init__(self, technical_accuracy: float, semantic_similarity: float, current_complexity: float,
+                 next_complexity: float, technology: str, bloom_level: str, answer_analysis: AnswerAnalysis,
+                 encoder_tier: str = None):
+        self.technical_accuracy = technical_accuracy
+        self.semantic_similarity = semantic_similarity
+        self.current_complexity = current_complexity
+        self.next_complexity = next_complexity
+        self.technology = technology
+        self.bloom_level = bloom_level
+        self.answer_analysis = answer_analysis
+        self.encoder_tier = encoder_tier
+
+class EvaluationResponse(Record):
+    """Body of the evaluation routes: an evaluation plus its question and level"""
+
+    __slots__ = ("evaluation", "question", "level", "type")
+
+    def __init__(self, evaluation, question: str, level: str, type: str):
+        self.evaluation = evaluation
+        self.question = question
+        self.level = level
+        self.type = type
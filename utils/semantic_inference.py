@@ -0,0 +1,76 @@
+import os
+
+INFERENCE_MODES = ("fp32", "int8")
+
+def _env_int(name):
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+class InferenceConfig:
+    """How the semantic encoder runs on CPU.
+
+    ``mode`` is ``fp32`` (reference) or ``int8`` (dynamic quantization of the
+    linear layers). ``num_threads`` sets torch intra-op threads and
+    ``max_seq_length`` caps the tokens fed to the transformer.
+    """
+
+    __slots__ = ("mode", "num_threads", "max_seq_length")
+
+    def __init__(self, mode="fp32", num_threads=None, max_seq_length=None):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{mode}', expected one of {INFERENCE_MODES}")
+        self.mode = mode
+        self.num_threads = num_threads
+        self.max_seq_length = max_seq_length
+
+    @classmethod
+    def from_env(cls):
+        """SEMANTIC_INFERENCE_MODE, SEMANTIC_NUM_THREADS, SEMANTIC_MAX_SEQ_LENGTH"""
+        return cls(
+            mode=os.environ.get("SEMANTIC_INFERENCE_MODE", "fp32").strip().lower() or "fp32",
+            num_threads=_env_int("SEMANTIC_NUM_THREADS"),
+            max_seq_length=_env_int("SEMANTIC_MAX_SEQ_LENGTH")
+        )
+
+    def suffix(self):
+        """Tag for artifacts that depend on this config ('' for the fp32 default)"""
+        suffix = ""
+        if self.mode != "fp32":
+            suffix += f"-{self.mode}"
+        if self.max_seq_length:
+            suffix += f"-seq{self.max_seq_length}"
+        return suffix
+
+    def model_key(self, model_name):
+        """Identity of the embeddings a model produces under this config"""
+        return model_name + self.suffix()
+
+    def as_dict(self):
+        return {"mode": self.mode, "num_threads": self.num_threads, "max_seq_length": self.max_seq_length}
+
+def set_torch_threads(num_threads):
+    """Set torch intra-op threads, if torch is available"""
+    if not num_threads:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(int(num_threads))
+
+def apply_inference_config(model, config):
+    """Apply threads, sequence cap and quantization to a SentenceTransformer"""
+    set_torch_threads(config.num_threads)
+
+    if config.max_seq_length:
+        model.max_seq_length = min(int(config.max_seq_length), model.max_seq_length or config.max_seq_length)
+
+    if config.mode == "int8":
+        import torch
+        if not isinstance(model, torch.nn.Module):
+            return model  # Nothing to quantize, e.g. the hashing stand-in
+        quantization = getattr(torch, "ao", torch).quantization
+        # In place, so the fp32 weights are not kept alive alongside the int8 copy
+        model = quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+    return model
@@ -0,0 +1,29 @@
+import gc
+import os
+from utils.model_registry import registry
+from utils.semantic_inference import set_torch_threads
+
+def preload_models():
+    """Load, index and warm every model in the master before workers fork.
+
+    Runs single-threaded so no torch thread pool or helper thread exists at
+    fork time. Afterwards the heap is frozen so the garbage collector does not
+    write to (and un-share) the preloaded objects in each worker.
+    """
+    set_torch_threads(1)
+    registry.load_all()
+    gc.collect()
+    gc.freeze()
+
+def worker_torch_threads(workers):
+    """Intra-op threads per worker: WORKER_TORCH_THREADS, else cores / workers"""
+    configured = os.environ.get("WORKER_TORCH_THREADS", "").strip()
+    if configured:
+        return max(1, int(configured))
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+def configure_worker(workers):
+    """Per-worker setup after fork; returns the torch thread count used"""
+    threads = worker_torch_threads(workers)
+    set_torch_threads(threads)
+    return threads
@@ -1,17 +1,68 @@
 import pandas as pd
 import numpy as np
 import joblib
-from sentence_transformers import SentenceTransformer, util
 import os
+import threading
+from utils.embedding_index import EmbeddingIndex, cosine_similarity
+from utils.question_index import QuestionBank, EmptyQuestionBank
+from utils.lexicon import default_matcher
+from utils.model_registry import LazyModel, registry
+from utils.semantic_inference import InferenceConfig
+from utils.encoder_tiers import (
+    EncoderTier, UnknownTier, parse_tiers, DEFAULT_TIER_NAME, SEMANTIC_TIERS, SEMANTIC_DEFAULT_TIER, SEMANTIC_REFERENCE_TIER
+)
+from utils.complexity_predictor import LinearComplexityPredictor
+from utils.records import TechnicalQuestion, TechnicalEvaluation, AnswerAnalysis
+from utils.result_cache import get_cache, make_key, normalize_text
+from utils.metrics import timed, record_error
+
+# Model name, local path or "hashing" stand-in, and how it runs (SEMANTIC_INFERENCE_MODE=fp32|int8, ...);
+# SEMANTIC_TIERS configures several encoders instead (see utils/encoder_tiers.py)
+SEMANTIC_MODEL_NAME = os.environ.get("SEMANTIC_MODEL_NAME", "all-mpnet-base-v2")
+QUESTION_BANK_PATH = "model/model_b_full_labels.csv"
+COMPLEXITY_MODEL_PATH = "model/next_complexity_model.pkl"
 
 class TechnicalEvaluator:
-    def __init__(self):
-        # Load models
-        self.complexity_model = joblib.load("model/next_complexity_model.pkl")
-        self.semantic_model = SentenceTransformer("all-mpnet-base-v2")
+    def __init__(self, semantic_model_name=None, inference_config=None, tiers=None, default_tier=None,
+                 reference_tier=None):
+        inference_config = inference_config or InferenceConfig.from_env()
+        if tiers is None:
+            tiers = parse_tiers("" if semantic_model_name else SEMANTIC_TIERS,
+                                semantic_model_name or SEMANTIC_MODEL_NAME, inference_config)
+        self.default_tier = (default_tier or SEMANTIC_DEFAULT_TIER or next(iter(tiers))).lower()
+        self.reference_tier = (reference_tier or SEMANTIC_REFERENCE_TIER or (
+            DEFAULT_TIER_NAME if DEFAULT_TIER_NAME in tiers else self.default_tier
+        )).lower()
+        for name in (self.default_tier, self.reference_tier):
+            if name not in tiers:
+                raise UnknownTier(f"tier '{name}' is not among the configured tiers {list(tiers)}")
+        
+        # Models load lazily: on first use, or from the registry's background warm-up
+        self._complexity_model = registry.register(LazyModel(
+            "complexity_model", self._load_complexity_model, warmup=self._warm_up_complexity_model
+        ))
+        self._complexity_predictor = registry.register(LazyModel(
+            "complexity_predictor", self._load_complexity_predictor
+        ))
+        
+        # One encoder per tier; the default tier keeps the plain registry names and index path
+        reference_key = tiers[self.reference_tier][1].model_key(tiers[self.reference_tier][0])
+        self.tiers = {
+            name: EncoderTier(
+                name, model_name, config, lambda: self._bank.expected_answers(),
+                reference_key=None if name == self.reference_tier else reference_key,
+                registry_suffix="" if name == self.default_tier else f".{name}"
+            )
+            for name, (model_name, config) in tiers.items()
+        }
+        
+        # Repeat submissions skip the encoder and the complexity model
+        self._evaluation_cache = get_cache("technical_evaluation")
+        self._complexity_cache = get_cache("next_complexity")
         
-        # Load question bank
-        self.question_bank = pd.read_csv("model/model_b_full_labels.csv")
+        # Load question bank; reload_question_bank swaps in a new version whole
+        self._bank = QuestionBank.from_csv(QUESTION_BANK_PATH)
+        self._reload_lock = threading.Lock()
         
         # Experience mappings
         self.experience_mapping = {
@@ -26,7 +77,108 @@ class TechnicalEvaluator:
             "software engineer": 3.2
         }
     
-    def get_technical_question(self, experience_level, skills=None, current_complexity=None):
+    @property
+    def question_bank(self):
+        return self._bank.frame
+    
+    @property
+    def complexity_index(self):
+        return self._bank.index
+
+    def question_ids(self, hashes):
+        """Current row ids of questions identified by ``question_hash``; dropped questions are left out"""
+        return self._bank.row_ids(hashes)
+    
+    @property
+    def complexity_model(self):
+        return self._complexity_model.get()
+    
+    @property
+    def complexity_predictor(self):
+        """Pandas-free predictor with per-question text terms, or None if the model does not fit it"""
+        return self._complexity_predictor.get()
+    
+    def tier(self, name=None):
+        """Encoder tier by name (the default tier for None); raises UnknownTier"""
+        tier = self.tiers.get((name or self.default_tier).lower())
+        if tier is None:
+            raise UnknownTier(f"unknown encoder tier '{name}', expected one of {list(self.tiers)}")
+        return tier
+    
+    # The default tier's encoder, index and settings
+    
+    @property
+    def semantic_model_name(self):
+        return self.tier().model_name
+    
+    @property
+    def inference_config(self):
+        return self.tier().inference_config
+    
+    @property
+    def semantic_model(self):
+        return self.tier().semantic_model
+    
+    @property
+    def embedding_index(self):
+        return self.tier().embedding_index
+    
+    @property
+    def encoder(self):
+        """Batching front-end of the default tier's model, shared by request threads"""
+        return self.tier().encoder
+    
+    @property
+    def chunk_words(self):
+        """Words per encoder chunk; longer answers are encoded in pooled chunks"""
+        return self.tier().chunk_words
+    
+    def encode_answers(self, answers, tier=None):
+        """Embed candidate answers of any length, all chunks in one encoder call"""
+        return self.tier(tier).encode_answers(answers)
+    
+    def encoder_stats(self):
+        """Batching statistics, or None while the semantic model is not loaded"""
+        return self.tier().encoder_stats()
+    
+    def tiers_status(self):
+        return {
+            name: dict(tier.status(), default=name == self.default_tier) for name, tier in self.tiers.items()
+        }
+    
+    def reload_calibrations(self):
+        """Re-read every tier's calibration, dropping results scored with the old ones"""
+        with self._reload_lock:
+            for tier in self.tiers.values():
+                tier.reload_calibration()
+            self._evaluation_cache.clear()
+        return {name: tier.status()["calibrated"] for name, tier in self.tiers.items()}
+    
+    def calibration_files(self):
+        return [path for path in (tier.calibration_file() for tier in self.tiers.values()) if path]
+    
+    def _load_complexity_model(self):
+        return joblib.load(COMPLEXITY_MODEL_PATH)
+    
+    def _warm_up_complexity_model(self, model):
+        model.predict(pd.DataFrame([{
+            "qa_text": "warm up question warm up answer",
+            "complexity_score": 2.0,
+            "answer_quality_score": 0.5,
+            "experience_encoded": 0
+        }]))
+    
+    def _load_complexity_predictor(self):
+        try:
+            predictor = LinearComplexityPredictor.from_pipeline(self.complexity_model)
+        except ValueError as e:
+            print(f"Complexity fast path unavailable, using the pipeline: {e}")
+            return None
+        # Bank questions always produce the same qa_text, so its text term is computed once
+        return predictor.precompute(self._bank.qa_texts())
+    
+    def get_technical_question(self, experience_level, skills=None, current_complexity=None,
+                               exclude_ids=None, rotation=0):
         """Get a technical question based on experience level and skills"""
         
         # Set default skills if none provided
@@ -39,39 +191,56 @@ class TechnicalEvaluator:
         if current_complexity is None:
             current_complexity = self.experience_starting_score.get(experience_level.lower(), 2.0)
         
-        # Filter questions by skill set
-        subset = self.question_bank[
-            self.question_bank["technology"].str.lower().isin(skill_set)
-        ].copy()
-        
-        if subset.empty:
-            # Fallback to any question if no skills match
-            subset = self.question_bank.copy()
-        
-        # Find question closest to current complexity
-        subset["score_diff"] = abs(subset["complexity_score"] - current_complexity)
-        question_row = subset.sort_values("score_diff").iloc[0]
-        
-        return {
-            "question": str(question_row["question_text"]),
-            "expected_answer": str(question_row["expected_answer"]),
-            "complexity_score": float(question_row["complexity_score"]),
-            "technology": str(question_row["technology"]),
-            "bloom_label": str(question_row["bloom_label"]),
-            "question_id": int(question_row.name)
-        }
+        # Closest complexity across the requested skills via the sorted index
+        bank = self._bank
+        with timed("technical.question_selection"):
+            row = bank.index.closest(
+                skill_set,
+                float(current_complexity),
+                exclude_ids=exclude_ids,
+                rotation=rotation
+            )
+        if row is None:
+            raise EmptyQuestionBank("The technical question bank is empty")
+        return self.get_question_by_id(row, bank=bank)
+    
+    def get_question_by_id(self, question_id, bank=None):
+        """Return the question record for a bank row"""
+        row = (bank or self._bank).rows[int(question_id)]
+        return TechnicalQuestion(
+            question=row["question_text"],
+            expected_answer=row["expected_answer"],
+            complexity_score=row["complexity_score"],
+            technology=row["technology"],
+            bloom_label=row["bloom_label"],
+            question_id=int(question_id)
+        )
     
-    def evaluate_technical_answer(self, question, expected_answer, candidate_answer):
-        """Evaluate technical correctness using semantic similarity"""
+    def evaluate_technical_answer(self, question, expected_answer, candidate_answer, question_id=None,
+                                  candidate_embedding=None, tier=None):
+        """Evaluate technical correctness using semantic similarity.
+        
+        ``tier`` picks the encoder; its similarity is calibrated onto the
+        reference tier's scale, so scores compare across tiers.
+        """
         
         if not candidate_answer or not candidate_answer.strip():
             return {"correctness": 0.0, "semantic_similarity": 0.0}
         
         try:
-            # Calculate semantic similarity
-            emb_expected = self.semantic_model.encode(expected_answer, convert_to_tensor=True)
-            emb_candidate = self.semantic_model.encode(candidate_answer, convert_to_tensor=True)
-            similarity = util.cos_sim(emb_expected, emb_candidate).item()
+            encoder_tier = self.tier(tier)
+            # Calculate semantic similarity (bank expected answers come from the index,
+            # others are encoded in pooled chunks like candidate answers)
+            with timed("technical.encode_expected"):
+                emb_expected = encoder_tier.embedding_index.get(
+                    expected_answer, encoder_tier.encode_answers, question_id=question_id
+                )
+            if candidate_embedding is None:
+                with timed("technical.encode_candidate"):
+                    candidate_embedding = encoder_tier.encode_answers(candidate_answer)
+            emb_candidate = candidate_embedding
+            with timed("technical.cosine"):
+                similarity = encoder_tier.calibrate(cosine_similarity(emb_expected, emb_candidate))
             
             # Scale similarity to 0-10 range
             correctness = round(similarity * 10, 2)
@@ -84,85 +253,280 @@ class TechnicalEvaluator:
                 "has_technical_terms": self._count_technical_terms(candidate_answer)
             }
             
+        except UnknownTier:
+            raise
         except Exception as e:
             print(f"Error in technical evaluation: {e}")
-            return {"correctness": 0.0, "semantic_similarity": 0.0}
+            record_error("technical_evaluation")
+            return {"correctness": 0.0, "semantic_similarity": 0.0, "error": str(e)}
     
     def predict_next_complexity(self, question_text, expected_answer, answer_quality_score, 
-                              current_complexity, experience_level):
+                              current_complexity, experience_level, question_id=None):
         """Predict the next question complexity using the trained model"""
+        return self._next_complexity(
+            question_text, expected_answer, answer_quality_score, current_complexity, experience_level,
+            question_id=question_id
+        )[0]
+    
+    def predict_next_complexity_batch(self, items):
+        """``predict_next_complexity`` for many sessions at once.
+
+        ``items`` are dicts with question_text, expected_answer,
+        answer_quality_score, current_complexity, experience_level and
+        optionally question_id.
+        """
+        results = [None] * len(items)
+        keys = [
+            make_key(item["question_text"], item["expected_answer"], item["answer_quality_score"],
+                     item["current_complexity"], item["experience_level"].lower())
+            for item in items
+        ]
+        missing = []
+        for i, key in enumerate(keys):
+            cached = self._complexity_cache.get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.append(i)
+        
+        if missing:
+            try:
+                predictor = self.complexity_predictor
+                if predictor is None:
+                    raise ValueError("no fast path for this model")
+                with timed("technical.complexity_batch"):
+                    terms = [
+                        predictor.text_term(
+                            items[i]["question_text"] + " " + items[i]["expected_answer"], items[i].get("question_id")
+                        )
+                        for i in missing
+                    ]
+                    numeric = [
+                        (
+                            float(items[i]["current_complexity"]),
+                            float(items[i]["answer_quality_score"]) / 10.0,
+                            self.experience_mapping.get(items[i]["experience_level"].lower(), 0)
+                        )
+                        for i in missing
+                    ]
+                    predictions = predictor.predict_batch(terms, numeric)
+                for i, prediction in zip(missing, predictions):
+                    results[i] = round(float(prediction), 2)
+                    self._complexity_cache.put(keys[i], results[i])
+            except Exception:
+                # One at a time, so each item gets the model or its own fallback
+                for i in missing:
+                    item = items[i]
+                    results[i] = self.predict_next_complexity(
+                        item["question_text"], item["expected_answer"], item["answer_quality_score"],
+                        item["current_complexity"], item["experience_level"], question_id=item.get("question_id")
+                    )
+        return results
+    
+    def _next_complexity(self, question_text, expected_answer, answer_quality_score,
+                         current_complexity, experience_level, question_id=None):
+        """Return (next complexity, whether the model produced it)"""
+        
+        key = make_key(
+            question_text, expected_answer, answer_quality_score, current_complexity, experience_level.lower()
+        )
+        cached = self._complexity_cache.get(key)
+        if cached is not None:
+            return cached, True
         
         try:
             qa_text = question_text + " " + expected_answer
             experience_encoded = self.experience_mapping.get(experience_level.lower(), 0)
             
-            sample = pd.DataFrame([{
-                "qa_text": qa_text,
-                "complexity_score": current_complexity,
-                "answer_quality_score": answer_quality_score / 10.0,  # Normalize to 0-1
-                "experience_encoded": experience_encoded
-            }])
-            
-            next_complexity = self.complexity_model.predict(sample)[0]
-            return round(next_complexity, 2)
+            predictor = self.complexity_predictor
+            if predictor is not None:
+                # Same linear model without pandas; the text term is precomputed for bank questions
+                with timed("technical.complexity_predict"):
+                    next_complexity = round(predictor.predict(
+                        predictor.text_term(qa_text, question_id),
+                        current_complexity,
+                        answer_quality_score / 10.0,  # Normalize to 0-1
+                        experience_encoded
+                    ), 2)
+            else:
+                with timed("technical.complexity_frame"):
+                    sample = pd.DataFrame([{
+                        "qa_text": qa_text,
+                        "complexity_score": current_complexity,
+                        "answer_quality_score": answer_quality_score / 10.0,  # Normalize to 0-1
+                        "experience_encoded": experience_encoded
+                    }])
+                
+                model = self.complexity_model
+                with timed("technical.complexity_predict"):
+                    next_complexity = round(model.predict(sample)[0], 2)
+            self._complexity_cache.put(key, next_complexity)
+            return next_complexity, True
             
         except Exception as e:
             print(f"Error predicting next complexity: {e}")
+            record_error("next_complexity")
             # Fallback: simple adjustment based on performance
             if answer_quality_score >= 7:
-                return min(current_complexity + 0.3, 5.0)
+                return min(current_complexity + 0.3, 5.0), False
             elif answer_quality_score >= 4:
-                return current_complexity
+                return current_complexity, False
             else:
-                return max(current_complexity - 0.3, 1.0)
+                return max(current_complexity - 0.3, 1.0), False
     
-    def get_comprehensive_evaluation(self, question_data, candidate_answer, experience_level):
+    def get_comprehensive_evaluation(self, question_data, candidate_answer, experience_level, tier=None):
         """Get comprehensive evaluation including next complexity prediction"""
         
+        encoder_tier = self.tier(tier)
+        key = self._evaluation_key(question_data, candidate_answer, experience_level, encoder_tier)
+        cached = self._evaluation_cache.get(key)
+        if cached is not None:
+            return cached
+        return self._evaluate_uncached(key, question_data, candidate_answer, experience_level, tier=encoder_tier.name)
+    
+    def get_comprehensive_evaluations_batch(self, question_datas, candidate_answers, experience_levels, tier=None):
+        """``get_comprehensive_evaluation`` for many answers, encoding the uncached ones in one call"""
+        encoder_tier = self.tier(tier)
+        keys = [
+            self._evaluation_key(question_data, candidate_answer, experience_level, encoder_tier)
+            for question_data, candidate_answer, experience_level
+            in zip(question_datas, candidate_answers, experience_levels)
+        ]
+        results = [self._evaluation_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        # Blank answers score zero without touching the encoder
+        to_encode = [i for i in missing if candidate_answers[i] and candidate_answers[i].strip()]
+        embeddings = {}
+        if to_encode:
+            try:
+                with timed("technical.encode_candidate_batch"):
+                    encoded = encoder_tier.encode_answers([candidate_answers[i] for i in to_encode])
+                embeddings = dict(zip(to_encode, encoded))
+            except Exception as e:
+                # Each answer is retried on its own below and reports its own error
+                print(f"Error in batch encoding: {e}")
+                record_error("technical_batch_encode")
+        
+        for i in missing:
+            results[i] = self._evaluate_uncached(
+                keys[i], question_datas[i], candidate_answers[i], experience_levels[i],
+                candidate_embedding=embeddings.get(i), tier=encoder_tier.name
+            )
+        return results
+    
+    def _evaluation_key(self, question_data, candidate_answer, experience_level, encoder_tier):
+        return make_key(
+            encoder_tier.name,
+            encoder_tier.model_key,
+            question_data["question"],
+            question_data["expected_answer"],
+            question_data["complexity_score"],
+            question_data["technology"],
+            question_data["bloom_label"],
+            normalize_text(candidate_answer),
+            experience_level.lower()
+        )
+    
+    def _evaluate_uncached(self, key, question_data, candidate_answer, experience_level, candidate_embedding=None,
+                           tier=None):
         # Basic technical evaluation
         tech_eval = self.evaluate_technical_answer(
             question_data["question"],
             question_data["expected_answer"],
-            candidate_answer
+            candidate_answer,
+            question_id=question_data.get("question_id"),
+            candidate_embedding=candidate_embedding,
+            tier=tier
         )
         
         # Predict next complexity
-        next_complexity = self.predict_next_complexity(
+        next_complexity, from_model = self._next_complexity(
             question_data["question"],
             question_data["expected_answer"],
             tech_eval["correctness"],
             question_data["complexity_score"],
-            experience_level
+            experience_level,
+            question_id=question_data.get("question_id")
         )
         
-        # Combine results
-        return {
-            "technical_accuracy": float(tech_eval["correctness"]),
-            "semantic_similarity": float(tech_eval.get("semantic_similarity", 0.0)),
-            "current_complexity": float(question_data["complexity_score"]),
-            "next_complexity": float(next_complexity),
-            "technology": str(question_data["technology"]),
-            "bloom_level": str(question_data["bloom_label"]),
-            "answer_analysis": {
-                "word_count": int(tech_eval.get("answer_length", 0)),
-                "technical_terms": int(tech_eval.get("has_technical_terms", 0)),
-                "completeness": float(self._assess_completeness(candidate_answer, question_data["expected_answer"]))
-            }
-        }
+        with timed("technical.completeness"):
+            completeness = self._assess_completeness(candidate_answer, question_data["expected_answer"])
+        
+        # Combine results; the casts keep the response's JSON types whatever the client sent
+        result = TechnicalEvaluation(
+            technical_accuracy=float(tech_eval["correctness"]),
+            semantic_similarity=float(tech_eval.get("semantic_similarity", 0.0)),
+            current_complexity=float(question_data["complexity_score"]),
+            next_complexity=float(next_complexity),
+            technology=str(question_data["technology"]),
+            bloom_level=str(question_data["bloom_label"]),
+            answer_analysis=AnswerAnalysis(
+                word_count=int(tech_eval.get("answer_length", 0)),
+                technical_terms=int(tech_eval.get("has_technical_terms", 0)),
+                completeness=float(completeness)
+            ),
+            encoder_tier=tier or self.default_tier
+        )
+        
+        # Degraded results (a model failed) are not cached so recovery is immediate
+        if from_model and "error" not in tech_eval:
+            self._evaluation_cache.put(key, result)
+        return result
+    
+    def reload_question_bank(self, path=QUESTION_BANK_PATH):
+        """Build the new bank, its embedding rows and text terms, then swap them in.
+
+        Only expected answers whose content hash is new are encoded. Requests
+        already running keep the bank they started with; row ids they hold are
+        checked against content hashes, and sessions keep questions by content
+        (``question_hash``), so a swap never mixes rows up.
+        Returns a summary of the change.
+        """
+        with self._reload_lock:
+            bank = QuestionBank.from_csv(path)
+            summary = {"rows": len(bank), "previous_rows": len(self._bank), "encoded": 0}
+            
+            # An index is only rebuilt if it is in use; otherwise it loads the new bank on first use
+            indexes = {}
+            for tier in self.tiers.values():
+                current = tier.loaded_index()
+                if current is None:
+                    continue
+                index = EmbeddingIndex.update(current, tier.semantic_model, bank.expected_answers(), current.model_name)
+                summary["encoded"] += index.encoded
+                try:
+                    index.save(tier.index_path)
+                    index = EmbeddingIndex.load(tier.index_path)
+                except OSError as e:
+                    print(f"Could not persist embedding index to {tier.index_path}: {e}")
+                indexes[tier] = index
+            
+            predictor = None
+            if self._complexity_predictor.ready and self._complexity_predictor.value is not None:
+                predictor = LinearComplexityPredictor.from_pipeline(self.complexity_model)
+                predictor.precompute(bank.qa_texts())
+            
+            # Everything is built; the swaps are reference assignments
+            for tier, index in indexes.items():
+                tier.replace_index(index)
+            if predictor is not None:
+                self._complexity_predictor.replace(predictor)
+            self._bank = bank
+            return summary
+    
+    def reload_complexity_model(self):
+        """Reload the next-complexity model and its fast path, dropping results it produced"""
+        with self._reload_lock:
+            self._complexity_model.reload()
+            self._complexity_predictor.reload()
+            self._complexity_cache.clear()
+            self._evaluation_cache.clear()
     
     def _count_technical_terms(self, text):
         """Count technical terms in the answer"""
-        technical_terms = [
-            'api', 'database', 'algorithm', 'function', 'method', 'class', 'object',
-            'array', 'string', 'boolean', 'integer', 'async', 'await', 'promise',
-            'callback', 'closure', 'prototype', 'inheritance', 'polymorphism',
-            'encapsulation', 'abstraction', 'framework', 'library', 'module',
-            'component', 'service', 'controller', 'model', 'view', 'rest', 'json',
-            'xml', 'http', 'https', 'sql', 'nosql', 'crud', 'mvc', 'mvvm'
-        ]
-        
-        text_lower = text.lower()
-        return sum(1 for term in technical_terms if term in text_lower)
+        with timed("technical.term_count"):
+            return default_matcher.count(text, "technical_terms")
     
     def _assess_completeness(self, candidate_answer, expected_answer):
         """Assess how complete the answer is compared to expected"""